@@ -0,0 +1,175 @@
+"""
+Control de admisión (ASGI) para no saturar el threadpool.
+
+Cada petición cae en un carril según la ruta (auth, lecturas, escrituras,
+cargas masivas, subidas). Cada carril tiene un límite de peticiones en curso,
+una cola acotada y un tiempo máximo de espera; si la cola está llena o la
+espera vence, se responde 503 con Retry-After de inmediato en lugar de dejar
+que la latencia crezca para todos.
+
+/healthz, / y /metrics (y el preflight OPTIONS y el flujo SSE, que es
+de larga duración y no usa el threadpool) no pasan por ningún carril.
+
+Configuración por carril: ADMISSION_<CARRIL>="limite,cola,espera_ms",
+p.ej. ADMISSION_LECTURAS="16,64,2000". ADMISSION_ENABLED=false lo desactiva.
+"""
+
+import asyncio
+import json
+import math
+import os
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from app.metrics import colector
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+
+# Suma de límites por debajo de los 40 hilos del threadpool de AnyIO
+_DEFAULTS: Dict[str, Tuple[int, int, int]] = {
+    "auth": (4, 32, 2000),
+    "lecturas": (16, 64, 2000),
+    "escrituras": (8, 32, 3000),
+    "masivas": (2, 4, 5000),
+    "subidas": (4, 8, 5000),
+}
+
+_SIN_CARRIL = {"/", "/healthz", "/metrics", "/seguimiento/eventos", "/seguimiento/eventos/"}
+_MASIVAS = ("/pqrds", "/habilidades", "/reports")
+
+
+def _config(carril: str) -> Tuple[int, int, int]:
+    raw = os.getenv(f"ADMISSION_{carril.upper()}", "")
+    try:
+        limite, cola, espera = (int(x) for x in raw.split(","))
+        return limite, cola, espera
+    except ValueError:
+        return _DEFAULTS[carril]
+
+
+def clasificar(method: str, path: str) -> Optional[str]:
+    """Carril de la petición, o None si va por la vía prioritaria."""
+    if method == "OPTIONS" or path in _SIN_CARRIL:
+        return None
+    if path.startswith("/auth"):
+        return "auth"
+    if path.startswith("/files/upload"):
+        return "subidas"
+    if path.startswith("/exports"):
+        return "masivas"
+    if method == "POST" and path.rstrip("/") in _MASIVAS:
+        return "masivas"
+    if method in ("GET", "HEAD"):
+        return "lecturas"
+    return "escrituras"
+
+
+class Carril:
+    def __init__(self, nombre: str, limite: int, cola: int, espera_ms: int):
+        self.nombre = nombre
+        self.limite = limite
+        self.cola_max = cola
+        self.espera = espera_ms / 1000
+        self.en_curso = 0
+        self._esperando: deque = deque()
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    @property
+    def en_cola(self) -> int:
+        return len(self._esperando)
+
+    async def entrar(self) -> bool:
+        if self.en_curso < self.limite and not self._esperando:
+            self.en_curso += 1
+            self.admitidas += 1
+            return True
+        if len(self._esperando) >= self.cola_max:
+            self.rechazadas += 1
+            return False
+        fut = asyncio.get_running_loop().create_future()
+        self._esperando.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.espera)
+        except asyncio.TimeoutError:
+            if fut.done():
+                # Nos cedieron el turno justo al vencer: lo aprovechamos
+                self.admitidas += 1
+                return True
+            self._esperando.remove(fut)
+            fut.cancel()
+            self.rechazadas += 1
+            return False
+        except BaseException:
+            # Cliente desconectado mientras esperaba: devolver el turno si ya era suyo
+            if fut.done() and not fut.cancelled():
+                self.salir()
+            elif fut in self._esperando:
+                self._esperando.remove(fut)
+            raise
+        self.admitidas += 1
+        return True
+
+    def salir(self) -> None:
+        # El turno pasa directamente al siguiente en cola (en_curso no baja)
+        while self._esperando:
+            fut = self._esperando.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.en_curso -= 1
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = ADMISSION_ENABLED if enabled is None else enabled
+        self.carriles = {nombre: Carril(nombre, *_config(nombre)) for nombre in _DEFAULTS}
+        _instancias.append(self)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        nombre = clasificar(scope["method"], scope["path"])
+        if nombre is None:
+            return await self.app(scope, receive, send)
+
+        carril = self.carriles[nombre]
+        if not await carril.entrar():
+            return await self._rechazar(carril, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            carril.salir()
+
+    async def _rechazar(self, carril: Carril, send) -> None:
+        body = json.dumps({"detail": "Servidor saturado, intente de nuevo en unos segundos"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(carril.espera))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+_instancias: list = []
+
+
+@colector
+def _metricas():
+    yield "# HELP admission_in_flight Peticiones en curso por carril."
+    yield "# TYPE admission_in_flight gauge"
+    yield "# HELP admission_queued Peticiones esperando turno por carril."
+    yield "# TYPE admission_queued gauge"
+    yield "# HELP admission_requests_total Peticiones admitidas o rechazadas (503) por carril."
+    yield "# TYPE admission_requests_total counter"
+    for mw in _instancias[-1:]:
+        for c in mw.carriles.values():
+            yield f'admission_in_flight{{carril="{c.nombre}"}} {c.en_curso}'
+            yield f'admission_queued{{carril="{c.nombre}"}} {c.en_cola}'
+            yield f'admission_requests_total{{carril="{c.nombre}",resultado="admitida"}} {c.admitidas}'
+            yield f'admission_requests_total{{carril="{c.nombre}",resultado="rechazada"}} {c.rechazadas}'
@@ -0,0 +1,76 @@
+"""
+Cadenas de ajustes entre seguimientos (Seguimiento.ajuste_de_id).
+
+Un seguimiento que ajusta a otro apunta a él con ajuste_de_id. Las cadenas
+se recorren con una sola consulta WITH RECURSIVE (SQLite y Postgres):
+
+- modo "cadena": desde la raíz hasta el seguimiento pedido (sus ancestros).
+- modo "arbol": la raíz del seguimiento y todos los ajustes que cuelgan de ella.
+
+`profundidad` 0 es la raíz; el orden es por profundidad y luego id. El
+recorrido no sale del plan y se corta en MAX_PROFUNDIDAD por si algún dato
+forma un ciclo.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from app import models
+
+MAX_PROFUNDIDAD = 1000
+MODOS = ("arbol", "cadena")
+
+
+def _ancestros(plan_id: int, seg_id: int):
+    """CTE (id, ajuste_de_id, nivel): el seguimiento (nivel 0) y sus ancestros."""
+    S = models.Seguimiento
+    ancla = (
+        select(S.id, S.ajuste_de_id, literal_column("0").label("nivel"))
+        .where(S.id == seg_id, S.plan_id == plan_id)
+        .cte("ancestros", recursive=True)
+    )
+    padre = aliased(S)
+    return ancla.union_all(
+        select(padre.id, padre.ajuste_de_id, (ancla.c.nivel + 1).label("nivel"))
+        .join(ancla, padre.id == ancla.c.ajuste_de_id)
+        .where(padre.plan_id == plan_id, ancla.c.nivel < MAX_PROFUNDIDAD)
+    )
+
+
+def recorrer(db: Session, plan_id: int, seg_id: int, modo: str = "arbol") -> List[Tuple[models.Seguimiento, int]]:
+    """[(seguimiento, profundidad)] en una sola consulta; vacío si no existe en el plan."""
+    S = models.Seguimiento
+    ancestros = _ancestros(plan_id, seg_id)
+
+    if modo == "cadena":
+        # nivel cuenta desde el seguimiento hacia la raíz: se invierte al final
+        stmt = (
+            select(S)
+            .join(ancestros, ancestros.c.id == S.id)
+            .options(joinedload(S.updated_by))
+            .order_by(ancestros.c.nivel.desc())
+        )
+        segs = db.execute(stmt).unique().scalars().all()
+        return [(seg, i) for i, seg in enumerate(segs)]
+
+    raiz = select(ancestros.c.id).order_by(ancestros.c.nivel.desc()).limit(1).scalar_subquery()
+    arbol = (
+        select(S.id, literal_column("0").label("profundidad"))
+        .where(S.id == raiz)
+        .cte("arbol", recursive=True)
+    )
+    hijo = aliased(S)
+    arbol = arbol.union_all(
+        select(hijo.id, (arbol.c.profundidad + 1).label("profundidad"))
+        .join(arbol, hijo.ajuste_de_id == arbol.c.id)
+        .where(hijo.plan_id == plan_id, arbol.c.profundidad < MAX_PROFUNDIDAD)
+    )
+    stmt = (
+        select(S, arbol.c.profundidad)
+        .join(arbol, arbol.c.id == S.id)
+        .options(joinedload(S.updated_by))
+        .order_by(arbol.c.profundidad, S.id)
+    )
+    return [(seg, profundidad) for seg, profundidad in db.execute(stmt).unique().all()]
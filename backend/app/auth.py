@@ -2,20 +2,17 @@ import os
 from typing import Optional
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_HOURS
 from app.database import get_db
 from app import models
+from app.seguridad import TokenInvalido, codificar_token, decodificar_token, verify_password
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 DISABLE_AUTH = os.getenv("DISABLE_AUTH", "false").lower() == "true"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token") if not DISABLE_AUTH else (lambda: None)
@@ -44,7 +41,7 @@ def create_access_token(
         "entidad_auditor": bool(entidad_auditor),
         "exp": datetime.utcnow() + timedelta(hours=JWT_EXPIRE_HOURS),
     }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return codificar_token(payload, JWT_SECRET, JWT_ALGORITHM)
 
 def get_current_user(
     db: Session = Depends(get_db),
@@ -60,13 +57,13 @@ def get_current_user(
 
     cred_exc = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = decodificar_token(token, JWT_SECRET, [JWT_ALGORITHM])
         email: str = payload.get("sub")
         uid: int | None = payload.get("uid")
         role_in_token: str | None = payload.get("role")
         if email is None or uid is None or role_in_token is None:
             raise cred_exc
-    except JWTError:
+    except TokenInvalido:
         raise cred_exc
 
     user = None
@@ -79,6 +76,16 @@ def get_current_user(
         raise cred_exc
     return user
 
+_oauth2_opcional = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
+
+def get_current_user_sse(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(_oauth2_opcional),
+    access_token: Optional[str] = Query(None, description="Token JWT (EventSource no envía encabezados)"),
+) -> models.User:
+    """Como get_current_user, pero acepta el token también en ?access_token= para SSE."""
+    return get_current_user(db=db, token=token or access_token)
+
 def require_roles(*roles: str):
     def checker(user: models.User = Depends(get_current_user)):
         if DISABLE_AUTH:
@@ -93,7 +100,7 @@ def require_roles(*roles: str):
 @router.post("/token")
 def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(models.User).filter_by(email=form.username).first()
-    if not user or not pwd.verify(form.password, user.hashed_password):
+    if not user or not verify_password(form.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Credenciales inválidas")
 
     role_val = _enum_val(user.role)
@@ -0,0 +1,142 @@
+"""
+Borrado de planes (DELETE /seguimiento/{id} y POST /seguimiento/lote/eliminar).
+
+Los seguimientos de un plan, y con ellos sus enlaces a evidencias, los borra
+la BD con ON DELETE CASCADE: borrar N planes es un solo DELETE sobre
+plan_accion, sin cargar hijos en la sesión. Lo que la app lleva aparte
+(historial, estadisticas, indicadores_entidad) se descuenta con consultas por
+conjunto (INSERT … SELECT y GROUP BY), no fila por fila.
+
+Papelera: con papelera=True el plan solo se marca (deleted_at, un UPDATE) y
+deja de verse y de contar de inmediato; la purga (worker de jobs, cada hora, o
+tools/purgar_papelera.py) lo borra pasados PAPELERA_DIAS, en lotes.
+
+Si la BD no tiene las cascadas (SQLite sin PRAGMA foreign_keys o un esquema
+anterior) los hijos se borran con un DELETE explícito antes que el padre.
+"""
+
+import os
+import weakref
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.orm import Session
+
+from app import estadisticas, evidencias, historial, indicadores, models
+
+PAPELERA_DIAS = int(os.getenv("PLAN_PAPELERA_DIAS", "30"))
+LOTE_PURGA = int(os.getenv("PLAN_LOTE_PURGA", "500"))
+
+# engine -> acciones ON DELETE que declara el esquema (se revisa una vez por engine)
+_cascadas = weakref.WeakKeyDictionary()
+
+
+def _ondelete(insp, tabla: str, columna: str) -> str:
+    for fk in insp.get_foreign_keys(tabla):
+        if fk["constrained_columns"] == [columna]:
+            return ((fk.get("options") or {}).get("ondelete") or "").upper()
+    return ""
+
+
+def _reglas(db: Session) -> dict:
+    bind = db.get_bind()
+    if bind not in _cascadas:
+        insp = inspect(db.connection())
+        _cascadas[bind] = {
+            "cascada": _ondelete(insp, "seguimiento", "plan_id") == "CASCADE"
+            and _ondelete(insp, "seguimiento_evidencia", "seguimiento_id") == "CASCADE",
+            "ajustes": _ondelete(insp, "seguimiento", "ajuste_de_id") == "SET NULL",
+        }
+    return _cascadas[bind]
+
+
+def _fk_activas(db: Session) -> bool:
+    return db.get_bind().dialect.name != "sqlite" or bool(db.execute(text("PRAGMA foreign_keys")).scalar())
+
+
+def cascada_en_bd(db: Session) -> bool:
+    """True si borrar un plan ya arrastra sus seguimientos y enlaces en la BD."""
+    return _fk_activas(db) and _reglas(db)["cascada"]
+
+
+def ajustes_en_bd(db: Session) -> bool:
+    """True si borrar un seguimiento ya deja sus ajustes con ajuste_de_id NULL (ON DELETE SET NULL)."""
+    return _fk_activas(db) and _reglas(db)["ajustes"]
+
+
+def desvincular_ajustes(db: Session, seg_ids) -> None:
+    """
+    Antes de borrar seguimientos: sus ajustes quedan sin padre. Lo hace la BD
+    si la FK tiene SET NULL; en una SQLite anterior (FK sin acción) un UPDATE
+    explícito evita el IntegrityError con PRAGMA foreign_keys=ON.
+    """
+    if not ajustes_en_bd(db):
+        S = models.Seguimiento
+        db.query(S).filter(S.ajuste_de_id.in_(seg_ids)).update({S.ajuste_de_id: None}, synchronize_session=False)
+
+
+def _borrar(db: Session, ids: List[int]) -> None:
+    """DELETE de los planes; los hijos caen por cascada o, si no la hay, con un DELETE previo."""
+    if not cascada_en_bd(db):
+        S = models.Seguimiento
+        segs = select(S.id).where(S.plan_id.in_(ids)).scalar_subquery()
+        evidencias.desvincular(db, segs)
+        desvincular_ajustes(db, segs)
+        db.query(S).filter(S.plan_id.in_(ids)).delete(synchronize_session=False)
+    db.query(models.PlanAccion).filter(models.PlanAccion.id.in_(ids)).delete(synchronize_session=False)
+
+
+def eliminar_planes(db: Session, ids: Iterable[int], user: Optional[models.User] = None,
+                    papelera: bool = False) -> List[Tuple[int, str]]:
+    """
+    Borra (o manda a la papelera) los planes vigentes de `ids`. Devuelve
+    [(id, nombre_entidad)] de los afectados; los demás no existían. Sin commit.
+    """
+    P = models.PlanAccion
+    planes = (
+        db.query(P.id, P.nombre_entidad, P.estado, P.fecha_final)
+        .filter(P.id.in_(list(ids)), P.deleted_at.is_(None))
+        .with_for_update()
+        .all()
+    )
+    if not planes:
+        return []
+    ids = [p.id for p in planes]
+
+    historial.registrar_borrado_de_planes(db, ids, user)
+    estadisticas.planes_quitados(db, [(p.nombre_entidad, p.estado, p.fecha_final) for p in planes])
+    estadisticas.seguimientos_de_planes(db, ids, signo=-1)
+    indicadores.quitar_de_planes(db, ids)
+
+    if papelera:
+        db.execute(
+            update(P)
+            .where(P.id.in_(ids))
+            .values(deleted_at=datetime.utcnow(), version=P.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        _borrar(db, ids)
+    return [(p.id, p.nombre_entidad) for p in planes]
+
+
+def purgar_papelera(db: Session, dias: int = PAPELERA_DIAS, lote: int = LOTE_PURGA) -> int:
+    """
+    Borra del todo los planes que llevan más de `dias` en la papelera, `lote`
+    por transacción (commit en cada una). Devuelve cuántos.
+    """
+    P = models.PlanAccion
+    limite = datetime.utcnow() - timedelta(days=dias)
+    total = 0
+    while True:
+        ids = [
+            r[0] for r in
+            db.query(P.id).filter(P.deleted_at.isnot(None), P.deleted_at <= limite)
+            .order_by(P.id).limit(lote)
+        ]
+        if not ids:
+            return total
+        _borrar(db, ids)
+        db.commit()
+        total += len(ids)
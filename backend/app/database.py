@@ -1,30 +1,62 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import NullPool
 import os
+from contextvars import ContextVar
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        DATABASE_URL,
+def activar_fk_sqlite(engine):
+    """SQLite no aplica FKs (ni ON DELETE CASCADE / SET NULL) salvo que se pida por conexión."""
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.close()
+    return engine
+
+# Réplica de lectura opcional: los GET van a ella salvo justo después de que el
+# mismo usuario escribió (ver app/replicas.py)
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL", "").strip()
+
+def crear_engine(url: str, un_escritor: bool = True):
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False}
+        )
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            return activar_fk_sqlite(engine)
+        # WAL, pragmas y turno único de escritura (ver app/sqlite_perfil.py)
+        from app import sqlite_perfil
+        return sqlite_perfil.configurar(engine, un_escritor=un_escritor and sqlite_perfil.SQLITE_UN_ESCRITOR)
+    return create_engine(
+        url,
         poolclass=NullPool,          # <- clave para serverless + Neon Free
         pool_pre_ping=True,
-        connect_args={"sslmode": "require"},
+        connect_args={"sslmode": os.getenv("DB_SSLMODE", "require")},
     )
 
+engine = crear_engine(DATABASE_URL)
+replica_engine = crear_engine(REPLICA_DATABASE_URL, un_escritor=False) if REPLICA_DATABASE_URL else None
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionReplica = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine is not None else None
+)
+
+# Lo fija app.replicas.ReplicaMiddleware por petición; las rutas lo heredan en el threadpool
+destino_lectura: ContextVar[str] = ContextVar("destino_lectura", default="primaria")
 
 class Base(DeclarativeBase):
     pass
 
+def en_replica() -> bool:
+    """True si la petición en curso recibe la sesión de la réplica (no sirve para escribir)."""
+    return SessionReplica is not None and destino_lectura.get() == "replica"
+
 def get_db():
-    db = SessionLocal()
+    db = (SessionReplica if en_replica() else SessionLocal)()
     try:
         yield db
     finally:
@@ -1,12 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from typing import Iterable
 
 from app.config import SECRET_KEY, ALGORITHM
 from app.database import get_db
 from app import models
+from app.seguridad import TokenInvalido, decodificar_token
 
 # Evita import circular con app.auth:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -21,11 +21,11 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decodificar_token(token, SECRET_KEY, [ALGORITHM])
         uid = payload.get("uid")
         if uid is None:
             raise credentials_exception
-    except JWTError:
+    except TokenInvalido:
         raise credentials_exception
 
     user = db.query(models.User).get(uid)
@@ -0,0 +1,208 @@
+"""
+Estadísticas por entidad para el tablero (Home / Reportes).
+
+Tabla `estadisticas` con (entidad, metrica, clave) -> valor:
+
+- metrica "estado":           clave = estado del plan          -> número de planes
+- metrica "vence":            clave = fecha_final (AAAA-MM-DD)  -> planes abiertos que vencen ese día
+- metrica "seguimientos_mes": clave = AAAA-MM (created_at)     -> seguimientos creados ese mes
+
+Las rutas de escritura de routers/plans.py aplican deltas con un upsert
+`valor = valor + :delta`, que la BD resuelve de forma atómica (dos escrituras
+concurrentes no se pisan). Los vencidos dependen de la fecha de hoy, por eso
+se guardan por fecha de vencimiento y se suman al leer.
+
+Reconstruir desde cero: python tools/recalcular_estadisticas.py
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import String, cast, func
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Estados en los que un plan ya no cuenta como vencido
+ESTADOS_CERRADOS = {"Aprobado"}
+SIN_ESTADO = "Sin estado"
+
+Clave = Tuple[str, str]  # (metrica, clave)
+
+
+def _aporte_plan(estado: Optional[str], fecha_final: Optional[date]) -> Counter:
+    aporte = Counter({("estado", estado or SIN_ESTADO): 1})
+    if fecha_final and estado not in ESTADOS_CERRADOS:
+        aporte[("vence", fecha_final.isoformat())] += 1
+    return aporte
+
+
+def _mes(momento: Optional[datetime]) -> str:
+    return (momento or datetime.utcnow()).strftime("%Y-%m")
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def sumar(db: Session, model, filas: list, llaves: list, columna: str) -> None:
+    """
+    Upsert `columna = columna + :valor` por llave primaria (SQLite y Postgres);
+    la BD lo resuelve de forma atómica. Sin commit.
+    """
+    if not filas:
+        return
+    stmt = _insert(db)(model).values(filas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=llaves,
+        set_={columna: getattr(model, columna) + getattr(stmt.excluded, columna)},
+    )
+    db.execute(stmt)
+
+
+def aplicar(db: Session, entidad: str, deltas: Dict[Clave, int]) -> None:
+    """Suma los deltas de una entidad en un solo upsert (sin commit)."""
+    filas = [
+        {"entidad": entidad, "metrica": metrica, "clave": clave, "valor": delta}
+        for (metrica, clave), delta in deltas.items() if delta
+    ]
+    if not filas:
+        return
+    E = models.Estadistica
+    sumar(db, E, filas, [E.entidad, E.metrica, E.clave], "valor")
+    if any(f["valor"] < 0 for f in filas):
+        db.query(E).filter(E.entidad == entidad, E.valor <= 0).delete(synchronize_session=False)
+
+
+def plan_cambiado(db: Session, entidad: str,
+                  antes: Optional[Tuple[Optional[str], Optional[date]]],
+                  despues: Optional[Tuple[Optional[str], Optional[date]]]) -> None:
+    """
+    Registra que un plan pasó de `antes` a `despues` ((estado, fecha_final);
+    None = no existía / ya no existe).
+    """
+    deltas = Counter()
+    if despues is not None:
+        deltas.update(_aporte_plan(*despues))
+    if antes is not None:
+        deltas.subtract(_aporte_plan(*antes))
+    aplicar(db, entidad, deltas)
+
+
+def seguimientos(db: Session, entidad: str, creados: Iterable[Optional[datetime]], signo: int = 1) -> None:
+    """Suma (signo=1) o resta (signo=-1) seguimientos por su mes de creación."""
+    deltas = Counter()
+    for momento in creados:
+        deltas[("seguimientos_mes", _mes(momento))] += signo
+    aplicar(db, entidad, deltas)
+
+
+def _mes_sql(db: Session, col):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(col, "YYYY-MM")
+    return func.strftime("%Y-%m", col)
+
+
+def planes_quitados(db: Session, planes: Iterable[Tuple[str, Optional[str], Optional[date]]]) -> None:
+    """Resta varios planes (entidad, estado, fecha_final) con un upsert por entidad."""
+    por_entidad: Dict[str, Counter] = defaultdict(Counter)
+    for entidad, estado, fecha_final in planes:
+        por_entidad[entidad].subtract(_aporte_plan(estado, fecha_final))
+    for entidad, deltas in por_entidad.items():
+        aplicar(db, entidad, deltas)
+
+
+def seguimientos_de_planes(db: Session, plan_ids: Iterable[int], signo: int = -1) -> None:
+    """Como seguimientos(), pero para todos los de esos planes con un GROUP BY (sin traer filas)."""
+    P, S = models.PlanAccion, models.Seguimiento
+    mes = _mes_sql(db, S.created_at)
+    por_entidad: Dict[str, Counter] = defaultdict(Counter)
+    for entidad, m, n in (
+        db.query(P.nombre_entidad, mes, func.count(S.id))
+        .join(P, S.plan_id == P.id)
+        .filter(P.id.in_(list(plan_ids)))
+        .group_by(P.nombre_entidad, mes)
+    ):
+        por_entidad[entidad][("seguimientos_mes", m or _mes(None))] += signo * n
+    for entidad, deltas in por_entidad.items():
+        aplicar(db, entidad, deltas)
+
+
+def reconstruir(db: Session) -> int:
+    """Borra y recalcula toda la tabla con tres GROUP BY (sin commit). Devuelve filas."""
+    P, S, E = models.PlanAccion, models.Seguimiento, models.Estadistica
+    conteo: Dict[Tuple[str, str, str], int] = Counter()
+    vigente = P.deleted_at.is_(None)  # los de la papelera ya se descontaron
+
+    for entidad, estado, n in (
+        db.query(P.nombre_entidad, P.estado, func.count(P.id)).filter(vigente)
+        .group_by(P.nombre_entidad, P.estado)
+    ):
+        conteo[(entidad, "estado", estado or SIN_ESTADO)] += n
+
+    abiertos = P.estado.is_(None) | P.estado.notin_(ESTADOS_CERRADOS)
+    for entidad, fecha, n in (
+        db.query(P.nombre_entidad, cast(P.fecha_final, String), func.count(P.id))
+        .filter(P.fecha_final.isnot(None), abiertos, vigente)
+        .group_by(P.nombre_entidad, P.fecha_final)
+    ):
+        conteo[(entidad, "vence", str(fecha)[:10])] += n
+
+    mes = _mes_sql(db, S.created_at)
+    for entidad, m, n in (
+        db.query(P.nombre_entidad, mes, func.count(S.id))
+        .join(P, S.plan_id == P.id)
+        .filter(vigente)
+        .group_by(P.nombre_entidad, mes)
+    ):
+        conteo[(entidad, "seguimientos_mes", m or _mes(None))] += n
+
+    db.query(E).delete(synchronize_session=False)
+    if conteo:
+        db.bulk_insert_mappings(E, [
+            {"entidad": e, "metrica": m, "clave": c, "valor": v} for (e, m, c), v in conteo.items()
+        ])
+    return len(conteo)
+
+
+def resumen(db: Session, entidad: Optional[str] = None, hoy: Optional[date] = None) -> dict:
+    """Tablero a partir de una sola lectura de `estadisticas`."""
+    E = models.Estadistica
+    hoy_iso = (hoy or date.today()).isoformat()
+    query = db.query(E.entidad, E.metrica, E.clave, E.valor)
+    if entidad:
+        query = query.filter(func.lower(E.entidad) == entidad.strip().lower())
+
+    por_entidad: Dict[str, dict] = {}
+    meses: Counter = Counter()
+    for ent, metrica, clave, valor in query:
+        fila = por_entidad.setdefault(ent, {"entidad": ent, "planes": 0, "por_estado": {}, "vencidos": 0})
+        if metrica == "estado":
+            fila["por_estado"][clave] = valor
+            fila["planes"] += valor
+        elif metrica == "vence" and clave < hoy_iso:
+            fila["vencidos"] += valor
+        elif metrica == "seguimientos_mes":
+            fila.setdefault("seguimientos_por_mes", {})[clave] = valor
+            meses[clave] += valor
+
+    entidades = sorted(por_entidad.values(), key=lambda f: f["entidad"])
+    por_estado: Counter = Counter()
+    for f in entidades:
+        por_estado.update(f["por_estado"])
+        f.setdefault("seguimientos_por_mes", {})
+    return {
+        "fecha": hoy_iso,
+        "totales": {
+            "planes": sum(f["planes"] for f in entidades),
+            "vencidos": sum(f["vencidos"] for f in entidades),
+            "por_estado": dict(por_estado),
+        },
+        "seguimientos_por_mes": dict(sorted(meses.items())),
+        "entidades": entidades,
+    }
@@ -0,0 +1,93 @@
+"""
+Pub/sub en proceso para los cambios de planes y seguimientos.
+
+Las rutas de escritura (síncronas, en el threadpool) publican después del
+commit; cada conexión SSE se suscribe con un callback que pasa el evento a su
+event loop. Se guardan los últimos eventos para reanudar con Last-Event-ID.
+
+Es por proceso: con varios workers/instancias cada uno ve solo sus
+escrituras, y el cliente debe tratar `resync` como "vuelve a pedir la lista".
+"""
+
+import itertools
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Eventos que se recuerdan para reconexiones (Last-Event-ID)
+EVENTS_BUFFER = int(os.getenv("EVENTS_BUFFER", "500"))
+
+# Identifica el proceso: un Last-Event-ID de otro arranque no se puede reanudar
+_BOOT = uuid.uuid4().hex[:8]
+
+
+class EventBus:
+    def __init__(self, buffer: int = EVENTS_BUFFER):
+        self._lock = threading.Lock()
+        self._subs: Dict[int, Callable[[dict], None]] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._recientes: deque = deque(maxlen=buffer)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> int:
+        with self._lock:
+            token = next(self._ids)
+            self._subs[token] = callback
+            return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            self._subs.pop(token, None)
+
+    @property
+    def suscriptores(self) -> int:
+        return len(self._subs)
+
+    def publish(self, tipo: str, **datos) -> dict:
+        with self._lock:
+            evento = {
+                "id": f"{_BOOT}:{next(self._seq)}",
+                "tipo": tipo,
+                "at": datetime.utcnow().isoformat(),
+                **datos,
+            }
+            self._recientes.append(evento)
+            callbacks = list(self._subs.values())
+        for cb in callbacks:
+            try:
+                cb(evento)
+            except Exception as e:  # un suscriptor roto no afecta a la escritura
+                print(f"[WARN] events: suscriptor falló: {e}")
+        return evento
+
+    def desde(self, last_id: str) -> Optional[List[dict]]:
+        """
+        Eventos posteriores a `last_id`; None si ya no están en el buffer (o el
+        id es de otro arranque) y el cliente debe resincronizar.
+        """
+        boot, _, seq = (last_id or "").partition(":")
+        if boot != _BOOT or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._lock:
+            recientes = list(self._recientes)
+        if recientes and int(recientes[0]["id"].split(":")[1]) > seq + 1:
+            return None
+        return [e for e in recientes if int(e["id"].split(":")[1]) > seq]
+
+
+bus = EventBus()
+
+
+def publicar_plan(tipo: str, plan, **extra) -> None:
+    """Atajo para las rutas de planes/seguimientos (llamar después del commit)."""
+    bus.publish(
+        tipo,
+        plan_id=plan.id,
+        nombre_entidad=plan.nombre_entidad,
+        estado=plan.estado,
+        **extra,
+    )
@@ -0,0 +1,108 @@
+"""
+Referencias entre seguimientos y evidencias almacenadas por contenido.
+
+Las URLs de evidencia terminan en /<sha256><ext>; al guardar un seguimiento se
+extraen los digests de `evidencia_cumplimiento` y se sincroniza la tabla
+seguimiento_evidencia. Un blob sin filas en esa tabla es basura recolectable.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+DIGEST_RE = re.compile(r"/([0-9a-f]{64})(?:\.[A-Za-z0-9]{1,5})?(?![0-9a-f])")
+
+EXTENSIONES = {
+    "application/pdf": ".pdf",
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "application/vnd.ms-excel": ".xls",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
+    "text/csv": ".csv",
+    "application/zip": ".zip",
+    "application/x-zip-compressed": ".zip",
+    "application/x-rar-compressed": ".rar",
+    "application/x-7z-compressed": ".7z",
+}
+
+
+def digests_en(texto: Optional[str]) -> set[str]:
+    return set(DIGEST_RE.findall(texto or ""))
+
+
+def sincronizar_seguimiento(db: Session, seg: models.Seguimiento) -> None:
+    """Deja las referencias del seguimiento iguales a las URLs que contiene (sin commit)."""
+    nuevos = digests_en(seg.evidencia_cumplimiento)
+    if nuevos:
+        # Solo se enlazan blobs que existen (URLs externas o viejas se ignoran)
+        nuevos = set(db.scalars(
+            select(models.EvidenciaBlob.digest).where(models.EvidenciaBlob.digest.in_(nuevos))
+        ))
+    actuales = set(db.scalars(
+        select(models.SeguimientoEvidencia.digest)
+        .where(models.SeguimientoEvidencia.seguimiento_id == seg.id)
+    ))
+    quitar = actuales - nuevos
+    if quitar:
+        (
+            db.query(models.SeguimientoEvidencia)
+            .filter(
+                models.SeguimientoEvidencia.seguimiento_id == seg.id,
+                models.SeguimientoEvidencia.digest.in_(quitar),
+            )
+            .delete(synchronize_session=False)
+        )
+    for digest in nuevos - actuales:
+        db.add(models.SeguimientoEvidencia(seguimiento_id=seg.id, digest=digest))
+
+
+def desvincular(db: Session, seguimiento_ids) -> None:
+    """Quita las referencias de los seguimientos dados (lista o subconsulta de ids)."""
+    (
+        db.query(models.SeguimientoEvidencia)
+        .filter(models.SeguimientoEvidencia.seguimiento_id.in_(seguimiento_ids))
+        .delete(synchronize_session=False)
+    )
+
+
+def _huerfanos(gracia_horas: int):
+    limite = datetime.utcnow() - timedelta(hours=gracia_horas)
+    referenciado = exists().where(models.SeguimientoEvidencia.digest == models.EvidenciaBlob.digest)
+    return ~referenciado, models.EvidenciaBlob.ultimo_uso_at < limite
+
+
+def blobs_huerfanos(db: Session, gracia_horas: int = 24) -> list[models.EvidenciaBlob]:
+    """
+    Blobs sin referencias y sin uso reciente (una evidencia recién subida aún
+    no se ha guardado en ningún seguimiento).
+    """
+    return db.query(models.EvidenciaBlob).filter(*_huerfanos(gracia_horas)).all()
+
+
+def recolectar(db: Session, borrar: Callable[[str], None], gracia_horas: int = 24,
+               dry_run: bool = False) -> list[str]:
+    """
+    Borra los blobs sin referencias. La fila se elimina primero con la misma
+    condición (por si alguien la enlazó entre tanto) y solo entonces el objeto.
+    """
+    borrados = []
+    for blob in blobs_huerfanos(db, gracia_horas):
+        digest, object_name = blob.digest, blob.object_name
+        if not dry_run:
+            n = (
+                db.query(models.EvidenciaBlob)
+                .filter(models.EvidenciaBlob.digest == digest, *_huerfanos(gracia_horas))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            if not n:
+                continue
+            borrar(object_name)
+        borrados.append(object_name)
+    return borrados
@@ -0,0 +1,173 @@
+"""
+Escritores de CSV y XLSX en streaming.
+
+Ambos consumen un iterador de filas y producen bytes por lotes, de modo que la
+memoria usada no depende del número de filas exportadas.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from typing import Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+# Filas que se acumulan antes de emitir un bloque de bytes
+BATCH_ROWS = 500
+
+# Caracteres de control que no son válidos en XML 1.0
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _texto(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_csv(headers: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """CSV UTF-8 con BOM (Excel lo abre con tildes correctas)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    # El encabezado sale antes de ejecutar la consulta
+    yield ("\ufeff" + buf.getvalue()).encode("utf-8")
+    buf.seek(0); buf.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_texto(v) for v in row])
+        pending += 1
+        if pending >= BATCH_ROWS:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0); buf.truncate()
+            pending = 0
+    if pending:
+        yield buf.getvalue().encode("utf-8")
+
+
+# ---------------- XLSX ----------------
+
+class _Sink(io.RawIOBase):
+    """Destino sin seek: zipfile escribe aquí y nosotros vaciamos lo acumulado."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _workbook(sheet_name: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _col_letter(idx: int) -> str:
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _celda(ref: str, value) -> str:
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = _XML_INVALID.sub("", _texto(value))
+    if not text:
+        return ""
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def stream_xlsx(headers: Sequence[str], rows: Iterable[Sequence], sheet_name: str = "Datos") -> Iterator[bytes]:
+    """
+    XLSX mínimo (una hoja, cadenas en línea) escrito directamente sobre el zip,
+    sin tabla de cadenas compartidas ni hoja completa en memoria.
+    """
+    sink = _Sink()
+    letters = [_col_letter(i) for i in range(len(headers))]
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _workbook(sheet_name))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            head = "".join(_celda(f"{letters[i]}1", h) for i, h in enumerate(headers))
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<sheetData><row r="1">{head}</row>'
+            ).encode("utf-8"))
+            yield sink.take()
+
+            n = 1
+            parts: list[str] = []
+            for row in rows:
+                n += 1
+                cells = "".join(_celda(f"{letters[i]}{n}", v) for i, v in enumerate(row))
+                parts.append(f'<row r="{n}">{cells}</row>')
+                if len(parts) >= BATCH_ROWS:
+                    sheet.write("".join(parts).encode("utf-8"))
+                    parts.clear()
+                    data = sink.take()
+                    if data:
+                        yield data
+            if parts:
+                sheet.write("".join(parts).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield sink.take()
@@ -0,0 +1,71 @@
+"""
+Proyección de campos (`?fields=id,nombre_entidad,estado`) para los listados.
+
+Solo se leen de la BD las columnas pedidas (`load_only`) y la respuesta se
+serializa con un modelo reducido generado a partir del esquema completo; el
+modelo y su TypeAdapter se cachean por combinación de campos.
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel],
+                 siempre: Iterable[str] = ("id",)) -> Optional[Tuple[str, ...]]:
+    """
+    Campos pedidos en orden del esquema (más los de `siempre`); None si no se
+    pidió proyección. Un campo desconocido es un 400, no se ignora en silencio.
+    """
+    if fields is None or not fields.strip():
+        return None
+    pedidos = {f.strip() for f in fields.split(",") if f.strip()}
+    desconocidos = pedidos - set(schema.model_fields)
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos en 'fields': {', '.join(sorted(desconocidos))}",
+        )
+    pedidos |= set(siempre)
+    return tuple(f for f in schema.model_fields if f in pedidos)
+
+
+@lru_cache(maxsize=256)
+def _adapter(schema: Type[BaseModel], campos: Optional[Tuple[str, ...]]) -> TypeAdapter:
+    if campos is None:
+        return TypeAdapter(List[schema])
+    definiciones = {
+        f: (schema.model_fields[f].annotation, schema.model_fields[f].default)
+        for f in campos
+    }
+    parcial = create_model(
+        f"{schema.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True),
+        **definiciones,
+    )
+    return TypeAdapter(List[parcial])
+
+
+def columnas(model, campos: Tuple[str, ...]) -> list:
+    """Atributos de columna del modelo ORM que corresponden a los campos pedidos."""
+    mapeadas = sa_inspect(model).column_attrs.keys()
+    return [getattr(model, c) for c in campos if c in mapeadas]
+
+
+def opcion_load_only(model, campos: Tuple[str, ...]):
+    return load_only(*columnas(model, campos), raiseload=True)
+
+
+def serializar(schema: Type[BaseModel], campos: Optional[Tuple[str, ...]], objetos: list) -> bytes:
+    """JSON de la lista con el esquema completo (campos=None) o el reducido."""
+    adapter = _adapter(schema, campos)
+    return adapter.dump_json(adapter.validate_python(objetos, from_attributes=True))
+
+
+def responder(schema: Type[BaseModel], campos: Tuple[str, ...], objetos: list) -> Response:
+    """Serializa directo a JSON con el modelo reducido (sin pasar por el response_model)."""
+    return Response(content=serializar(schema, campos, objetos), media_type="application/json")
@@ -0,0 +1,130 @@
+"""
+Historial de ediciones de seguimientos (seguimiento_cambios).
+
+Cada escritura agrega una fila en la misma transacción con quién, cuándo, la
+versión resultante y solo los campos que cambiaron: {"campo": [antes, después]}.
+Nunca se actualiza ni se borra una fila del historial.
+
+- Línea de tiempo de un plan: rango por (plan_id, id).
+- Versión pasada de un seguimiento: fila actual + deshacer los cambios con
+  version > n, leídos por rango en (seguimiento_id, version). Así funciona
+  también para seguimientos anteriores al historial, desde la primera edición
+  registrada.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import Integer, insert, literal, select
+from sqlalchemy.orm import Session, joinedload
+
+from app import models
+
+# Columnas del seguimiento que se versionan (las de auditoría no)
+CAMPOS = (
+    "ajuste_de_id", "indicador", "observacion_informe_calidad", "observacion_calidad",
+    "insumo_mejora", "tipo_accion_mejora", "accion_mejora_planteada",
+    "descripcion_actividades", "evidencia_cumplimiento", "fecha_inicio", "fecha_final",
+    "seguimiento", "enlace_entidad",
+)
+
+
+def _json(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return v
+
+
+def diferencias(antes: Dict[str, Any], despues: Dict[str, Any]) -> Dict[str, list]:
+    """Solo los campos versionados de `despues` cuyo valor difiere de `antes`."""
+    cambios = {}
+    for campo, nuevo in despues.items():
+        if campo not in CAMPOS:
+            continue
+        viejo = _json(antes.get(campo))
+        nuevo = _json(nuevo)
+        if viejo != nuevo:
+            cambios[campo] = [viejo, nuevo]
+    return cambios
+
+
+def registrar(db: Session, seg_id: int, plan_id: int, version: int, accion: str,
+              cambios: Dict[str, list], user: Optional[models.User]) -> models.SeguimientoCambio:
+    """
+    Agrega la fila (sin commit). Un guardado sin cambios también queda (con
+    cambios vacíos): la versión subió y la cadena de versiones no debe tener huecos.
+    """
+    fila = models.SeguimientoCambio(
+        seguimiento_id=seg_id,
+        plan_id=plan_id,
+        version=version,
+        accion=accion,
+        cambios=json.dumps(cambios, ensure_ascii=False),
+        user_id=getattr(user, "id", None),
+    )
+    db.add(fila)
+    return fila
+
+
+def registrar_creacion(db: Session, seg: models.Seguimiento, user: Optional[models.User]) -> None:
+    valores = {c: getattr(seg, c) for c in CAMPOS}
+    registrar(db, seg.id, seg.plan_id, seg.version or 1, "creado",
+              diferencias({}, {c: v for c, v in valores.items() if v is not None}), user)
+
+
+def registrar_borrado(db: Session, seg_ids: Iterable[int], plan_id: int,
+                      versiones: Dict[int, int], user: Optional[models.User]) -> None:
+    for seg_id in seg_ids:
+        registrar(db, seg_id, plan_id, versiones.get(seg_id, 1) + 1, "eliminado", {}, user)
+
+
+def registrar_borrado_de_planes(db: Session, plan_ids: Iterable[int], user: Optional[models.User]) -> None:
+    """Un "eliminado" por cada seguimiento de esos planes, con un solo INSERT … SELECT."""
+    S, C = models.Seguimiento, models.SeguimientoCambio
+    filas = select(
+        S.id, S.plan_id, S.version + 1, literal("eliminado"), literal("{}"),
+        literal(getattr(user, "id", None), Integer), literal(datetime.utcnow()),
+    ).where(S.plan_id.in_(list(plan_ids)))
+    db.execute(insert(C).from_select(
+        ["seguimiento_id", "plan_id", "version", "accion", "cambios", "user_id", "created_at"], filas,
+    ))
+
+
+def timeline(db: Session, plan_id: int, desde_id: int = 0, limite: int = 200) -> list:
+    return (
+        db.query(models.SeguimientoCambio)
+        .options(joinedload(models.SeguimientoCambio.user))
+        .filter(models.SeguimientoCambio.plan_id == plan_id, models.SeguimientoCambio.id > desde_id)
+        .order_by(models.SeguimientoCambio.id.asc())
+        .limit(limite)
+        .all()
+    )
+
+
+def cambios_de(db: Session, seg_id: int, desde_version: int = 0) -> list:
+    return (
+        db.query(models.SeguimientoCambio)
+        .filter(models.SeguimientoCambio.seguimiento_id == seg_id,
+                models.SeguimientoCambio.version > desde_version)
+        .order_by(models.SeguimientoCambio.version.asc())
+        .all()
+    )
+
+
+def reconstruir(db: Session, seg: models.Seguimiento, version: int) -> Optional[Dict[str, Any]]:
+    """
+    Campos del seguimiento tal como quedaron en `version`; None si esa versión
+    es anterior a lo que el historial permite reconstruir.
+    """
+    if version >= seg.version:
+        return {c: _json(getattr(seg, c)) for c in CAMPOS}
+    posteriores = cambios_de(db, seg.id, version)
+    # Debe haber una fila por cada versión posterior para poder deshacerlas
+    if [c.version for c in posteriores if c.accion == "actualizado"] != list(range(version + 1, seg.version + 1)):
+        return None
+    valores = {c: _json(getattr(seg, c)) for c in CAMPOS}
+    for cambio in reversed(posteriores):
+        for campo, (antes, _despues) in json.loads(cambio.cambios).items():
+            valores[campo] = antes
+    return valores
@@ -0,0 +1,153 @@
+"""
+Soporte de `Idempotency-Key` para los POST que crean datos.
+
+La fila de idempotency_keys se agrega a la misma transacción que el trabajo:
+si el commit se confirma, quedan ambos; si un reintento concurrente llega a
+confirmar primero, el nuestro choca con la llave primaria, se revierte entero
+y se responde con lo que guardó el otro. No hay estado "en curso" que limpiar.
+
+Uso en una ruta:
+
+    idem: Idempotencia = Depends(idempotencia("cargar_pqrds"))
+    if idem.repetida:
+        return idem.respuesta()
+    ... trabajo sin commit ...
+    idem.registrar(200, resultado)
+    repetida = idem.confirmar()
+    if repetida:
+        return repetida
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import get_current_user
+from app.database import get_db
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+MAX_KEY_LENGTH = 255
+
+
+class Idempotencia:
+    def __init__(self, db: Session, scope: str, key: Optional[str], endpoint: str, request_hash: str):
+        self.db = db
+        self.scope = scope
+        self.key = key
+        self.endpoint = endpoint
+        self.request_hash = request_hash
+        self._fila: Optional[models.IdempotencyKey] = None
+        self.repetida = False
+
+    def _buscar(self) -> None:
+        fila = self.db.query(models.IdempotencyKey).get((self.scope, self.key))
+        if fila is None:
+            return
+        if fila.expires_at <= datetime.utcnow():
+            # Vencida: se reutiliza la misma fila al registrar
+            self._fila = fila
+            return
+        if fila.request_hash != self.request_hash or fila.endpoint != self.endpoint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key ya usada con una solicitud distinta",
+            )
+        self._fila = fila
+        self.repetida = True
+
+    def respuesta(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self._fila.status_code,
+            content=json.loads(self._fila.response),
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    def registrar(self, status_code: int, body: Any) -> None:
+        """Agrega el resultado a la sesión (sin commit): se confirma junto con el trabajo."""
+        if not self.key:
+            return
+        ahora = datetime.utcnow()
+        valores = dict(
+            endpoint=self.endpoint,
+            request_hash=self.request_hash,
+            status_code=status_code,
+            response=json.dumps(body, ensure_ascii=False, default=str),
+            created_at=ahora,
+            expires_at=ahora + timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+        )
+        if self._fila is not None:
+            for k, v in valores.items():
+                setattr(self._fila, k, v)
+        else:
+            self.db.add(models.IdempotencyKey(scope=self.scope, key=self.key, **valores))
+
+    def confirmar(self) -> Optional[JSONResponse]:
+        """
+        Commit del trabajo y la llave. Si otro reintento confirmó antes la
+        misma llave, se revierte todo y se devuelve su respuesta.
+        """
+        try:
+            self.db.commit()
+            return None
+        except IntegrityError:
+            return self.tras_conflicto()
+
+    def tras_conflicto(self) -> JSONResponse:
+        """Revierte tras un IntegrityError y responde con lo que confirmó el otro reintento."""
+        self.db.rollback()
+        if not self.key:
+            raise
+        self._fila = None
+        self._buscar()
+        if not self.repetida:
+            raise
+        return self.respuesta()
+
+
+def _hash_solicitud(request: Request, body: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(request.method.encode())
+    h.update(request.url.path.encode())
+    h.update(b"?" + request.url.query.encode())
+    h.update(b"\n" + body)
+    return h.hexdigest()
+
+
+def idempotencia(endpoint: str):
+    """Dependencia para `endpoint`; sin encabezado Idempotency-Key no hace nada."""
+
+    async def dependencia(
+        request: Request,
+        db: Session = Depends(get_db),
+        user: models.User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    ) -> Idempotencia:
+        key = (idempotency_key or "").strip() or None
+        if key and len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key demasiado larga")
+        body = await request.body()
+        idem = Idempotencia(db, f"u:{user.id}", key, endpoint, _hash_solicitud(request, body))
+        if key:
+            await run_in_threadpool(idem._buscar)
+        return idem
+
+    return dependencia
+
+
+def purgar_vencidas(db: Session) -> int:
+    n = (
+        db.query(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.expires_at < datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return n
@@ -0,0 +1,130 @@
+"""
+Indicadores usados por entidad (GET /seguimiento/indicadores_usados).
+
+Tabla `indicadores_entidad` (entidad, indicador) -> usos: cuántos seguimientos
+de la entidad usan ese indicador. crear/actualizar/eliminar seguimiento (y
+eliminar plan) suman o restan en la misma transacción con el upsert atómico
+de app.estadisticas.sumar; la consulta es una lectura por llave primaria en
+lugar de un DISTINCT sobre seguimiento ⨝ plan_accion.
+
+Entidad e indicador se normalizan en Python (strip / lower) al escribir y al
+leer, así la llave no depende del lower() de cada motor.
+
+Consistencia: python tools/verificar_indicadores.py [--reparar]
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.estadisticas import sumar
+
+
+def clave_entidad(nombre: Optional[str]) -> str:
+    return (nombre or "").strip().lower()
+
+
+def _normalizar(indicador: Optional[str]) -> Optional[str]:
+    valor = (indicador or "").strip()
+    return valor or None
+
+
+def aplicar(db: Session, entidad: str, deltas: Dict[str, int]) -> None:
+    """Suma usos por indicador para una entidad (sin commit)."""
+    I = models.IndicadorEntidad
+    ent = clave_entidad(entidad)
+    filas = [{"entidad": ent, "indicador": ind, "usos": d} for ind, d in deltas.items() if ind and d]
+    if not filas:
+        return
+    sumar(db, I, filas, [I.entidad, I.indicador], "usos")
+    if any(f["usos"] < 0 for f in filas):
+        db.query(I).filter(I.entidad == ent, I.usos <= 0).delete(synchronize_session=False)
+
+
+def cambiar(db: Session, entidad: str, antes: Optional[str], despues: Optional[str]) -> None:
+    """Un seguimiento pasó del indicador `antes` a `despues` (None = sin indicador / no existe)."""
+    antes, despues = _normalizar(antes), _normalizar(despues)
+    if antes == despues:
+        return
+    deltas = Counter()
+    if despues:
+        deltas[despues] += 1
+    if antes:
+        deltas[antes] -= 1
+    aplicar(db, entidad, deltas)
+
+
+def quitar(db: Session, entidad: str, indicadores: Iterable[Optional[str]]) -> None:
+    """Resta un uso por cada indicador (p.ej. al borrar un plan con sus seguimientos)."""
+    deltas = Counter()
+    for ind in indicadores:
+        ind = _normalizar(ind)
+        if ind:
+            deltas[ind] -= 1
+    aplicar(db, entidad, deltas)
+
+
+def quitar_de_planes(db: Session, plan_ids: Iterable[int]) -> None:
+    """Resta los usos de todos los seguimientos de esos planes con un GROUP BY."""
+    S, P = models.Seguimiento, models.PlanAccion
+    por_entidad: Dict[str, Counter] = defaultdict(Counter)
+    for entidad, indicador, n in (
+        db.query(P.nombre_entidad, S.indicador, func.count(S.id))
+        .join(P, S.plan_id == P.id)
+        .filter(P.id.in_(list(plan_ids)), S.indicador.isnot(None))
+        .group_by(P.nombre_entidad, S.indicador)
+    ):
+        ind = _normalizar(indicador)
+        if ind:
+            por_entidad[clave_entidad(entidad)][ind] -= n
+    for entidad, deltas in por_entidad.items():
+        aplicar(db, entidad, deltas)
+
+
+def usados(db: Session, entidad: Optional[str] = None) -> List[str]:
+    """Indicadores con al menos un seguimiento; de una entidad o de todas (None)."""
+    I = models.IndicadorEntidad
+    if entidad is not None:
+        filas = db.query(I.indicador).filter(I.entidad == clave_entidad(entidad), I.usos > 0)
+    else:
+        filas = db.query(I.indicador).filter(I.usos > 0).distinct()
+    return sorted(r[0] for r in filas)
+
+
+def esperado(db: Session) -> Dict[Tuple[str, str], int]:
+    """Usos calculados desde seguimiento ⨝ plan_accion (lo que la tabla debería tener)."""
+    S, P = models.Seguimiento, models.PlanAccion
+    conteo: Dict[Tuple[str, str], int] = Counter()
+    filas = (
+        db.query(P.nombre_entidad, S.indicador, func.count(S.id))
+        .join(P, S.plan_id == P.id)
+        .filter(S.indicador.isnot(None), P.deleted_at.is_(None))
+        .group_by(P.nombre_entidad, S.indicador)
+    )
+    for entidad, indicador, n in filas:
+        ind = _normalizar(indicador)
+        if ind:
+            conteo[(clave_entidad(entidad), ind)] += n
+    return conteo
+
+
+def verificar(db: Session, reparar: bool = False) -> Dict[str, list]:
+    """
+    Compara la tabla con lo esperado. Devuelve las diferencias
+    {"faltan", "sobran", "distintos"}; con reparar=True reescribe la tabla (sin commit).
+    """
+    I = models.IndicadorEntidad
+    debe = esperado(db)
+    hay = {(e, i): u for e, i, u in db.query(I.entidad, I.indicador, I.usos)}
+    diferencias = {
+        "faltan": sorted(k for k in debe if k not in hay),
+        "sobran": sorted(k for k in hay if k not in debe),
+        "distintos": sorted((k, hay[k], debe[k]) for k in debe if k in hay and hay[k] != debe[k]),
+    }
+    if reparar and any(diferencias.values()):
+        db.query(I).delete(synchronize_session=False)
+        db.bulk_insert_mappings(I, [{"entidad": e, "indicador": i, "usos": u} for (e, i), u in debe.items()])
+    return diferencias
@@ -0,0 +1,329 @@
+"""
+Cola de trabajos en segundo plano respaldada por la tabla `jobs`.
+
+- Los routers registran manejadores con @job_handler("tipo").
+- JobManager.enqueue() guarda el trabajo y despierta a un worker del pool.
+- Cada worker reclama el trabajo con un UPDATE condicional (estado='pendiente'),
+  así varios procesos pueden compartir la misma tabla sin ejecutarlo dos veces.
+- Al arrancar se reanudan los trabajos pendientes o interrumpidos.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import en_replica
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "72"))
+# Un trabajo 'en_progreso' sin latido en este tiempo se considera huérfano
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+
+PENDIENTE = "pendiente"
+EN_PROGRESO = "en_progreso"
+COMPLETADO = "completado"
+FALLIDO = "fallido"
+CANCELADO = "cancelado"
+FINALES = (COMPLETADO, FALLIDO, CANCELADO)
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro de un manejador cuando el trabajo fue cancelado."""
+
+
+class JobContext:
+    """Lo que recibe un manejador para reportar progreso y detectar cancelación."""
+
+    def __init__(self, db: Session, job: models.Job):
+        self.db = db
+        self.job = job
+        # Resultado parcial: se conserva si el trabajo se cancela a mitad
+        self.result: Dict[str, Any] = {}
+
+    def progress(self, pct: int) -> None:
+        """Guarda el porcentaje (con commit) y corta si se pidió cancelar."""
+        self.job.progreso = max(0, min(100, int(pct)))
+        self.job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+        self.check_cancel()
+
+    def check_cancel(self) -> None:
+        self.db.refresh(self.job, attribute_names=["cancelar"])
+        if self.job.cancelar:
+            raise JobCancelled()
+
+
+Handler = Callable[[Session, Dict[str, Any], JobContext], Optional[Dict[str, Any]]]
+_HANDLERS: Dict[str, Handler] = {}
+
+
+def job_handler(tipo: str):
+    def register(fn: Handler) -> Handler:
+        _HANDLERS[tipo] = fn
+        return fn
+    return register
+
+
+class JobManager:
+    def __init__(self, workers: int = JOB_WORKERS, session_factory=None):
+        self.workers = workers
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_purge = 0.0
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            return SessionLocal
+        return self._session_factory
+
+    @session_factory.setter
+    def session_factory(self, factory):
+        self._session_factory = factory
+
+    # ---------------- ciclo de vida ----------------
+    def start(self) -> None:
+        """Arranca el pool (idempotente) y reanuda trabajos pendientes."""
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._stop.clear()
+            self._resume()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _resume(self) -> None:
+        """
+        Los trabajos que quedaron 'en_progreso' tras un reinicio (sin latido
+        reciente) vuelven a 'pendiente'; los de otros procesos vivos no se tocan.
+        """
+        limite = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        with self.session_factory() as db:
+            (
+                db.query(models.Job)
+                .filter(models.Job.estado == EN_PROGRESO, models.Job.heartbeat_at < limite)
+                .update({models.Job.estado: PENDIENTE}, synchronize_session=False)
+            )
+            db.commit()
+            for (job_id,) in db.query(models.Job.id).filter(models.Job.estado == PENDIENTE).all():
+                self._queue.put(job_id)
+
+    # ---------------- API ----------------
+    def enqueue(self, db: Session, tipo: str, payload: Dict[str, Any], user: Optional[models.User] = None,
+                antes_de_commit: Optional[Callable[[models.Job], None]] = None) -> models.Job:
+        """
+        Crea y encola el trabajo. `antes_de_commit(job)` corre con el job ya
+        insertado (con id) dentro de la misma transacción.
+        """
+        if tipo not in _HANDLERS:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        if en_replica():
+            # Un GET que encola (p.ej. /exports?segundo_plano=true) trae la sesión de la
+            # réplica: el job se escribe en la primaria, donde lo buscan /jobs y el worker
+            with self.session_factory() as primaria:
+                return self._insertar(primaria, tipo, payload, user, antes_de_commit)
+        return self._insertar(db, tipo, payload, user, antes_de_commit)
+
+    def _insertar(self, db: Session, tipo: str, payload: Dict[str, Any], user: Optional[models.User],
+                  antes_de_commit: Optional[Callable[[models.Job], None]]) -> models.Job:
+        job = models.Job(
+            tipo=tipo,
+            estado=PENDIENTE,
+            payload=json.dumps(payload, default=str),
+            created_by=getattr(user, "id", None),
+        )
+        db.add(job)
+        if antes_de_commit is not None:
+            db.flush()
+            antes_de_commit(job)
+        db.commit(); db.refresh(job)
+        self.start()
+        self._queue.put(job.id)
+        return job
+
+    def cancel(self, db: Session, job: models.Job) -> models.Job:
+        """Un pendiente se cancela en el acto; uno en curso se marca y el worker corta."""
+        if job.estado == PENDIENTE:
+            updated = (
+                db.query(models.Job)
+                .filter(models.Job.id == job.id, models.Job.estado == PENDIENTE)
+                .update(
+                    {models.Job.estado: CANCELADO, models.Job.cancelar: True,
+                     models.Job.finished_at: datetime.utcnow()},
+                    synchronize_session=False,
+                )
+            )
+            if updated:
+                db.commit(); db.refresh(job)
+                return job
+        if job.estado not in FINALES:
+            job.cancelar = True
+            db.commit(); db.refresh(job)
+        return job
+
+    def run_pending(self) -> int:
+        """Ejecuta en el hilo actual todo lo pendiente (CLI y pruebas)."""
+        done = 0
+        while True:
+            with self.session_factory() as db:
+                row = (
+                    db.query(models.Job.id)
+                    .filter(models.Job.estado == PENDIENTE)
+                    .order_by(models.Job.created_at.asc())
+                    .first()
+                )
+            if not row:
+                return done
+            if self._run(row[0]):
+                done += 1
+
+    def purge_expired(self, db: Session) -> int:
+        """Borra trabajos terminados más viejos que JOB_RETENTION_HOURS."""
+        limite = datetime.utcnow() - timedelta(hours=JOB_RETENTION_HOURS)
+        viejos = (
+            db.query(models.Job)
+            .filter(models.Job.estado.in_(FINALES), models.Job.finished_at < limite)
+            .all()
+        )
+        for job in viejos:
+            _borrar_archivo_resultado(job)
+            db.delete(job)
+        db.commit()
+        return len(viejos)
+
+    # ---------------- workers ----------------
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=JOB_POLL_SECONDS)
+            except queue.Empty:
+                job_id = self._next_pending()
+            if job_id is None:
+                self._maybe_purge()
+                continue
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"[WARN] job {job_id} falló fuera del manejador: {e}")
+
+    def _next_pending(self) -> Optional[str]:
+        # Sondeo para trabajos encolados por otro proceso
+        try:
+            with self.session_factory() as db:
+                row = db.query(models.Job.id).filter(models.Job.estado == PENDIENTE).first()
+                return row[0] if row else None
+        except Exception:
+            return None
+
+    def _maybe_purge(self) -> None:
+        if time.monotonic() - self._last_purge < 3600:
+            return
+        self._last_purge = time.monotonic()
+        try:
+            with self.session_factory() as db:
+                self.purge_expired(db)
+                from app.idempotency import purgar_vencidas
+                purgar_vencidas(db)
+                from app.borrado import purgar_papelera
+                purgar_papelera(db)
+        except Exception as e:
+            print(f"[WARN] purga de jobs falló: {e}")
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        updated = (
+            db.query(models.Job)
+            .filter(models.Job.id == job_id, models.Job.estado == PENDIENTE)
+            .update(
+                {models.Job.estado: EN_PROGRESO, models.Job.started_at: datetime.utcnow(),
+                 models.Job.heartbeat_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return updated == 1
+
+    def _run(self, job_id: str) -> bool:
+        with self.session_factory() as db:
+            if not self._claim(db, job_id):
+                return False
+            job = db.query(models.Job).get(job_id)
+            handler = _HANDLERS.get(job.tipo)
+            ctx = JobContext(db, job)
+            try:
+                if handler is None:
+                    raise RuntimeError(f"Sin manejador para '{job.tipo}'")
+                result = handler(db, json.loads(job.payload or "{}"), ctx)
+                job.resultado = json.dumps(result or {}, default=str)
+                job.estado = COMPLETADO
+                job.progreso = 100
+            except JobCancelled:
+                db.rollback()
+                job.resultado = json.dumps(ctx.result, default=str)
+                job.estado = CANCELADO
+            except Exception as e:
+                db.rollback()
+                job.estado = FALLIDO
+                job.error = str(e)[:2000]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return True
+
+
+def _borrar_archivo_resultado(job: models.Job) -> None:
+    try:
+        archivo = json.loads(job.resultado or "{}").get("archivo")
+    except ValueError:
+        archivo = None
+    if archivo:
+        try:
+            os.remove(archivo)
+        except OSError:
+            pass
+
+
+manager = JobManager()
+
+
+def insertar_por_lotes(db: Session, model, rows: list, ctx: Optional[JobContext] = None, lote: int = 1000,
+                       commit: bool = True) -> int:
+    """
+    INSERT masivo por lotes. Dentro de un trabajo cada lote se confirma y
+    reporta progreso; en línea (ctx=None) todo va en una sola transacción.
+    Con commit=False el llamador confirma (p.ej. junto con su Idempotency-Key).
+    """
+    total = len(rows)
+    hechos = 0
+    for i in range(0, total, lote):
+        batch = rows[i:i + lote]
+        if batch:
+            db.execute(insert(model), batch)
+        hechos += len(batch)
+        if ctx is not None:
+            ctx.result["insertados"] = hechos
+            ctx.progress(hechos * 100 // max(total, 1))
+    if commit:
+        db.commit()
+    return hechos
@@ -0,0 +1,39 @@
+"""
+Métricas en formato de texto de Prometheus en GET /metrics.
+
+Cada módulo registra con @colector una función que produce sus líneas; así
+/metrics no necesita conocer a los módulos que miden algo.
+"""
+
+import os
+from typing import Callable, Iterable, List
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+# Si se define, /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+
+_colectores: List[Callable[[], Iterable[str]]] = []
+
+
+def colector(fn: Callable[[], Iterable[str]]) -> Callable[[], Iterable[str]]:
+    _colectores.append(fn)
+    return fn
+
+
+def render() -> str:
+    lineas = []
+    for fn in _colectores:
+        lineas.extend(fn())
+    return "\n".join(lineas) + "\n"
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token inválido")
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
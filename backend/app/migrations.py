@@ -0,0 +1,436 @@
+"""
+Parches de esquema al arrancar (idempotentes, SQLite y PostgreSQL).
+
+aplicar() los corre una sola vez por arranque:
+
+- con gunicorn (gunicorn.conf.py), en el proceso maestro antes de crear los
+  workers; estos heredan MIGRACIONES_APLICADAS=1 y su lifespan no los repite;
+- con `uvicorn app.main:app`, en el lifespan de la app.
+
+En PostgreSQL se toma un advisory lock: si varias instancias arrancan a la vez
+(p.ej. réplicas de Cloud Run) las aplican de a una y las demás solo verifican.
+"""
+
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from app import models
+from app.database import Base, SessionLocal, engine
+from app.deps import seed_users
+from app.estadisticas import reconstruir as reconstruir_estadisticas
+from app.indicadores import verificar as verificar_indicadores
+from app.resumen import recalcular_resumen
+
+ENV_APLICADAS = "MIGRACIONES_APLICADAS"
+# Llave del pg_advisory_lock (cualquier entero fijo de la app)
+_CANDADO_PG = 730_046
+
+
+def _ensure_entidad_perm_column():
+    """Añade users.entidad_perm si falta e inicializa las entidades en 'captura_reportes'."""
+    with engine.begin() as conn:
+        dialect = conn.engine.dialect.name
+        if dialect == "sqlite":
+            rows = conn.execute(text("PRAGMA table_info(users)")).fetchall()
+            # en PRAGMA table_info: row[1] => nombre de columna
+            if not any(r[1] == "entidad_perm" for r in rows):
+                conn.execute(text("ALTER TABLE users ADD COLUMN entidad_perm VARCHAR(32)"))
+                # Inicializa a 'captura_reportes' a las entidades que no tengan valor
+                conn.execute(text("""
+                    UPDATE users
+                    SET entidad_perm = 'captura_reportes'
+                    WHERE role = 'entidad' AND (entidad_perm IS NULL OR entidad_perm = '')
+                """))
+        else:
+            # Postgres / otros
+            res = conn.execute(text("""
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_name = 'users' AND column_name = 'entidad_perm'
+            """)).first()
+            if not res:
+                conn.execute(text('ALTER TABLE "users" ADD COLUMN entidad_perm VARCHAR(32)'))
+                conn.execute(text("""
+                    UPDATE "users"
+                    SET entidad_perm = 'captura_reportes'
+                    WHERE role = 'entidad' AND entidad_perm IS NULL
+                """))
+
+def _ensure_updated_by_column():
+    """Añade updated_by_id si falta (soporta SQLite y PostgreSQL); no rompe si falla."""
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+
+            if dialect == "sqlite":
+                # Detecta si existe 'seguimiento' o 'seguimientos'
+                rows = conn.exec_driver_sql(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type='table' AND name IN ('seguimiento','seguimientos')"
+                ).fetchall()
+                if not rows:
+                    return
+                table = rows[0][0]
+                cols = conn.exec_driver_sql(f"PRAGMA table_info({table});").fetchall()
+                names = {c[1] for c in cols}
+                if "updated_by_id" not in names:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN updated_by_id INTEGER;")
+
+            elif dialect in ("postgresql", "postgres"):
+                # ¿Cuál tabla existe?
+                table = None
+                t1 = conn.execute(text("SELECT to_regclass('public.seguimiento')")).scalar()
+                t2 = conn.execute(text("SELECT to_regclass('public.seguimientos')")).scalar()
+                if t1: table = "seguimiento"
+                elif t2: table = "seguimientos"
+                else:
+                    return
+
+                cols = conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_schema='public' AND table_name=:t
+                """), {"t": table}).fetchall()
+                names = {r[0] for r in cols}
+                if "updated_by_id" not in names:
+                    conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN updated_by_id INTEGER'))
+
+            else:
+                print(f"[WARN] _ensure_updated_by_column: motor {dialect} no soportado; omito parche")
+
+    except Exception as e:
+        # Nunca tumbes el servicio por un parche de conveniencia
+        print(f"[WARN] _ensure_updated_by_column falló: {e}")
+
+def _relax_user_fk_constraints():
+    """
+    Ajusta las FKs que apuntan a users para permitir ON DELETE SET NULL en PostgreSQL.
+    Evita que el borrado de un usuario falle por plan_accion.created_by o seguimiento.updated_by_id.
+    """
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            if dialect not in ("postgresql", "postgres"):
+                return
+
+            # Evitar fallos si las tablas aún no existen (incluye versión plural heredada)
+            plan_table = "plan_accion" if conn.execute(text("SELECT to_regclass('public.plan_accion')")).scalar() else None
+            seg_table = None
+            t1 = conn.execute(text("SELECT to_regclass('public.seguimiento')")).scalar()
+            t2 = conn.execute(text("SELECT to_regclass('public.seguimientos')")).scalar()
+            if t1:
+                seg_table = "seguimiento"
+            elif t2:
+                seg_table = "seguimientos"
+
+            if plan_table:
+                conn.execute(text(f'ALTER TABLE "{plan_table}" ALTER COLUMN created_by DROP NOT NULL'))
+                conn.execute(text(f"""
+                    DO $$ DECLARE constr_name text;
+                    BEGIN
+                        SELECT tc.constraint_name INTO constr_name
+                        FROM information_schema.table_constraints tc
+                        JOIN information_schema.constraint_column_usage ccu
+                          ON tc.constraint_name = ccu.constraint_name
+                        WHERE tc.table_schema='public'
+                          AND tc.table_name='{plan_table}'
+                          AND ccu.column_name='created_by'
+                          AND tc.constraint_type='FOREIGN KEY'
+                        LIMIT 1;
+                        IF constr_name IS NOT NULL THEN
+                            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', '{plan_table}', constr_name);
+                        END IF;
+                    END$$;
+                """))
+                conn.execute(text(f"""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1
+                            FROM information_schema.table_constraints
+                            WHERE table_schema='public'
+                              AND table_name='{plan_table}'
+                              AND constraint_name='plan_accion_created_by_fkey'
+                        ) THEN
+                            ALTER TABLE "{plan_table}"
+                            ADD CONSTRAINT plan_accion_created_by_fkey
+                            FOREIGN KEY (created_by) REFERENCES "users"(id) ON DELETE SET NULL;
+                        END IF;
+                    END$$;
+                """))
+
+            if seg_table:
+                conn.execute(text(f'ALTER TABLE "{seg_table}" ALTER COLUMN updated_by_id DROP NOT NULL'))
+                conn.execute(text(f"""
+                    DO $$ DECLARE constr_name text;
+                    BEGIN
+                        SELECT tc.constraint_name INTO constr_name
+                        FROM information_schema.table_constraints tc
+                        JOIN information_schema.constraint_column_usage ccu
+                          ON tc.constraint_name = ccu.constraint_name
+                        WHERE tc.table_schema='public'
+                          AND tc.table_name='{seg_table}'
+                          AND ccu.column_name='updated_by_id'
+                          AND tc.constraint_type='FOREIGN KEY'
+                        LIMIT 1;
+                        IF constr_name IS NOT NULL THEN
+                            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', '{seg_table}', constr_name);
+                        END IF;
+                    END$$;
+                """))
+                conn.execute(text(f"""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1
+                            FROM information_schema.table_constraints
+                            WHERE table_schema='public'
+                              AND table_name='{seg_table}'
+                              AND constraint_name='seguimiento_updated_by_id_fkey'
+                        ) THEN
+                            ALTER TABLE "{seg_table}"
+                            ADD CONSTRAINT seguimiento_updated_by_id_fkey
+                            FOREIGN KEY (updated_by_id) REFERENCES "users"(id) ON DELETE SET NULL;
+                        END IF;
+                    END$$;
+                """))
+    except Exception as e:
+        print(f"[WARN] _relax_user_fk_constraints falló: {e}")
+
+def _ensure_entidad_auditor_column():
+    """Añade users.entidad_auditor si falta (SQLite y PostgreSQL)."""
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            if dialect == "sqlite":
+                rows = conn.execute(text("PRAGMA table_info(users)")).fetchall()
+                names = {r[1] for r in rows}
+                if "entidad_auditor" not in names:
+                    conn.execute(text("ALTER TABLE users ADD COLUMN entidad_auditor BOOLEAN DEFAULT 0"))
+                    conn.execute(text("""
+                        UPDATE users
+                        SET entidad_auditor = 0
+                        WHERE entidad_auditor IS NULL
+                    """))
+            else:
+                res = conn.execute(text("""
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_name = 'users' AND column_name = 'entidad_auditor'
+                """)).first()
+                if not res:
+                    conn.execute(text('ALTER TABLE "users" ADD COLUMN entidad_auditor BOOLEAN DEFAULT FALSE'))
+                    conn.execute(text("""
+                        UPDATE "users"
+                        SET entidad_auditor = FALSE
+                        WHERE entidad_auditor IS NULL
+                    """))
+    except Exception as e:
+        print(f"[WARN] _ensure_entidad_auditor_column falló: {e}")
+
+_PLAN_RESUMEN_COLUMNS = {
+    "num_seguimientos": "INTEGER NOT NULL DEFAULT 0",
+    "ultimo_seguimiento_at": "TIMESTAMP",
+    "ultimo_seguimiento_estado": "VARCHAR(255)",
+    "ultimo_seguimiento_por_id": "INTEGER REFERENCES users(id) ON DELETE SET NULL",
+}
+
+def _ensure_plan_resumen_columns():
+    """
+    Añade a plan_accion las columnas de resumen de seguimientos si faltan y,
+    en ese caso, las rellena una vez. También los índices seguimiento(plan_id)
+    y seguimiento(ajuste_de_id).
+    """
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            if dialect == "sqlite":
+                names = {r[1] for r in conn.execute(text("PRAGMA table_info(plan_accion)")).fetchall()}
+            else:
+                names = {r[0] for r in conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = 'plan_accion'
+                """)).fetchall()}
+            faltan = [c for c in _PLAN_RESUMEN_COLUMNS if c not in names]
+            for col in faltan:
+                conn.execute(text(f"ALTER TABLE plan_accion ADD COLUMN {col} {_PLAN_RESUMEN_COLUMNS[col]}"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_seguimiento_plan_id ON seguimiento (plan_id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_seguimiento_ajuste_de_id ON seguimiento (ajuste_de_id)"))
+        if faltan:
+            with SessionLocal() as db:
+                recalcular_resumen(db)
+                db.commit()
+    except Exception as e:
+        print(f"[WARN] _ensure_plan_resumen_columns falló: {e}")
+
+def _ensure_version_columns():
+    """Columna `version` (concurrencia optimista) en plan_accion y seguimiento."""
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            for tabla in ("plan_accion", "seguimiento"):
+                if dialect == "sqlite":
+                    names = {r[1] for r in conn.execute(text(f"PRAGMA table_info({tabla})")).fetchall()}
+                else:
+                    names = {r[0] for r in conn.execute(text("""
+                        SELECT column_name
+                        FROM information_schema.columns
+                        WHERE table_name = :t
+                    """), {"t": tabla}).fetchall()}
+                if "version" not in names:
+                    conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    except Exception as e:
+        print(f"[WARN] _ensure_version_columns falló: {e}")
+
+# (tabla, columna, referencia, acción ON DELETE, código en pg_constraint.confdeltype)
+_FK_BORRADO = (
+    ("seguimiento", "plan_id", "plan_accion", "CASCADE", "c"),
+    ("seguimiento", "ajuste_de_id", "seguimiento", "SET NULL", "n"),
+)
+
+def _ensure_borrado_en_cascada():
+    """
+    Columna plan_accion.deleted_at (papelera) y, en PostgreSQL, las FKs de
+    seguimiento con ON DELETE CASCADE / SET NULL para que borrar un plan sea un
+    solo DELETE (app/borrado.py). En SQLite las FKs de tablas ya creadas no se
+    pueden cambiar: app/borrado.py borra los hijos explícitamente si faltan.
+    """
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            if dialect == "sqlite":
+                names = {r[1] for r in conn.execute(text("PRAGMA table_info(plan_accion)")).fetchall()}
+            else:
+                names = {r[0] for r in conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = 'plan_accion'
+                """)).fetchall()}
+            if "deleted_at" not in names:
+                tipo = "DATETIME" if dialect == "sqlite" else "TIMESTAMP"
+                conn.execute(text(f"ALTER TABLE plan_accion ADD COLUMN deleted_at {tipo}"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_plan_accion_deleted_at ON plan_accion (deleted_at)"))
+            if dialect not in ("postgresql", "postgres"):
+                return
+            for tabla, columna, ref, accion, codigo in _FK_BORRADO:
+                fks = conn.execute(text("""
+                    SELECT c.conname, c.confdeltype
+                    FROM pg_constraint c
+                    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+                    WHERE c.contype = 'f' AND c.conrelid = CAST(:t AS regclass) AND a.attname = :c
+                """), {"t": tabla, "c": columna}).fetchall()
+                if fks and all(f[1] == codigo for f in fks):
+                    continue
+                for nombre, _ in fks:
+                    conn.execute(text(f'ALTER TABLE "{tabla}" DROP CONSTRAINT "{nombre}"'))
+                conn.execute(text(f"""
+                    ALTER TABLE "{tabla}" ADD CONSTRAINT {tabla}_{columna}_fkey
+                    FOREIGN KEY ({columna}) REFERENCES "{ref}"(id) ON DELETE {accion}
+                """))
+    except Exception as e:
+        print(f"[WARN] _ensure_borrado_en_cascada falló: {e}")
+
+def _ensure_estadisticas():
+    """La primera vez (tabla vacía con planes existentes) calcula las estadísticas del tablero."""
+    try:
+        with SessionLocal() as db:
+            if db.query(models.Estadistica).first() is None and db.query(models.PlanAccion.id).first() is not None:
+                reconstruir_estadisticas(db)
+                db.commit()
+    except Exception as e:
+        print(f"[WARN] _ensure_estadisticas falló: {e}")
+
+def _ensure_indicadores():
+    """La primera vez (tabla vacía con seguimientos) llena indicadores_entidad."""
+    try:
+        with SessionLocal() as db:
+            if db.query(models.IndicadorEntidad).first() is None and db.query(models.Seguimiento.id).first() is not None:
+                verificar_indicadores(db, reparar=True)
+                db.commit()
+    except Exception as e:
+        print(f"[WARN] _ensure_indicadores falló: {e}")
+
+def _ensure_pqrds_por_periodo():
+    """
+    Índice en pqrds.fecha_ingreso. Convertir `pqrds` en particionada (PostgreSQL)
+    reescribe la tabla: no se hace al arrancar sino con
+    `python tools/archivar_pqrds.py --convertir`.
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_pqrds_fecha_ingreso ON pqrds (fecha_ingreso)"))
+    except Exception as e:
+        print(f"[WARN] _ensure_pqrds_por_periodo falló: {e}")
+
+def _normalize_legacy_roles():
+    """Normaliza roles legacy en la tabla users."""
+    try:
+        with engine.begin() as conn:
+            dialect = conn.engine.dialect.name
+            if dialect == "sqlite":
+                conn.execute(text("""
+                    UPDATE users
+                    SET role = 'entidad',
+                        entidad_auditor = 1
+                    WHERE role = 'entidad_evaluador'
+                """))
+            else:
+                conn.execute(text("""
+                    UPDATE "users"
+                    SET role = 'entidad',
+                        entidad_auditor = TRUE
+                    WHERE role = 'entidad_evaluador'
+                """))
+    except Exception as e:
+        print(f"[WARN] _normalize_legacy_roles falló: {e}")
+
+
+PASOS = (
+    _ensure_updated_by_column,
+    _relax_user_fk_constraints,
+    _ensure_entidad_perm_column,
+    _ensure_entidad_auditor_column,
+    _normalize_legacy_roles,
+    _ensure_borrado_en_cascada,
+    _ensure_plan_resumen_columns,
+    _ensure_version_columns,
+    _ensure_estadisticas,
+    _ensure_indicadores,
+    _ensure_pqrds_por_periodo,
+)
+
+
+@contextmanager
+def _candado():
+    """Serializa las migraciones entre procesos (solo PostgreSQL; SQLite es un único archivo local)."""
+    if engine.dialect.name not in ("postgresql", "postgres"):
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _CANDADO_PG})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _CANDADO_PG})
+
+
+def aplicar() -> bool:
+    """Crea tablas, corre PASOS y (con SEED_ON_START=true) los usuarios demo. False si ya se hizo."""
+    if os.getenv(ENV_APLICADAS) == "1":
+        return False
+    with _candado():
+        Base.metadata.create_all(bind=engine)
+        for paso in PASOS:
+            try:
+                paso()
+            except Exception as e:
+                print(f"[WARN] {paso.__name__} falló: {e}")
+        if os.getenv("SEED_ON_START", "false").lower() == "true":
+            with SessionLocal() as db:
+                seed_users(db)
+    os.environ[ENV_APLICADAS] = "1"
+    print(f"[INFO] Migraciones aplicadas (pid {os.getpid()})")
+    return True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, DateTime, Boolean, select
+from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, DateTime, Boolean, Index, select
 from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
@@ -47,19 +47,30 @@ class PlanAccion(Base):
     
     criterio = Column(String(255), nullable=True) 
     aprobado_evaluador = Column(String(50), nullable=True)
+    # Resumen de seguimientos (lo mantiene app/resumen.py; reparar con tools/recalcular_resumen.py)
+    num_seguimientos = Column(Integer, nullable=False, default=0, server_default="0")
+    ultimo_seguimiento_at = Column(DateTime, nullable=True)
+    ultimo_seguimiento_estado = Column(String(255), nullable=True)
+    ultimo_seguimiento_por_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # Concurrencia optimista (app/versiones.py): sube en cada escritura
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Papelera (app/borrado.py): marcado como borrado; la purga lo elimina después
+    deleted_at = Column(DateTime, nullable=True, index=True)
+    # Los hijos los borra la BD (ON DELETE CASCADE): no se cargan en la sesión
     seguimientos = relationship(
         "Seguimiento",
         back_populates="plan",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 class Seguimiento(Base):
     __tablename__ = "seguimiento"
     id = Column(Integer, primary_key=True)
-    ajuste_de_id = Column(Integer, ForeignKey("seguimiento.id"), nullable=True)
+    ajuste_de_id = Column(Integer, ForeignKey("seguimiento.id", ondelete="SET NULL"), nullable=True, index=True)
     indicador = Column(String, nullable=True)
     observacion_informe_calidad = Column(Text, nullable=True)
-    plan_id = Column(Integer, ForeignKey("plan_accion.id"), nullable=False)
+    plan_id = Column(Integer, ForeignKey("plan_accion.id", ondelete="CASCADE"), nullable=False, index=True)
     
     updated_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     updated_by = relationship("User", foreign_keys=[updated_by_id])
@@ -79,6 +90,7 @@ class Seguimiento(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     @property
     def updated_by_email(self) -> str | None:
@@ -106,7 +118,8 @@ class PQRD(Base):
     tipo_gestion = Column(String(255), nullable=False)
     dependencia = Column(String(255), nullable=False)
     entidad = Column(String(255), nullable=False)
-    fecha_ingreso = Column(Date, nullable=False)
+    # Llave de partición en PostgreSQL (ver app/pqrd_particiones.py)
+    fecha_ingreso = Column(Date, nullable=False, index=True)
     periodo = Column(String(50), nullable=True)
 
 # Clase de habilidades
@@ -122,6 +135,90 @@ class Habilidad(Base):
     pct_habilidades_socioemocionales = Column(Integer)
     num_capacitados_socioemocionales = Column(Integer)
 
+# Evidencias: cada contenido se guarda una sola vez bajo su sha256
+class EvidenciaBlob(Base):
+    __tablename__ = "evidencia_blob"
+    digest = Column(String(64), primary_key=True)
+    object_name = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=True)
+    size = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Se renueva en cada subida repetida; la recolección respeta un periodo de gracia
+    ultimo_uso_at = Column(DateTime, default=datetime.utcnow)
+
+# Referencias seguimiento -> blob (el conteo de filas es el contador de referencias)
+class SeguimientoEvidencia(Base):
+    __tablename__ = "seguimiento_evidencia"
+    seguimiento_id = Column(Integer, ForeignKey("seguimiento.id", ondelete="CASCADE"), primary_key=True)
+    digest = Column(String(64), ForeignKey("evidencia_blob.digest"), primary_key=True, index=True)
+
+# Historial de ediciones de seguimientos (solo se agrega; ver app/historial.py).
+# Sin FK a seguimiento a propósito: el historial sobrevive al borrado.
+class SeguimientoCambio(Base):
+    __tablename__ = "seguimiento_cambios"
+    id = Column(Integer, primary_key=True)
+    seguimiento_id = Column(Integer, nullable=False)
+    plan_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)          # versión resultante
+    accion = Column(String(20), nullable=False)        # creado | actualizado | eliminado
+    cambios = Column(Text, nullable=False, default="{}")  # {"campo": [antes, después]}
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    user = relationship("User", foreign_keys=[user_id])
+
+    @property
+    def user_email(self) -> str | None:
+        return self.user.email if self.user else None
+
+    __table_args__ = (
+        Index("ix_seguimiento_cambios_seg_version", "seguimiento_id", "version"),
+        Index("ix_seguimiento_cambios_plan_id", "plan_id", "id"),
+    )
+
+# Contadores del tablero por entidad (ver app/estadisticas.py)
+class Estadistica(Base):
+    __tablename__ = "estadisticas"
+    entidad = Column(String(255), primary_key=True)
+    metrica = Column(String(30), primary_key=True)     # estado | vence | seguimientos_mes
+    clave = Column(String(100), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+
+# Indicadores con al menos un seguimiento, por entidad (ver app/indicadores.py)
+class IndicadorEntidad(Base):
+    __tablename__ = "indicadores_entidad"
+    entidad = Column(String(255), primary_key=True)    # nombre_entidad en minúsculas y sin espacios extremos
+    indicador = Column(String(255), primary_key=True)  # indicador sin espacios extremos
+    usos = Column(Integer, nullable=False, default=0)  # seguimientos que lo usan
+
+# Trabajos en segundo plano (cargas masivas, exportaciones grandes)
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    tipo = Column(String(50), nullable=False)
+    estado = Column(String(20), nullable=False, default="pendiente", index=True)
+    progreso = Column(Integer, nullable=False, default=0)
+    payload = Column(Text, nullable=True)      # JSON de entrada
+    resultado = Column(Text, nullable=True)    # JSON de salida
+    error = Column(Text, nullable=True)
+    cancelar = Column(Boolean, nullable=False, default=False)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# Idempotency-Key: resultado guardado en la misma transacción que el trabajo
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    scope = Column(String(64), primary_key=True)        # "u:<user_id>"
+    key = Column(String(255), primary_key=True)
+    endpoint = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response = Column(Text, nullable=False)             # JSON de la respuesta
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
 @hybrid_property
 def updated_by_email(self):
     return self.updated_by.email if self.updated_by else None
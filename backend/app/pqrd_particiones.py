@@ -0,0 +1,253 @@
+"""
+PQRDs por periodo de fecha_ingreso (tabla que solo crece).
+
+PostgreSQL: `pqrds` es una tabla particionada por rango de fecha_ingreso, con
+una partición por año o por mes (PQRD_PARTICION=anio|mes; "no" la deja como
+tabla simple) llamadas pqrds_p2024 / pqrds_p2024_03. Las particiones que falten
+se crean antes de cada carga (asegurar) y, con desde/hasta (filtrar), el
+planificador solo lee las que tocan el rango. La tabla existente se convierte
+una vez, a mano: python tools/archivar_pqrds.py --convertir.
+
+SQLite no tiene particiones: `pqrds` es la tabla caliente, con índice en
+fecha_ingreso, y desprender un periodo mueve sus filas a una tabla de archivo
+pqrds_p2024 con las mismas columnas (el equivalente a DETACH PARTITION).
+
+Archivo (tools/archivar_pqrds.py): los periodos fríos se desprenden, se
+vuelcan a pqrds_p2024.csv.gz y se borra su tabla; restaurar() los reinserta.
+La purga anual (DELETE /pqrds?antes=…) borra particiones completas con DROP en
+lugar de fila por fila.
+"""
+
+import csv
+import gzip
+import os
+import pathlib
+import re
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.orm import Session
+
+from app import models
+
+PQRD_PARTICION = os.getenv("PQRD_PARTICION", "anio").strip().lower()
+# Llave del pg_advisory_xact_lock que serializa la creación de particiones
+_CANDADO_PG = 730_050
+
+COLUMNAS = ("id", "label", "tipo_gestion", "dependencia", "entidad", "fecha_ingreso", "periodo")
+_NOMBRE = re.compile(r"^pqrds_p(\d{4})(?:_(\d{2}))?$")
+
+Periodo = Tuple[str, date, date]  # (tabla, inicio, fin)
+
+
+def _es_pg(db: Session) -> bool:
+    return db.get_bind().dialect.name in ("postgresql", "postgres")
+
+
+def periodo(fecha: date, grano: Optional[str] = None) -> Periodo:
+    """Partición (nombre, [inicio, fin)) a la que pertenece una fecha."""
+    if (grano or PQRD_PARTICION) == "mes":
+        inicio = date(fecha.year, fecha.month, 1)
+        fin = date(fecha.year + fecha.month // 12, fecha.month % 12 + 1, 1)
+        return f"pqrds_p{inicio.year}_{inicio.month:02d}", inicio, fin
+    return f"pqrds_p{fecha.year}", date(fecha.year, 1, 1), date(fecha.year + 1, 1, 1)
+
+
+def _de_nombre(nombre: str) -> Optional[Periodo]:
+    m = _NOMBRE.match(nombre)
+    if not m:
+        return None
+    anio, mes = int(m.group(1)), m.group(2)
+    return periodo(date(anio, int(mes) if mes else 1, 1), "mes" if mes else "anio")
+
+
+def particionada(db: Session) -> bool:
+    if not _es_pg(db):
+        return False
+    return db.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('pqrds')")).scalar() == "p"
+
+
+def particiones(db: Session) -> List[Periodo]:
+    """Particiones adjuntas a `pqrds` (solo PostgreSQL particionado)."""
+    if not particionada(db):
+        return []
+    nombres = db.execute(text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('pqrds')
+    """)).scalars()
+    return sorted(p for p in map(_de_nombre, nombres) if p)
+
+
+def desprendidas(db: Session) -> List[str]:
+    """Tablas de periodos fuera de `pqrds` (desprendidas y aún sin volcar a archivo)."""
+    adjuntas = {n for n, _, _ in particiones(db)}
+    return sorted(n for n in inspect(db.connection()).get_table_names() if _NOMBRE.match(n) and n not in adjuntas)
+
+
+def _crear_particion(db: Session, padre: str, nombre: str, inicio: date, fin: date) -> None:
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {nombre} PARTITION OF {padre} "
+        f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+    ))
+
+
+def asegurar(db: Session, fechas: Iterable[date]) -> int:
+    """
+    Crea las particiones que falten para estas fechas antes de insertarlas. Un
+    periodo desprendido que vuelve a recibir filas se adjunta de nuevo.
+    Fuera de PostgreSQL particionado no hace nada.
+
+    Dos cargas concurrentes para un periodo nuevo no chocan: si falta alguna
+    partición se toma un candado de transacción y se vuelve a leer el catálogo
+    antes de crear o adjuntar.
+    """
+    if PQRD_PARTICION == "no" or not particionada(db):
+        return 0
+    fechas = sorted({f for f in fechas if f})
+    adjuntas = particiones(db)
+    if all(any(ini <= f < fin for _, ini, fin in adjuntas) for f in fechas):
+        return 0
+    db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _CANDADO_PG})
+    adjuntas = particiones(db)
+    sueltas = set(desprendidas(db))
+    creadas = 0
+    for fecha in fechas:
+        if any(ini <= fecha < fin for _, ini, fin in adjuntas):
+            continue
+        nombre, inicio, fin = periodo(fecha)
+        if nombre in sueltas:
+            db.execute(text(
+                f"ALTER TABLE pqrds ATTACH PARTITION {nombre} "
+                f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+            ))
+        else:
+            _crear_particion(db, "pqrds", nombre, inicio, fin)
+        adjuntas.append((nombre, inicio, fin))
+        creadas += 1
+    return creadas
+
+
+def filtrar(query, desde: Optional[date] = None, hasta: Optional[date] = None):
+    """Rango [desde, hasta) de fecha_ingreso; en PostgreSQL poda las particiones fuera del rango."""
+    if desde is not None:
+        query = query.filter(models.PQRD.fecha_ingreso >= desde)
+    if hasta is not None:
+        query = query.filter(models.PQRD.fecha_ingreso < hasta)
+    return query
+
+
+def convertir(db: Session) -> bool:
+    """
+    Convierte `pqrds` en tabla particionada (PostgreSQL, una vez): crea la
+    nueva con PK (id, fecha_ingreso), una partición por periodo existente,
+    copia las filas y conserva la secuencia de ids. Bloquea `pqrds` mientras
+    copia. Se invoca a mano (tools/archivar_pqrds.py --convertir); el llamador
+    confirma.
+    """
+    if PQRD_PARTICION == "no" or not _es_pg(db) or particionada(db):
+        return False
+    db.execute(text("LOCK TABLE pqrds IN ACCESS EXCLUSIVE MODE"))
+    db.execute(text("""
+        CREATE TABLE pqrds_particionada (LIKE pqrds INCLUDING DEFAULTS, PRIMARY KEY (id, fecha_ingreso))
+        PARTITION BY RANGE (fecha_ingreso)
+    """))
+    fechas = db.execute(text("SELECT DISTINCT fecha_ingreso FROM pqrds")).scalars()
+    for nombre, inicio, fin in sorted({periodo(f) for f in fechas}):
+        _crear_particion(db, "pqrds_particionada", nombre, inicio, fin)
+    db.execute(text("INSERT INTO pqrds_particionada SELECT * FROM pqrds"))
+    secuencia = db.execute(text("SELECT pg_get_serial_sequence('pqrds', 'id')")).scalar()
+    if secuencia:
+        db.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY pqrds_particionada.id"))
+    db.execute(text("DROP TABLE pqrds"))
+    db.execute(text("ALTER TABLE pqrds_particionada RENAME TO pqrds"))
+    db.execute(text("CREATE INDEX IF NOT EXISTS ix_pqrds_fecha_ingreso ON pqrds (fecha_ingreso)"))
+    db.execute(text("CREATE INDEX IF NOT EXISTS ix_pqrds_id ON pqrds (id)"))
+    return True
+
+
+def _periodos_antes(db: Session, antes: date) -> List[Periodo]:
+    """Periodos completos anteriores a `antes` con filas en `pqrds`."""
+    if particionada(db):
+        return [p for p in particiones(db) if p[2] <= antes]
+    fechas = db.execute(
+        text("SELECT DISTINCT fecha_ingreso FROM pqrds WHERE fecha_ingreso < :antes"), {"antes": antes}
+    ).scalars()
+    # SQLite devuelve las fechas de un text() como cadenas ISO
+    fechas = {date.fromisoformat(f) if isinstance(f, str) else f for f in fechas}
+    return sorted(p for p in {periodo(f) for f in fechas} if p[2] <= antes)
+
+
+def desprender(db: Session, antes: date) -> List[str]:
+    """
+    Saca de `pqrds` los periodos completos anteriores a `antes` (DETACH
+    PARTITION en PostgreSQL; en SQLite mueve las filas a la tabla del periodo).
+    Dejan de verse en la API. Devuelve las tablas; el llamador confirma.
+    """
+    pg = particionada(db)
+    tablas = []
+    for nombre, inicio, fin in _periodos_antes(db, antes):
+        if pg:
+            db.execute(text(f"ALTER TABLE pqrds DETACH PARTITION {nombre}"))
+        else:
+            rango = {"i": inicio, "f": fin}
+            filtro = "FROM pqrds WHERE fecha_ingreso >= :i AND fecha_ingreso < :f"
+            if nombre in desprendidas(db):
+                db.execute(text(f"INSERT INTO {nombre} SELECT * {filtro}"), rango)
+            else:
+                db.execute(text(f"CREATE TABLE {nombre} AS SELECT * {filtro}"), rango)
+            db.execute(text(f"DELETE {filtro}"), rango)
+        tablas.append(nombre)
+    return tablas
+
+
+def exportar(db: Session, nombre: str, carpeta: pathlib.Path) -> Tuple[pathlib.Path, int]:
+    """Vuelca una tabla desprendida a <carpeta>/<nombre>.csv.gz y la borra. El llamador confirma."""
+    if nombre not in desprendidas(db):
+        raise ValueError(f"{nombre} no es un periodo desprendido")
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"{nombre}.csv.gz"
+    filas = 0
+    resultado = db.connection().execution_options(stream_results=True).execute(
+        text(f"SELECT {', '.join(COLUMNAS)} FROM {nombre} ORDER BY id")
+    )
+    with gzip.open(ruta, "wt", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNAS)
+        for fila in resultado:
+            w.writerow(["" if v is None else v for v in fila])
+            filas += 1
+    db.execute(text(f"DROP TABLE {nombre}"))
+    return ruta, filas
+
+
+def restaurar(db: Session, ruta: pathlib.Path, lote: int = 1000) -> int:
+    """Reinserta en `pqrds` (con sus ids) un periodo volcado por exportar(). El llamador confirma."""
+    with gzip.open(ruta, "rt", newline="", encoding="utf-8") as f:
+        filas = [
+            {
+                **{k: (v or None) for k, v in fila.items()},
+                "id": int(fila["id"]),
+                "fecha_ingreso": date.fromisoformat(fila["fecha_ingreso"]),
+            }
+            for fila in csv.DictReader(f)
+        ]
+    asegurar(db, {fila["fecha_ingreso"] for fila in filas})
+    for i in range(0, len(filas), lote):
+        db.execute(insert(models.PQRD), filas[i:i + lote])
+    return len(filas)
+
+
+def purgar_antes(db: Session, antes: date) -> int:
+    """
+    Borra los PQRD con fecha_ingreso < antes. En PostgreSQL particionado las
+    particiones completas se eliminan con DROP TABLE (sin recorrer filas) y
+    solo el resto del rango se borra con DELETE. El llamador confirma.
+    """
+    total = 0
+    if particionada(db):
+        for nombre, _, _ in _periodos_antes(db, antes):
+            total += db.execute(text(f"SELECT count(*) FROM {nombre}")).scalar()
+            db.execute(text(f"DROP TABLE {nombre}"))
+    total += db.query(models.PQRD).filter(models.PQRD.fecha_ingreso < antes).delete(synchronize_session=False)
+    return total
@@ -0,0 +1,251 @@
+"""
+Límite de tasa por usuario y por entidad (token bucket), por grupo de rutas.
+
+- La llave sale de los claims del JWT (uid, entidad) verificado con la firma;
+  sin token válido se usa la IP del cliente: la del socket o, detrás de
+  RATELIMIT_TRUSTED_PROXIES proxies (Cloud Run / balanceador de Google = 1),
+  la que el proxy más lejano añadió a X-Forwarded-For. Los valores a la
+  izquierda los pone el cliente y no se usan.
+- Cada petición consume de dos cubetas: la del usuario y la de su entidad
+  (cuota de usuario × RATELIMIT_ENTIDAD_FACTOR), para que un script de una
+  entidad no agote la capacidad del resto.
+- Almacén en proceso por defecto; con REDIS_URL se comparte entre instancias
+  (RedisStore acepta cualquier cliente con `eval`, p.ej. un sustituto en pruebas).
+- Respuestas con RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset y,
+  al rechazar, 429 con Retry-After.
+
+Cuotas: RATELIMIT_<GRUPO>="rafaga,por_minuto" (grupos de app.admission.clasificar).
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+from app.admission import clasificar
+from app.config import JWT_ALGORITHM, JWT_SECRET
+from app.metrics import colector
+from app.seguridad import TokenInvalido, decodificar_token
+
+RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+RATELIMIT_ENTIDAD_FACTOR = float(os.getenv("RATELIMIT_ENTIDAD_FACTOR", "3"))
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+# Proxies propios delante de la app que añaden la IP a X-Forwarded-For (0: usar el socket)
+RATELIMIT_TRUSTED_PROXIES = int(os.getenv("RATELIMIT_TRUSTED_PROXIES", "0"))
+
+# (ráfaga, recarga por minuto)
+_DEFAULTS: Dict[str, Tuple[int, int]] = {
+    "auth": (30, 30),
+    "lecturas": (120, 600),
+    "escrituras": (60, 240),
+    "masivas": (5, 10),
+    "subidas": (20, 60),
+}
+
+
+def _cuota(grupo: str) -> Tuple[int, float]:
+    raw = os.getenv(f"RATELIMIT_{grupo.upper()}", "")
+    try:
+        rafaga, por_minuto = (int(x) for x in raw.split(","))
+    except ValueError:
+        rafaga, por_minuto = _DEFAULTS[grupo]
+    return rafaga, por_minuto / 60.0
+
+
+# ---------------- Almacenes ----------------
+class MemoryStore:
+    """Cubetas en un dict del proceso (una instancia / un worker)."""
+
+    MAX_KEYS = 50_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cubetas: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, capacidad: int, tasa: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        """Intenta consumir 1 token; devuelve (permitido, tokens que quedan)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, ts = self._cubetas.get(key, (float(capacidad), now))
+            tokens = min(float(capacidad), tokens + (now - ts) * tasa)
+            permitido = tokens >= 1
+            if permitido:
+                tokens -= 1
+            if len(self._cubetas) >= self.MAX_KEYS and key not in self._cubetas:
+                self._purgar(now)
+            self._cubetas[key] = (tokens, now)
+            return permitido, tokens
+
+    def _purgar(self, now: float) -> None:
+        # Una cubeta inactiva más de 10 min ya estaría llena: se puede olvidar
+        viejas = [k for k, (_, ts) in self._cubetas.items() if now - ts > 600]
+        for k in viejas:
+            del self._cubetas[k]
+
+
+_LUA_TOKEN_BUCKET = """
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(b[1]) or cap
+local ts = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + (now - ts) * rate)
+local ok = 0
+if tokens >= 1 then tokens = tokens - 1; ok = 1 end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(cap / rate) + 1)
+return {ok, tostring(tokens)}
+"""
+
+
+class RedisStore:
+    """Cubetas compartidas: el script Lua hace leer-recargar-consumir de forma atómica."""
+
+    def __init__(self, client, prefix: str = "rl:"):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key: str, capacidad: int, tasa: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        ok, tokens = self.client.eval(_LUA_TOKEN_BUCKET, 1, self.prefix + key, capacidad, tasa, now)
+        return bool(int(ok)), float(tokens)
+
+
+def _store_por_defecto():
+    if REDIS_URL:
+        try:
+            import redis  # opcional: pip install redis
+            return RedisStore(redis.Redis.from_url(REDIS_URL))
+        except Exception as e:
+            print(f"[WARN] ratelimit: REDIS_URL definido pero no se pudo usar Redis ({e}); uso memoria")
+    return MemoryStore()
+
+
+# ---------------- Identidad ----------------
+def _cliente_ip(scope) -> str:
+    """
+    IP del cliente. Cada proxy añade a la derecha la IP de quien le habló, así
+    que con N proxies de confianza la buena es la N-ésima desde la derecha; si
+    el encabezado trae menos valores (petición que no pasó por ellos) se usa el socket.
+    """
+    if RATELIMIT_TRUSTED_PROXIES > 0:
+        valores = []
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                valores += [v.strip() for v in value.decode("latin-1").split(",") if v.strip()]
+        if len(valores) >= RATELIMIT_TRUSTED_PROXIES:
+            return valores[-RATELIMIT_TRUSTED_PROXIES]
+    client = scope.get("client")
+    return client[0] if client else "desconocido"
+
+
+def identidad(scope) -> Tuple[str, Optional[str]]:
+    """(llave de usuario, llave de entidad o None) según el JWT o la IP."""
+    auth = None
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            auth = value.decode("latin-1")
+            break
+    token = auth[7:] if auth and auth.lower().startswith("bearer ") else None
+    if token is None:
+        # EventSource y descargas envían el token por query
+        for part in scope.get("query_string", b"").decode("latin-1").split("&"):
+            if part.startswith("access_token="):
+                token = part[len("access_token="):]
+    if token:
+        try:
+            claims = decodificar_token(token, JWT_SECRET, [JWT_ALGORITHM])
+            uid = claims.get("uid")
+            if uid is not None:
+                entidad = (claims.get("entidad") or "").strip().lower()
+                return f"u:{uid}", (f"e:{entidad}" if entidad else None)
+        except TokenInvalido:
+            pass
+    return f"ip:{_cliente_ip(scope)}", None
+
+
+# ---------------- Middleware ----------------
+class RateLimiter:
+    def __init__(self, store=None):
+        self.store = store or _store_por_defecto()
+        self.rechazos: Dict[str, int] = {}
+
+    def check(self, grupo: str, scope) -> Tuple[bool, int, int, int]:
+        """(permitido, límite, restantes, segundos hasta recuperar) para la petición."""
+        rafaga, tasa = _cuota(grupo)
+        usuario, entidad = identidad(scope)
+        ok, quedan = self.store.take(f"{grupo}:{usuario}", rafaga, tasa)
+        limite = rafaga
+        if ok and entidad:
+            cap_ent = max(1, int(rafaga * RATELIMIT_ENTIDAD_FACTOR))
+            ok_ent, quedan_ent = self.store.take(f"{grupo}:{entidad}", cap_ent, tasa * RATELIMIT_ENTIDAD_FACTOR)
+            # Se informa la cubeta más cercana a agotarse
+            if not ok_ent or quedan_ent / cap_ent < quedan / rafaga:
+                ok, quedan, limite, tasa = ok_ent, quedan_ent, cap_ent, tasa * RATELIMIT_ENTIDAD_FACTOR
+        if ok:
+            reset = math.ceil((limite - quedan) / tasa) if tasa else 0
+        else:
+            reset = math.ceil((1 - quedan) / tasa) if tasa else 60
+            self.rechazos[grupo] = self.rechazos.get(grupo, 0) + 1
+        return ok, limite, int(quedan), max(reset, 1 if not ok else 0)
+
+
+limiter = RateLimiter()
+
+
+def reset_rate_limits(store=None) -> None:
+    """Vacía las cubetas (pruebas) o cambia el almacén."""
+    limiter.store = store or MemoryStore()
+    limiter.rechazos.clear()
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = RATELIMIT_ENABLED if enabled is None else enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        grupo = clasificar(scope["method"], scope["path"])
+        if grupo is None:
+            return await self.app(scope, receive, send)
+
+        ok, limite, quedan, reset = limiter.check(grupo, scope)
+        headers = [
+            (b"ratelimit-limit", str(limite).encode()),
+            (b"ratelimit-remaining", str(quedan).encode()),
+            (b"ratelimit-reset", str(reset).encode()),
+        ]
+        if not ok:
+            body = json.dumps({"detail": "Demasiadas solicitudes, intente más tarde"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(reset).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_con_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_con_headers)
+
+
+@colector
+def _metricas():
+    yield "# HELP ratelimit_rejected_total Peticiones rechazadas con 429 por grupo."
+    yield "# TYPE ratelimit_rejected_total counter"
+    for grupo, n in sorted(limiter.rechazos.items()):
+        yield f'ratelimit_rejected_total{{grupo="{grupo}"}} {n}'
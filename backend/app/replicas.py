@@ -0,0 +1,124 @@
+"""
+Enrutado de lecturas a la réplica (REPLICA_DATABASE_URL, ver app/database.py).
+
+- GET/HEAD van a la réplica; el resto, a la primaria. Así los reportes y
+  listados pesados no compiten con la captura de las entidades.
+- Lee-lo-que-escribiste: tras una escritura exitosa, las lecturas de ese mismo
+  usuario (JWT uid, o IP sin token) van a la primaria durante
+  REPLICA_STICKY_SECONDS, lo que debe cubrir el retraso de replicación.
+- Rutas cuyo estado cambia sin escritura del usuario (p.ej. /jobs, que avanza
+  el worker de fondo) siempre leen de la primaria.
+- La marca vive en el proceso; con REDIS_URL se comparte entre workers e
+  instancias (como las cuotas de app/ratelimit.py).
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from app import database
+from app.metrics import colector
+from app.ratelimit import REDIS_URL, identidad
+
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+_LECTURAS = ("GET", "HEAD")
+_SIEMPRE_PRIMARIA = ("/jobs",)
+
+
+class MemoriaPegajosa:
+    """Usuario -> instante hasta el que lee de la primaria (un proceso)."""
+
+    MAX_KEYS = 50_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hasta: Dict[str, float] = {}
+
+    def marcar(self, key: str, segundos: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if len(self._hasta) >= self.MAX_KEYS:
+                self._hasta = {k: t for k, t in self._hasta.items() if t > now}
+            self._hasta[key] = now + segundos
+
+    def activa(self, key: str, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        hasta = self._hasta.get(key)
+        return hasta is not None and hasta > now
+
+
+class RedisPegajosa:
+    """La marca es una llave con expiración: la ven todos los workers."""
+
+    def __init__(self, client, prefix: str = "rw:"):
+        self.client = client
+        self.prefix = prefix
+
+    def marcar(self, key: str, segundos: float, now: Optional[float] = None) -> None:
+        self.client.set(self.prefix + key, 1, px=max(1, int(segundos * 1000)))
+
+    def activa(self, key: str, now: Optional[float] = None) -> bool:
+        return bool(self.client.exists(self.prefix + key))
+
+
+def _store_por_defecto():
+    if REDIS_URL:
+        try:
+            import redis  # opcional: pip install redis
+            return RedisPegajosa(redis.Redis.from_url(REDIS_URL))
+        except Exception as e:
+            print(f"[WARN] replicas: REDIS_URL definido pero no se pudo usar Redis ({e}); uso memoria")
+    return MemoriaPegajosa()
+
+
+pegajosa = _store_por_defecto()
+lecturas: Dict[str, int] = {"replica": 0, "primaria": 0}
+
+
+def destino(method: str, path: str, usuario: str) -> str:
+    if method not in _LECTURAS or path.startswith(_SIEMPRE_PRIMARIA):
+        return "primaria"
+    return "primaria" if pegajosa.activa(usuario) else "replica"
+
+
+class ReplicaMiddleware:
+    """Fija database.destino_lectura por petición; no hace nada sin réplica configurada."""
+
+    def __init__(self, app, segundos: Optional[float] = None):
+        self.app = app
+        self.segundos = REPLICA_STICKY_SECONDS if segundos is None else segundos
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or database.SessionReplica is None:
+            return await self.app(scope, receive, send)
+
+        usuario, _ = identidad(scope)
+        elegido = destino(scope["method"], scope["path"], usuario)
+
+        async def send_marcando(message):
+            # Antes de que el cliente reciba la respuesta y pueda volver a leer
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pegajosa.marcar(usuario, self.segundos)
+            await send(message)
+
+        token = database.destino_lectura.set(elegido)
+        try:
+            if scope["method"] in _LECTURAS:
+                lecturas[elegido] += 1
+                await self.app(scope, receive, send)
+            else:
+                await self.app(scope, receive, send_marcando)
+        finally:
+            database.destino_lectura.reset(token)
+
+
+@colector
+def _metricas():
+    if database.SessionReplica is None:
+        return
+    yield "# HELP db_lecturas_total Peticiones GET/HEAD por base de datos que las atendió."
+    yield "# TYPE db_lecturas_total counter"
+    for nombre, n in sorted(lecturas.items()):
+        yield f'db_lecturas_total{{destino="{nombre}"}} {n}'
@@ -0,0 +1,50 @@
+"""
+Resumen de seguimientos guardado en plan_accion.
+
+num_seguimientos, ultimo_seguimiento_at, ultimo_seguimiento_estado y
+ultimo_seguimiento_por_id se recalculan con un solo UPDATE con subconsultas
+correlacionadas (índice seguimiento.plan_id). Recalcular en lugar de sumar/restar
+evita que dos escrituras concurrentes dejen el contador desfasado.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def _ultimo(col):
+    S, P = models.Seguimiento, models.PlanAccion
+    return (
+        select(col)
+        .where(S.plan_id == P.id)
+        .order_by(S.updated_at.desc(), S.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def recalcular_resumen(db: Session, plan_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula el resumen de los planes dados (todos si plan_ids es None) dentro
+    de la transacción actual; no hace commit. Devuelve las filas afectadas.
+    """
+    S, P = models.Seguimiento, models.PlanAccion
+    db.flush()  # la sesión no hace autoflush: el UPDATE debe ver los cambios pendientes
+    stmt = update(P).values(
+        num_seguimientos=select(func.count(S.id)).where(S.plan_id == P.id).scalar_subquery(),
+        ultimo_seguimiento_at=_ultimo(S.updated_at),
+        ultimo_seguimiento_estado=_ultimo(S.seguimiento),
+        ultimo_seguimiento_por_id=_ultimo(S.updated_by_id),
+        # El resumen no es una edición del plan: se conserva su updated_at
+        updated_at=P.updated_at,
+    )
+    if plan_ids is not None:
+        plan_ids = list(plan_ids)
+        if not plan_ids:
+            return 0
+        stmt = stmt.where(P.id.in_(plan_ids))
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
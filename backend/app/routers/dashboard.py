@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app import models
+from app.auth import get_current_user
+from app.estadisticas import resumen
+from app.scoping import entidad_restringida
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/resumen")
+@router.get("/resumen/")
+def resumen_tablero(
+    entidad: Optional[str] = Query(None, description="Solo esta entidad"),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    """
+    Planes por estado y entidad, planes vencidos (fecha_final pasada y no
+    aprobados) y seguimientos por mes, leídos de la tabla `estadisticas`.
+    """
+    # Un usuario de entidad solo ve la suya, pida lo que pida
+    entidad = entidad_restringida(user) or entidad
+    return resumen(db, entidad)
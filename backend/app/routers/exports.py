@@ -0,0 +1,224 @@
+import os
+from datetime import date
+from typing import Iterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app import models
+from app.auth import get_current_user
+from app.exporters import stream_csv, stream_xlsx
+from app.jobs import job_handler, manager as job_manager
+from app.scoping import filtrar_planes_por_entidad
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Filas que el cursor trae por viaje a la BD
+YIELD_PER = 500
+
+# Exportaciones en segundo plano: fuera de /uploads (no son públicas)
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+Formato = Literal["csv", "xlsx"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+PLAN_COLUMNS = [
+    "id", "num_plan_mejora", "nombre_entidad", "estado", "indicador", "criterio",
+    "insumo_mejora", "tipo_accion_mejora", "accion_mejora_planteada",
+    "observacion_informe_calidad", "descripcion_actividades", "evidencia_cumplimiento",
+    "fecha_inicio", "fecha_final", "seguimiento", "enlace_entidad",
+    "observacion_calidad", "aprobado_evaluador", "updated_at",
+]
+
+SEGUIMIENTO_COLUMNS = [
+    "id", "plan_id", "ajuste_de_id", "indicador", "insumo_mejora", "tipo_accion_mejora",
+    "accion_mejora_planteada", "descripcion_actividades", "evidencia_cumplimiento",
+    "observacion_informe_calidad", "observacion_calidad", "fecha_inicio", "fecha_final",
+    "seguimiento", "enlace_entidad", "created_at", "updated_at",
+]
+
+
+def _rows(db: Session, query) -> Iterator[tuple]:
+    """
+    Recorre la consulta con un cursor del servidor (yield_per) y cierra la
+    sesión al terminar: el streaming sigue después de que la dependencia retorna.
+    """
+    try:
+        for row in query.execution_options(yield_per=YIELD_PER, stream_results=True):
+            yield tuple(row)
+    finally:
+        db.close()
+
+
+def _stream(formato: str, headers: list[str], rows: Iterator[tuple], nombre: str) -> StreamingResponse:
+    body = stream_csv(headers, rows) if formato == "csv" else stream_xlsx(headers, rows, sheet_name=nombre)
+    filename = f"{nombre}_{date.today().isoformat()}.{formato}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _planes_query(db: Session, user: models.User, q=None, estado=None, indicador=None,
+                  fecha_desde=None, fecha_hasta=None):
+    query = filtrar_planes_por_entidad(db.query(models.PlanAccion), user)
+    if q:
+        query = query.filter(models.PlanAccion.nombre_entidad.ilike(f"%{q}%"))
+    if estado:
+        query = query.filter(models.PlanAccion.estado == estado)
+    if indicador:
+        query = query.filter(models.PlanAccion.indicador == indicador)
+    if fecha_desde:
+        query = query.filter(models.PlanAccion.fecha_final >= fecha_desde)
+    if fecha_hasta:
+        query = query.filter(models.PlanAccion.fecha_inicio <= fecha_hasta)
+    return query
+
+
+def consulta_planes(db: Session, user: models.User, **filtros):
+    """Encabezados y consulta (solo columnas) de la exportación de planes."""
+    cols = [getattr(models.PlanAccion, c) for c in PLAN_COLUMNS]
+    query = _planes_query(db, user, **filtros).with_entities(*cols).order_by(models.PlanAccion.id.asc())
+    return PLAN_COLUMNS, query
+
+
+def consulta_seguimientos(db: Session, user: models.User, plan_id=None, q=None, estado=None,
+                          indicador=None, fecha_desde=None, fecha_hasta=None):
+    """Encabezados y consulta (solo columnas) de la exportación de seguimientos."""
+    query = _planes_query(db, user, q=q, estado=estado)
+    query = query.join(models.Seguimiento, models.Seguimiento.plan_id == models.PlanAccion.id)
+    query = query.outerjoin(models.User, models.Seguimiento.updated_by_id == models.User.id)
+    if plan_id is not None:
+        query = query.filter(models.Seguimiento.plan_id == plan_id)
+    if indicador:
+        query = query.filter(models.Seguimiento.indicador == indicador)
+    if fecha_desde:
+        query = query.filter(models.Seguimiento.fecha_final >= fecha_desde)
+    if fecha_hasta:
+        query = query.filter(models.Seguimiento.fecha_inicio <= fecha_hasta)
+
+    cols = [getattr(models.Seguimiento, c) for c in SEGUIMIENTO_COLUMNS]
+    query = query.with_entities(
+        *cols, models.PlanAccion.nombre_entidad, models.User.email
+    ).order_by(models.Seguimiento.plan_id.asc(), models.Seguimiento.id.asc())
+    return SEGUIMIENTO_COLUMNS + ["nombre_entidad", "updated_by_email"], query
+
+
+CONSULTAS = {"planes": consulta_planes, "seguimientos": consulta_seguimientos}
+
+
+def _por_lotes(query, key_col, ctx, total: int):
+    """
+    Paginación por llave (id > último) en lugar de un cursor abierto: así el
+    trabajo puede confirmar su progreso entre lotes sin invalidar la lectura.
+    """
+    query = query.order_by(None).order_by(key_col.asc())
+    ultimo, vistos = None, 0
+    while True:
+        lote = (query if ultimo is None else query.filter(key_col > ultimo)).limit(YIELD_PER).all()
+        if not lote:
+            return
+        for row in lote:
+            yield tuple(row)
+        vistos += len(lote)
+        ultimo = lote[-1][0]
+        ctx.result["filas"] = vistos
+        ctx.progress(vistos * 100 // max(total, 1))
+
+
+@job_handler("exportar")
+def _job_exportar(db: Session, payload: dict, ctx):
+    """Exportación a archivo para descargarla luego desde /jobs/{id}/descarga."""
+    recurso, formato = payload["recurso"], payload["formato"]
+    user = db.query(models.User).get(payload["user_id"])
+    if not user:
+        raise RuntimeError("Usuario del trabajo no existe")
+    filtros = dict(payload.get("filtros") or {})
+    for k in ("fecha_desde", "fecha_hasta"):
+        if filtros.get(k):
+            filtros[k] = date.fromisoformat(filtros[k])
+
+    headers, query = CONSULTAS[recurso](db, user, **filtros)
+    key_col = models.PlanAccion.id if recurso == "planes" else models.Seguimiento.id
+    total = query.order_by(None).count()
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    filename = f"{recurso}_{date.today().isoformat()}.{formato}"
+    path = os.path.join(EXPORT_DIR, f"{ctx.job.id}.{formato}")
+
+    rows = _por_lotes(query, key_col, ctx, total)
+    body = stream_csv(headers, rows) if formato == "csv" else stream_xlsx(headers, rows, sheet_name=recurso)
+    try:
+        with open(path, "wb") as fh:
+            for chunk in body:
+                fh.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {"archivo": path, "filename": filename, "media_type": MEDIA_TYPES[formato], "filas": total}
+
+
+def _encolar(db: Session, user: models.User, recurso: str, formato: str, filtros: dict, response: Response):
+    payload = {"recurso": recurso, "formato": formato, "user_id": user.id,
+               "filtros": {k: v for k, v in filtros.items() if v is not None}}
+    job = job_manager.enqueue(db, "exportar", payload, user)
+    response.status_code = 202
+    return {"job_id": job.id, "estado": job.estado}
+
+
+@router.get("/planes")
+@router.get("/planes/")
+def exportar_planes(
+    response: Response,
+    formato: Formato = "csv",
+    q: Optional[str] = None,
+    estado: Optional[str] = None,
+    indicador: Optional[str] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    segundo_plano: bool = False,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    filtros = dict(q=q, estado=estado, indicador=indicador, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
+    if segundo_plano:
+        return _encolar(db, user, "planes", formato, filtros, response)
+    headers, query = consulta_planes(db, user, **filtros)
+    return _stream(formato, headers, _rows(db, query), "planes")
+
+
+@router.get("/seguimientos")
+@router.get("/seguimientos/")
+def exportar_seguimientos(
+    response: Response,
+    formato: Formato = "csv",
+    plan_id: Optional[int] = None,
+    q: Optional[str] = None,
+    estado: Optional[str] = None,
+    indicador: Optional[str] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    segundo_plano: bool = False,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    # Fuera del alcance del usuario también es 404: no revela que el plan existe
+    if plan_id is not None and not filtrar_planes_por_entidad(db.query(models.PlanAccion.id), user).filter(
+        models.PlanAccion.id == plan_id
+    ).first():
+        raise HTTPException(status_code=404, detail="Plan no encontrado")
+
+    filtros = dict(plan_id=plan_id, q=q, estado=estado, indicador=indicador,
+                   fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
+    if segundo_plano:
+        return _encolar(db, user, "seguimientos", formato, filtros, response)
+    headers, query = consulta_seguimientos(db, user, **filtros)
+    return _stream(formato, headers, _rows(db, query), "seguimientos")
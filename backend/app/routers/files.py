@@ -1,14 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Optional
+import hashlib
 import os
-import shutil
-import uuid
 import pathlib
 
-try:
-    from google.cloud import storage  # requirements.txt: google-cloud-storage
-except Exception:  
-    storage = None
+from app.database import get_db
+from app import models
+from app.evidencias import EXTENSIONES
+from app.storage import BASE_DIR, GCS_BUCKET, StorageUnavailable, get_storage
+from app.uploads import MultipartStream, SNIFF_BYTES, sniff_mime
 
 MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "5"))
 MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
@@ -29,77 +33,161 @@ ALLOWED_MIMES = {
     "application/x-7z-compressed",
 }
 
-# Local filesystem (fallback)
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
-EVIDENCE_SUBDIR = os.getenv("EVIDENCE_SUBDIR", "evidence")
-BASE_DIR = pathlib.Path(UPLOAD_DIR) / EVIDENCE_SUBDIR
-BASE_DIR.mkdir(parents=True, exist_ok=True)
-
-# GCS 
-GCS_BUCKET = os.getenv("GCS_BUCKET", "").strip()
-GCS_PREFIX = os.getenv("GCS_PREFIX", "evidence/").lstrip("/")
+# Local filesystem (fallback): /uploads se monta sobre este directorio
+if not GCS_BUCKET:
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
-async def upload_evidence(file: UploadFile = File(...)) -> Dict[str, str]:
-    # 1) Validación de tipo MIME
-    if file.content_type not in ALLOWED_MIMES:
-        raise HTTPException(
-            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            detail="Formatos permitidos: imágenes (JPG, PNG, GIF), PDF, Excel (XLS/XLSX/CSV) y comprimidos (ZIP, RAR, 7Z)",
-        )
-    
+# Margen para los encabezados multipart al validar Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+MIME_ERROR = "Formatos permitidos: imágenes (JPG, PNG, GIF), PDF, Excel (XLS/XLSX/CSV) y comprimidos (ZIP, RAR, 7Z)"
+
+# El cuerpo se lee a mano (streaming); se documenta el formulario para Swagger
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"El archivo supera el límite de {MAX_UPLOAD_MB} MB."
+    )
+
+
+class _HashingDest:
+    """
+    Calcula el sha256 mientras los bytes pasan hacia la subida del backend.
+    Cada escritura se hace en el threadpool: el event loop sigue atendiendo
+    otras peticiones mientras el disco o GCS reciben el archivo.
+    """
+
+    def __init__(self, upload, original_name: str, content_type: str):
+        self.dest = upload
+        self.original_name = original_name
+        self.content_type = content_type
+        self.size = 0
+        self._sha = hashlib.sha256()
+
+    async def write(self, data: bytes) -> None:
+        self._sha.update(data)
+        self.size += len(data)
+        await run_in_threadpool(self.dest.write, data)
+
+    def hexdigest(self) -> str:
+        return self._sha.hexdigest()
+
+
+async def _abrir_destino(backend, form: MultipartStream, head: bytes) -> _HashingDest:
+    """Valida el tipo real con los primeros bytes y abre la subida."""
+    original_name = pathlib.Path(form.filename or "evidence").name.replace("..", ".")
+    content_type = sniff_mime(head[:SNIFF_BYTES], form.content_type, original_name)
+    if content_type not in ALLOWED_MIMES:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=MIME_ERROR)
     try:
-        file.file.seek(0, os.SEEK_END)
-        size = file.file.tell()
-        file.file.seek(0)
-    except Exception:
-        size = 0
-        
-    if size and size > MAX_UPLOAD_BYTES:
-        raise HTTPException(
-            status_code=413,
-            detail=f"El archivo supera el límite de {MAX_UPLOAD_MB} MB."
-        )    
-
-    original_name = pathlib.Path(file.filename or "evidence").name.replace("..", ".")
-    unique_name = f"{uuid.uuid4().hex}_{original_name}"
-
-    
-    if GCS_BUCKET:
-        if storage is None:
-            raise HTTPException(
-                status_code=500,
-                detail="google-cloud-storage no instalado en el servidor",
-            )
-        try:
-            object_name = f"{GCS_PREFIX.rstrip('/')}/{unique_name}"
-            client = storage.Client()
-            bucket = client.bucket(GCS_BUCKET)
-            blob = bucket.blob(object_name)
-            blob.upload_from_file(file.file, content_type=file.content_type)
-        finally:
-            await file.close()
-
-        public_url = f"https://storage.googleapis.com/{GCS_BUCKET}/{object_name}"
-        return {
-            "public_url": public_url,       
-            "object_name": object_name,    
-            "filename": original_name,
-            "content_type": file.content_type,
-        }
-
-    dest_path = BASE_DIR / unique_name
+        upload = await run_in_threadpool(backend.begin, content_type)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _HashingDest(upload, original_name, content_type)
+
+
+def _buscar_blob(db: Session, digest: str) -> Optional[models.EvidenciaBlob]:
+    blob = db.query(models.EvidenciaBlob).get(digest)
+    if blob:
+        blob.ultimo_uso_at = datetime.utcnow()
+        db.commit(); db.refresh(blob)
+    return blob
+
+
+def _registrar_blob(db: Session, digest: str, object_name: str, content_type: str, size: int) -> None:
+    db.add(models.EvidenciaBlob(digest=digest, object_name=object_name, content_type=content_type, size=size))
     try:
-        with dest_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    finally:
-        await file.close()
+        db.commit()
+    except IntegrityError:
+        # Otra subida idéntica simultánea ya lo registró
+        db.rollback()
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED, openapi_extra=_UPLOAD_OPENAPI)
+async def upload_evidence(request: Request, db: Session = Depends(get_db)) -> Dict[str, str]:
+    # 0) Rechazo inmediato si el cliente ya anuncia un cuerpo demasiado grande
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+        raise _too_large()
+    backend = get_storage()
+    try:
+        form = MultipartStream(request.headers.get("content-type", ""))
+    except ValueError:
+        raise HTTPException(status_code=415, detail="Se esperaba multipart/form-data")
+
+    head = b""
+    size = 0
+    dest = None
+    try:
+        async for chunk in request.stream():
+            form.feed(chunk)
+            data = form.take()
+            if not data:
+                continue
+            # 1) Límite de tamaño mientras se recibe
+            size += len(data)
+            if size > MAX_UPLOAD_BYTES:
+                raise _too_large()
+            if dest is None:
+                # 2) Se juntan los primeros bytes para detectar el tipo
+                head += data
+                if len(head) < SNIFF_BYTES:
+                    continue
+                data, head = head, b""
+                dest = await _abrir_destino(backend, form, data)
+            # 3) Una sola escritura, calculando el hash al vuelo
+            await dest.write(data)
+
+        # Cuerpo cortado antes del boundary de cierre: no se guarda nada
+        if not form.finished:
+            raise HTTPException(status_code=400, detail="Cuerpo multipart incompleto")
+        if dest is None and head:
+            # Archivo más pequeño que SNIFF_BYTES
+            dest = await _abrir_destino(backend, form, head)
+            await dest.write(head)
+        if dest is not None:
+            await run_in_threadpool(dest.dest.close)
+    except BaseException:
+        if dest is not None:
+            await run_in_threadpool(dest.dest.abort)
+        raise
+
+    if dest is None:
+        detail = "El archivo está vacío" if form.found else "Falta el campo 'file'"
+        raise HTTPException(status_code=422, detail=detail)
+
+    # 4) Almacenamiento por contenido: si ya existe, se reutiliza sin reescribir
+    digest = dest.hexdigest()
+    object_name = f"{digest}{EXTENSIONES.get(dest.content_type, '')}"
+    blob = await run_in_threadpool(_buscar_blob, db, digest)
+    if blob and await run_in_threadpool(backend.exists, blob.object_name):
+        await run_in_threadpool(dest.dest.abort)
+        object_name = blob.object_name
+    else:
+        await run_in_threadpool(dest.dest.commit, object_name)
+        await run_in_threadpool(_registrar_blob, db, digest, object_name, dest.content_type, dest.size)
 
-    public_path = f"/uploads/{EVIDENCE_SUBDIR}/{unique_name}"  # relativo al backend
     return {
-        "url": public_path,           
-        "filename": original_name,
-        "content_type": file.content_type,
+        **backend.result(object_name),
+        "filename": dest.original_name,
+        "content_type": dest.content_type,
+        "sha256": digest,
     }
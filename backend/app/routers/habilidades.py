@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app import models, schemas
 from app.auth import get_current_user, require_roles
+from app.jobs import job_handler, insertar_por_lotes, manager as job_manager
+from app.idempotency import Idempotencia, idempotencia
+from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/habilidades", tags=["habilidades"])
 
@@ -18,31 +21,56 @@ def get_all_habilidades(
     return habilidades
 
 
+def _habilidad_row(p: schemas.HabilidadBase) -> dict:
+    return {
+        "anio": p.anio,
+        "mes": p.mes,
+        "id_entidad": p.id_entidad,
+        "entidad": p.entidad,
+        "pct_habilidades_tecnicas": p.pct_habilidades_tecnicas,
+        "num_capacitados_tecnicas": p.num_capacitados_tecnicas,
+        "pct_habilidades_socioemocionales": p.pct_habilidades_socioemocionales,
+        "num_capacitados_socioemocionales": p.num_capacitados_socioemocionales,
+    }
+
+
+@job_handler("cargar_habilidades")
+def _job_cargar_habilidades(db: Session, payload: dict, ctx):
+    lista = schemas.HabilidadEntradaLista.model_validate(payload)
+    return {"insertados": insertar_por_lotes(db, models.Habilidad, [_habilidad_row(p) for p in lista.habilidades], ctx)}
+
+
 @router.post("")
 @router.post("/")
 def cargar_habilidades(
     payload: schemas.HabilidadEntradaLista,
+    response: Response,
+    segundo_plano: bool = False,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
+    idem: Idempotencia = Depends(idempotencia("cargar_habilidades")),
 ):
-    nuevos = []
+    # Reintento con la misma Idempotency-Key: se devuelve la respuesta original
+    if idem.repetida:
+        return idem.respuesta()
 
-    for p in payload.habilidades:
-        nuevo = models.Habilidad(
-            anio = p.anio,
-            mes = p.mes,
-            id_entidad = p.id_entidad,
-            entidad = p.entidad,
-            pct_habilidades_tecnicas = p.pct_habilidades_tecnicas,
-            num_capacitados_tecnicas = p.num_capacitados_tecnicas,
-            pct_habilidades_socioemocionales = p.pct_habilidades_socioemocionales,
-            num_capacitados_socioemocionales = p.num_capacitados_socioemocionales
-        )
-        db.add(nuevo)
-        nuevos.append(nuevo)
+    if segundo_plano:
+        def _registrar(job):
+            idem.registrar(202, {"job_id": job.id, "estado": job.estado})
+        try:
+            job = job_manager.enqueue(db, "cargar_habilidades", payload.model_dump(mode="json"), user,
+                                      antes_de_commit=_registrar)
+        except IntegrityError:
+            return idem.tras_conflicto()
+        response.status_code = 202
+        return {"job_id": job.id, "estado": job.estado}
 
-    db.commit()
-    return {"insertados": len(nuevos)}
+    insertados = insertar_por_lotes(db, models.Habilidad, [_habilidad_row(p) for p in payload.habilidades], commit=False)
+    idem.registrar(200, {"insertados": insertados})
+    repetida = idem.confirmar()
+    if repetida:
+        return repetida
+    return {"insertados": insertados}
 
 
 @router.delete("/{habilidad_id}")
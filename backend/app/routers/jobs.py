@@ -0,0 +1,61 @@
+import json
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app import models, schemas
+from app.auth import get_current_user
+from app.jobs import COMPLETADO, manager as job_manager
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_job(db: Session, job_id: str, user: models.User) -> models.Job:
+    job = db.query(models.Job).get(job_id)
+    user_role = getattr(user.role, "value", user.role)
+    # Solo el creador (o un admin) puede ver el trabajo
+    if not job or (user_role != "admin" and job.created_by != user.id):
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+@router.get("/{job_id}/", response_model=schemas.JobOut)
+def estado_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    return _get_job(db, job_id, user)
+
+
+@router.post("/{job_id}/cancelar", response_model=schemas.JobOut)
+@router.post("/{job_id}/cancelar/", response_model=schemas.JobOut)
+def cancelar_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    return job_manager.cancel(db, _get_job(db, job_id, user))
+
+
+@router.get("/{job_id}/descarga")
+@router.get("/{job_id}/descarga/")
+def descargar_resultado(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    job = _get_job(db, job_id, user)
+    resultado = json.loads(job.resultado or "{}")
+    archivo = resultado.get("archivo")
+    if job.estado != COMPLETADO or not archivo or not os.path.exists(archivo):
+        raise HTTPException(status_code=404, detail="El trabajo no tiene archivo disponible")
+    return FileResponse(
+        archivo,
+        media_type=resultado.get("media_type"),
+        filename=resultado.get("filename") or os.path.basename(archivo),
+    )
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from app.database import get_db
 from app import models, schemas
-from app.auth import get_current_user, require_roles
-from sqlalchemy import func
+from app.auth import get_current_user, get_current_user_sse, require_roles
+from app.scoping import entidad_restringida, filtrar_planes_por_entidad
+from app import ajustes, borrado, estadisticas, evidencias, fieldsets, historial, indicadores
+from app.resumen import recalcular_resumen
+from app.singleflight import respuesta_compartida
+from app.events import bus, publicar_plan
+from app.idempotency import Idempotencia, idempotencia
+from app.versiones import actualizar_con_version, conflicto, etag, version_esperada
+from sqlalchemy import func, update
+import asyncio
+import json
+import os
 
 router = APIRouter(prefix="/seguimiento", tags=["seguimiento"])
 
+# SSE: comentario periódico para que proxies no corten la conexión inactiva
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# Eventos pendientes por conexión; si un cliente lento se atrasa más, recibe `resync`
+SSE_QUEUE_MAX = 200
+
 @router.get("/indicadores_usados", response_model=List[str])
 @router.get("/indicadores_usados/", response_model=List[str])
 def indicadores_usados(
@@ -21,29 +37,171 @@ def indicadores_usados(
     user_entidad = (getattr(user, "entidad", "") or "").strip()
     user_role = getattr(user.role, "value", user.role)
     is_entidad_auditor = user_role == "entidad" and bool(getattr(user, "entidad_auditor", False))
-
-    # Base: join Seguimiento -> PlanAccion para filtrar por entidad
-    q = (
-        db.query(models.Seguimiento.indicador)
-        .join(models.PlanAccion, models.Seguimiento.plan_id == models.PlanAccion.id)
-        .filter(
-            models.Seguimiento.indicador.isnot(None),
-            func.trim(models.Seguimiento.indicador) != "",
-        )
+    filtra_entidad = bool(user_entidad and not is_entidad_auditor)
+
+    # Lectura por llave en indicadores_entidad (la mantienen las escrituras de seguimientos)
+    return indicadores.usados(db, user_entidad if filtra_entidad else None)
+
+# ---------------- EVENTOS (SSE) ----------------
+def _visible(evento: dict, entidad: Optional[str]) -> bool:
+    """Mismo alcance que list_planes: 'entidad' solo ve los eventos de su entidad."""
+    if not entidad or evento["tipo"] == "resync":
+        return True
+    return (evento.get("nombre_entidad") or "").strip().lower() == entidad.strip().lower()
+
+
+def _seq(evento: dict) -> int:
+    return int(evento["id"].split(":")[1])
+
+
+def _sse(evento: dict) -> str:
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+
+async def _flujo_eventos(request: Request, entidad: Optional[str], last_event_id: Optional[str]) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    cola: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_MAX)
+
+    def _poner(evento: dict) -> None:
+        try:
+            cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se descarta lo pendiente y se pide recargar
+            while not cola.empty():
+                cola.get_nowait()
+            cola.put_nowait({"id": evento["id"], "tipo": "resync"})
+
+    def entregar(evento: dict) -> None:
+        # Se llama desde el hilo que hizo la escritura
+        if _visible(evento, entidad):
+            loop.call_soon_threadsafe(_poner, evento)
+
+    token = bus.subscribe(entregar)
+    try:
+        yield "retry: 3000\n\n"
+        ultimo = 0
+        if last_event_id:
+            pendientes = bus.desde(last_event_id)
+            if pendientes is None:
+                yield _sse({"id": last_event_id, "tipo": "resync"})
+            else:
+                for evento in pendientes:
+                    if _visible(evento, entidad):
+                        ultimo = _seq(evento)
+                        yield _sse(evento)
+        while not await request.is_disconnected():
+            try:
+                evento = await asyncio.wait_for(cola.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if evento["tipo"] != "resync" and _seq(evento) <= ultimo:
+                continue  # ya enviado en la repetición de Last-Event-ID
+            yield _sse(evento)
+    finally:
+        bus.unsubscribe(token)
+
+
+@router.get("/eventos")
+@router.get("/eventos/")
+async def eventos(
+    request: Request,
+    user: models.User = Depends(get_current_user_sse),
+):
+    """
+    Flujo SSE de cambios: plan.creado | plan.actualizado | plan.estado | plan.eliminado |
+    seguimiento.creado | seguimiento.actualizado | seguimiento.eliminado (y `resync`).
+    Cada evento trae plan_id (y seguimiento_id) para refrescar solo ese elemento.
+    """
+    entidad = entidad_restringida(user)
+    return StreamingResponse(
+        _flujo_eventos(request, entidad, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    # Si el usuario tiene entidad asociada, filtramos solo sus planes
-    if user_entidad and not is_entidad_auditor:
-        q = q.filter(
-            func.lower(models.PlanAccion.nombre_entidad) == func.lower(user_entidad)
+# ---------------- PLANES EN LOTE ----------------
+@router.post("/lote/estado", response_model=List[schemas.PlanLoteResultado])
+@router.post("/lote/estado/", response_model=List[schemas.PlanLoteResultado])
+def cambiar_estado_lote(
+    payload: schemas.PlanLoteEstado,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(require_roles("auditor", "admin")),
+) -> List[schemas.PlanLoteResultado]:
+    """
+    Aprueba/observa varios planes en una sola transacción: un SELECT para saber
+    cuáles existen y un UPDATE por conjunto. Con solo `observacion` el estado
+    queda en "Observado", como en /{plan_id}/observacion.
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    valores = {}
+    if payload.observacion is not None:
+        valores["observacion_calidad"] = payload.observacion.strip()
+    estado = payload.estado or ("Observado" if payload.observacion is not None else None)
+    valores["estado"] = estado
+    valores["version"] = models.PlanAccion.version + 1
+
+    filas = (
+        db.query(models.PlanAccion.id, models.PlanAccion.nombre_entidad,
+                 models.PlanAccion.estado, models.PlanAccion.fecha_final)
+        .filter(models.PlanAccion.id.in_(ids), models.PlanAccion.deleted_at.is_(None))
+        .with_for_update()
+        .all()
+    )
+    existentes = {f.id: f.nombre_entidad for f in filas}
+    if existentes:
+        db.execute(
+            update(models.PlanAccion)
+            .where(models.PlanAccion.id.in_(list(existentes)))
+            .values(**valores)
+            .execution_options(synchronize_session=False)
         )
+        for f in filas:
+            estadisticas.plan_cambiado(db, f.nombre_entidad, (f.estado, f.fecha_final), (estado, f.fecha_final))
+    db.commit()
 
-    # Distinct para no devolver duplicados
-    rows = q.distinct().all()
-    # rows es una lista de tuplas (indicador,), nos quedamos con el valor
-    return [r[0].strip() for r in rows if r[0]]
+    resultados = []
+    for plan_id in ids:
+        if plan_id in existentes:
+            bus.publish("plan.estado", plan_id=plan_id, nombre_entidad=existentes[plan_id], estado=estado)
+            resultados.append(schemas.PlanLoteResultado(id=plan_id, ok=True, estado=estado))
+        else:
+            resultados.append(schemas.PlanLoteResultado(id=plan_id, ok=False, error="No encontrado"))
+    return resultados
+
+@router.post("/lote/eliminar", response_model=List[schemas.PlanLoteResultado])
+@router.post("/lote/eliminar/", response_model=List[schemas.PlanLoteResultado])
+def eliminar_planes_lote(
+    payload: schemas.PlanLoteEliminar,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(require_roles("entidad", "admin")),
+) -> List[schemas.PlanLoteResultado]:
+    """
+    Borra varios planes en una transacción: un DELETE sobre plan_accion y la BD
+    borra sus seguimientos (ON DELETE CASCADE). Con `papelera` solo se marcan y
+    la purga los borra después (app/borrado.py).
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    borrados = dict(borrado.eliminar_planes(db, ids, user, papelera=payload.papelera))
+    db.commit()
+
+    resultados = []
+    for plan_id in ids:
+        if plan_id in borrados:
+            bus.publish("plan.eliminado", plan_id=plan_id, nombre_entidad=borrados[plan_id])
+            resultados.append(schemas.PlanLoteResultado(id=plan_id, ok=True))
+        else:
+            resultados.append(schemas.PlanLoteResultado(id=plan_id, ok=False, error="No encontrado"))
+    return resultados
 
 # ---------------- PLANES (padre) ----------------
+def _plan_vigente(db: Session, plan_id: int) -> Optional[models.PlanAccion]:
+    """El plan, o None si no existe o está en la papelera."""
+    plan = db.query(models.PlanAccion).get(plan_id)
+    if plan is None or plan.deleted_at is not None:
+        return None
+    return plan
+
 @router.get("")          # <— sin slash
 @router.get("/")         # <— con slash
 def list_planes(
@@ -52,25 +210,29 @@ def list_planes(
     q: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
+    fields: Optional[str] = Query(None, description="Campos a devolver, p.ej. 'id,nombre_entidad,estado,indicador'"),
 ) -> List[schemas.PlanOut]:
-    query = db.query(models.PlanAccion)
-    user_role = getattr(user.role, "value", user.role)
-    user_entidad = (getattr(user, "entidad", "") or "").strip()
-    is_entidad_auditor = user_role == "entidad" and bool(getattr(user, "entidad_auditor", False))
-
-    if user_role == "entidad" and user_entidad and not is_entidad_auditor:
-        query = query.filter(
-            func.lower(models.PlanAccion.nombre_entidad) == func.lower(user_entidad)
+    campos = fieldsets.parse_fields(fields, schemas.PlanOut)
+    limit = min(limit, 200)
+
+    def _consulta() -> bytes:
+        query = filtrar_planes_por_entidad(db.query(models.PlanAccion), user)
+        if campos:
+            query = query.options(fieldsets.opcion_load_only(models.PlanAccion, campos))
+        if q:
+            like = f"%{q}%"
+            query = query.filter(models.PlanAccion.nombre_entidad.ilike(like))
+        planes = (
+            query.order_by(models.PlanAccion.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
         )
-    if q:
-        like = f"%{q}%"
-        query = query.filter(models.PlanAccion.nombre_entidad.ilike(like))
-    return (
-        query.order_by(models.PlanAccion.id.desc())
-        .offset(skip)
-        .limit(min(limit, 200))
-        .all()
-    )
+        return fieldsets.serializar(schemas.PlanOut, campos, planes)
+
+    # Usuarios con el mismo alcance y filtros comparten la consulta en curso
+    alcance = (entidad_restringida(user) or "*").lower()
+    return respuesta_compartida("list_planes", (alcance, q, skip, limit, campos), _consulta)
 
 @router.post("")
 @router.post("/")
@@ -86,19 +248,24 @@ def crear_plan(
         data["nombre_entidad"] = (getattr(user, "entidad", "") or "").strip()
         
     plan = models.PlanAccion(**data, created_by=user.id)
-    db.add(plan); db.commit(); db.refresh(plan)
+    db.add(plan); db.flush()
+    estadisticas.plan_cambiado(db, plan.nombre_entidad, None, (plan.estado, plan.fecha_final))
+    db.commit(); db.refresh(plan)
+    publicar_plan("plan.creado", plan)
     return plan
 
 @router.get("/{plan_id}")
 @router.get("/{plan_id}/")
 def obtener_plan(
     plan_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ) -> schemas.PlanOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="No encontrado")
+    response.headers["ETag"] = etag(plan.version)
     return plan
 
 @router.put("/{plan_id}")
@@ -106,19 +273,46 @@ def obtener_plan(
 def actualizar_plan(
     plan_id: int,
     payload: schemas.PlanUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ) -> schemas.PlanOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
-    if not plan:
-        raise HTTPException(status_code=404, detail="No encontrado")
     # if user.role == models.UserRole.entidad and plan.created_by != user.id:
     #     raise HTTPException(status_code=403, detail="Sin permisos")
-    for k, v in payload.model_dump(exclude_unset=True).items():
-        if k == "nombre_entidad":
-            continue 
-        setattr(plan, k, v)
+    data = payload.model_dump(exclude_unset=True)
+    esperada = version_esperada(if_match, data.pop("version", None))
+    data.pop("nombre_entidad", None)
+
+    # Si cambian estado o vencimiento, el tablero necesita los valores previos:
+    # se leen (bloqueando la fila) y el UPDATE queda atado a esa versión.
+    previo = None
+    if "estado" in data or "fecha_final" in data:
+        previo = (
+            db.query(models.PlanAccion.nombre_entidad, models.PlanAccion.estado,
+                     models.PlanAccion.fecha_final, models.PlanAccion.version)
+            .filter(models.PlanAccion.id == plan_id, models.PlanAccion.deleted_at.is_(None))
+            .with_for_update()
+            .first()
+        )
+        if previo is not None and esperada is None:
+            esperada = previo.version
+
+    # Un solo UPDATE condicionado a la versión; solo si falla se averigua por qué
+    vigente = [models.PlanAccion.id == plan_id, models.PlanAccion.deleted_at.is_(None)]
+    plan = actualizar_con_version(db, models.PlanAccion, vigente, data, esperada)
+    if plan is None:
+        actual = db.query(models.PlanAccion.version).filter(*vigente).scalar()
+        db.rollback()
+        if actual is None:
+            raise HTTPException(status_code=404, detail="No encontrado")
+        raise conflicto(actual)
+    if previo is not None:
+        estadisticas.plan_cambiado(db, previo.nombre_entidad, (previo.estado, previo.fecha_final),
+                                   (plan.estado, plan.fecha_final))
     db.commit(); db.refresh(plan)
+    response.headers["ETag"] = etag(plan.version)
+    publicar_plan("plan.actualizado", plan)
     return plan
 
 @router.post("/{plan_id}/enviar_revision")
@@ -128,11 +322,15 @@ def enviar_revision(
     db: Session = Depends(get_db),
     user: models.User = Depends(require_roles("entidad", "admin")),
 ) -> schemas.PlanOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="No encontrado")
+    antes = (plan.estado, plan.fecha_final)
     plan.estado = "En revisión"
+    plan.version = models.PlanAccion.version + 1
+    estadisticas.plan_cambiado(db, plan.nombre_entidad, antes, (plan.estado, plan.fecha_final))
     db.commit(); db.refresh(plan)
+    publicar_plan("plan.estado", plan)
     return plan
 
 @router.post("/{plan_id}/observacion")
@@ -143,12 +341,16 @@ def agregar_observacion(
     db: Session = Depends(get_db),
     user: models.User = Depends(require_roles("auditor", "admin")),
 ) -> schemas.PlanOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="No encontrado")
+    antes = (plan.estado, plan.fecha_final)
     plan.observacion_calidad = (payload.get("observacion") or "").strip()
     plan.estado = "Observado"
+    plan.version = models.PlanAccion.version + 1
+    estadisticas.plan_cambiado(db, plan.nombre_entidad, antes, (plan.estado, plan.fecha_final))
     db.commit(); db.refresh(plan)
+    publicar_plan("plan.estado", plan)
     return plan
 
 @router.post("/{plan_id}/estado")
@@ -159,25 +361,30 @@ def cambiar_estado(
     db: Session = Depends(get_db),
     user: models.User = Depends(require_roles("auditor", "admin")),
 ) -> schemas.PlanOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="No encontrado")
+    antes = (plan.estado, plan.fecha_final)
     plan.estado = estado
+    plan.version = models.PlanAccion.version + 1
+    estadisticas.plan_cambiado(db, plan.nombre_entidad, antes, (plan.estado, plan.fecha_final))
     db.commit(); db.refresh(plan)
+    publicar_plan("plan.estado", plan)
     return plan
 
 @router.delete("/{plan_id}")
 @router.delete("/{plan_id}/")
 def eliminar_plan(
     plan_id: int,
+    papelera: bool = Query(False, description="Solo marcarlo; la purga lo borra después"),
     db: Session = Depends(get_db),
     user: models.User = Depends(require_roles("entidad", "admin")),
 ):
-    plan = db.query(models.PlanAccion).get(plan_id)
-    if not plan:
+    borrados = borrado.eliminar_planes(db, [plan_id], user, papelera=papelera)
+    if not borrados:
         raise HTTPException(status_code=404, detail="No encontrado")
-    db.query(models.Seguimiento).filter(models.Seguimiento.plan_id == plan_id).delete()
-    db.delete(plan); db.commit()
+    db.commit()
+    bus.publish("plan.eliminado", plan_id=plan_id, nombre_entidad=borrados[0][1])
     return {"ok": True}
 
 # ---------------- SEGUIMIENTOS (hijos) ----------------
@@ -191,18 +398,28 @@ def listar_seguimientos(
     plan_id: int,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
+    fields: Optional[str] = Query(None, description="Campos a devolver, p.ej. 'id,indicador,seguimiento,updated_at'"),
 ) -> List[schemas.SeguimientoOut]:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    campos = fieldsets.parse_fields(fields, schemas.SeguimientoOut)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan no encontrado")
     _assert_access(plan, user)
+    query = db.query(models.Seguimiento)
+    if campos is None or {"updated_by_email", "updated_by_entidad"} & set(campos):
+        query = query.options(joinedload(models.Seguimiento.updated_by))
+    if campos:
+        query = query.options(fieldsets.opcion_load_only(
+            models.Seguimiento, campos + ("updated_by_id",)
+        ))
     seguimientos = (
-        db.query(models.Seguimiento)
-        .options(joinedload(models.Seguimiento.updated_by)) 
+        query
         .filter(models.Seguimiento.plan_id == plan.id)
         .order_by(models.Seguimiento.id.asc())
         .all()
     )
+    if campos:
+        return fieldsets.responder(schemas.SeguimientoOut, campos, seguimientos)
     return seguimientos
 
 @router.post("/{plan_id}/seguimiento", response_model=schemas.SeguimientoOut)
@@ -212,8 +429,12 @@ def crear_seguimiento(
     payload: schemas.SeguimientoCreate,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
+    idem: Idempotencia = Depends(idempotencia("crear_seguimiento")),
 ) -> schemas.SeguimientoOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    if idem.repetida:
+        return idem.respuesta()
+
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan no encontrado")
     _assert_access(plan, user)
@@ -239,9 +460,21 @@ def crear_seguimiento(
     seg = models.Seguimiento(**data, plan_id=plan.id)
     seg.updated_by_id = user.id
     db.add(seg)
-
-    db.commit()
+    db.flush()
+    evidencias.sincronizar_seguimiento(db, seg)
+    historial.registrar_creacion(db, seg, user)
+    estadisticas.seguimientos(db, plan.nombre_entidad, [seg.created_at])
+    indicadores.cambiar(db, plan.nombre_entidad, None, seg.indicador)
+    recalcular_resumen(db, [plan.id])
+
+    if idem.key:
+        db.refresh(seg)
+        idem.registrar(200, schemas.SeguimientoOut.model_validate(seg).model_dump(mode="json"))
+    repetida = idem.confirmar()
+    if repetida:
+        return repetida
     db.refresh(seg)
+    publicar_plan("seguimiento.creado", plan, seguimiento_id=seg.id)
     return seg
 
 @router.put("/{plan_id}/seguimiento/{seg_id}", response_model=schemas.SeguimientoOut)
@@ -250,46 +483,81 @@ def actualizar_seguimiento(
     plan_id: int,
     seg_id: int,
     payload: schemas.SeguimientoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ) -> schemas.SeguimientoOut:
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan no encontrado")
     _assert_access(plan, user)
 
-    seg = db.query(models.Seguimiento).get(seg_id)
-    if not seg or seg.plan_id != plan.id:
-        raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
-
     data = payload.model_dump(exclude_unset=True)
+    esperada = version_esperada(if_match, data.pop("version", None))
 
     user_role = getattr(user.role, "value", user.role)
     is_entidad_auditor = user_role == "entidad" and bool(getattr(user, "entidad_auditor", False))
     if user_role == "entidad" and not is_entidad_auditor and "observacion_calidad" in data:
         del data["observacion_calidad"]
 
-    # Si viene enlace_entidad, lo reflejamos en el plan
-    if "enlace_entidad" in data:
-        plan.enlace_entidad = data["enlace_entidad"]
+    criterio_val = (data.pop("criterio", None) or "").strip()
 
-    # Si viene indicador, lo subimos al plan
+    # Valores previos (solo de los campos que se escriben) para el historial;
+    # la fila queda bloqueada hasta el commit y el UPDATE exige esa versión.
+    filtros = [models.Seguimiento.id == seg_id, models.Seguimiento.plan_id == plan.id]
+    previo = (
+        db.query(models.Seguimiento.version,
+                 *[getattr(models.Seguimiento, c) for c in data if c in historial.CAMPOS])
+        .filter(*filtros)
+        .with_for_update()
+        .first()
+    )
+    if previo is None:
+        raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
+    if esperada is not None and previo.version != esperada:
+        db.rollback()
+        raise conflicto(previo.version)
+
+    seg = actualizar_con_version(
+        db, models.Seguimiento, filtros, {**data, "updated_by_id": user.id}, previo.version,
+    )
+    if seg is None:
+        actual = (
+            db.query(models.Seguimiento.version)
+            .filter(models.Seguimiento.id == seg_id, models.Seguimiento.plan_id == plan.id)
+            .scalar()
+        )
+        db.rollback()
+        if actual is None:
+            raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
+        raise conflicto(actual)
+
+    # Campos que se reflejan en el plan (también cambian su versión)
+    cambios_plan = {}
+    if "enlace_entidad" in data:
+        cambios_plan["enlace_entidad"] = data["enlace_entidad"]
     indicador = (data.get("indicador") or "").strip()
     if indicador:
-        plan.indicador = indicador
-
-    # Si viene criterio, lo subimos al plan y LO QUITAMOS de data
-    criterio_val = (data.pop("criterio", None) or "").strip()
+        cambios_plan["indicador"] = indicador
     if criterio_val:
-        plan.criterio = criterio_val
-
-    # Ahora sí, solo los campos válidos para Seguimiento
-    for k, v in data.items():
-        setattr(seg, k, v)
-
-    seg.updated_by_id = user.id
+        cambios_plan["criterio"] = criterio_val
+    if cambios_plan:
+        for k, v in cambios_plan.items():
+            setattr(plan, k, v)
+        plan.version = models.PlanAccion.version + 1
+
+    historial.registrar(db, seg.id, plan.id, seg.version, "actualizado",
+                        historial.diferencias(previo._asdict(), data), user)
+    if "indicador" in data:
+        indicadores.cambiar(db, plan.nombre_entidad, previo.indicador, seg.indicador)
+    if "evidencia_cumplimiento" in data:
+        evidencias.sincronizar_seguimiento(db, seg)
+    recalcular_resumen(db, [plan.id])
     db.commit()
     db.refresh(seg)
+    response.headers["ETag"] = etag(seg.version)
+    publicar_plan("seguimiento.actualizado", plan, seguimiento_id=seg.id)
 
     return seg
 
@@ -301,7 +569,7 @@ def eliminar_seguimiento(
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    plan = db.query(models.PlanAccion).get(plan_id)
+    plan = _plan_vigente(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan no encontrado")
     _assert_access(plan, user)
@@ -310,5 +578,79 @@ def eliminar_seguimiento(
     if not seg or seg.plan_id != plan.id:
         raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
 
-    db.delete(seg); db.commit()
+    evidencias.desvincular(db, [seg.id])
+    historial.registrar_borrado(db, [seg.id], plan.id, {seg.id: seg.version}, user)
+    estadisticas.seguimientos(db, plan.nombre_entidad, [seg.created_at], signo=-1)
+    indicadores.cambiar(db, plan.nombre_entidad, seg.indicador, None)
+    borrado.desvincular_ajustes(db, [seg.id])
+    db.delete(seg)
+    recalcular_resumen(db, [plan.id])
+    db.commit()
+    publicar_plan("seguimiento.eliminado", plan, seguimiento_id=seg_id)
     return {"ok": True}
+
+@router.get("/{plan_id}/seguimiento/{seg_id}/ajustes", response_model=List[schemas.SeguimientoAjusteOut])
+@router.get("/{plan_id}/seguimiento/{seg_id}/ajustes/", response_model=List[schemas.SeguimientoAjusteOut])
+def ajustes_seguimiento(
+    plan_id: int,
+    seg_id: int,
+    modo: str = Query("arbol", description="arbol: todo lo que cuelga de la raíz; cadena: de la raíz a este seguimiento"),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    """Cadena o árbol de ajustes (ajuste_de_id) del seguimiento, con profundidad."""
+    if modo not in ajustes.MODOS:
+        raise HTTPException(status_code=400, detail=f"modo debe ser uno de: {', '.join(ajustes.MODOS)}")
+    plan = _plan_vigente(db, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan no encontrado")
+    _assert_access(plan, user)
+
+    filas = ajustes.recorrer(db, plan.id, seg_id, modo)
+    if not filas:
+        raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
+    return [
+        schemas.SeguimientoAjusteOut(**schemas.SeguimientoOut.model_validate(seg).model_dump(), profundidad=profundidad)
+        for seg, profundidad in filas
+    ]
+
+# ---------------- HISTORIAL ----------------
+
+@router.get("/{plan_id}/historial", response_model=List[schemas.SeguimientoCambioOut])
+@router.get("/{plan_id}/historial/", response_model=List[schemas.SeguimientoCambioOut])
+def historial_plan(
+    plan_id: int,
+    desde_id: int = Query(0, ge=0, description="Solo cambios con id mayor (paginación)"),
+    limite: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    """Línea de tiempo de ediciones de los seguimientos del plan (incluye borrados)."""
+    plan = _plan_vigente(db, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan no encontrado")
+    _assert_access(plan, user)
+    return historial.timeline(db, plan_id, desde_id, limite)
+
+@router.get("/{plan_id}/seguimiento/{seg_id}/version/{version}")
+@router.get("/{plan_id}/seguimiento/{seg_id}/version/{version}/")
+def version_seguimiento(
+    plan_id: int,
+    seg_id: int,
+    version: int,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    """Campos del seguimiento tal como quedaron en una versión anterior."""
+    plan = _plan_vigente(db, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan no encontrado")
+    _assert_access(plan, user)
+
+    seg = db.query(models.Seguimiento).get(seg_id)
+    if not seg or seg.plan_id != plan.id:
+        raise HTTPException(status_code=404, detail="Seguimiento no encontrado")
+    valores = historial.reconstruir(db, seg, version) if 1 <= version <= seg.version else None
+    if valores is None:
+        raise HTTPException(status_code=404, detail="Versión no disponible en el historial")
+    return {"id": seg.id, "plan_id": plan.id, "version": version, **valores}
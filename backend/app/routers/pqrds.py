@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from datetime import date
 from typing import List, Optional
 from app.database import get_db
-from app import models, schemas
+from app import models, pqrd_particiones, schemas
 from app.auth import get_current_user, require_roles
+from app.jobs import job_handler, insertar_por_lotes, manager as job_manager
+from app.idempotency import Idempotencia, idempotencia
+from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/pqrds", tags=["pqrds"])
 
@@ -11,20 +15,25 @@ router = APIRouter(prefix="/pqrds", tags=["pqrds"])
 @router.get("")
 @router.get("/")
 def get_all_pqrds(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    pqrds = db.query(models.PQRD).all()
+    # Con desde/hasta (fecha_ingreso) solo se leen los periodos del rango
+    pqrds = pqrd_particiones.filtrar(db.query(models.PQRD), desde, hasta).all()
     return pqrds
 
 
 @router.get("/count")
 @router.get("/count/")
 def count_pqrds(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    total = db.query(models.PQRD).count()
+    total = pqrd_particiones.filtrar(db.query(models.PQRD), desde, hasta).count()
     return total
 
 
@@ -32,10 +41,13 @@ def count_pqrds(
 @router.get("/by/{label_pqrd}/")
 def get_pqrd_by_label(
     label_pqrd: str,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    pqrd = db.query(models.PQRD).filter(models.PQRD.label == label_pqrd).first()
+    query = pqrd_particiones.filtrar(db.query(models.PQRD), desde, hasta)
+    pqrd = query.filter(models.PQRD.label == label_pqrd).first()
 
     if not pqrd:
         raise HTTPException(status_code=404, detail="PQRD not found")
@@ -43,39 +55,75 @@ def get_pqrd_by_label(
     return pqrd
 
 
+def _pqrd_row(p: schemas.PqrdCreate) -> dict:
+    return {
+        "label": p.label,
+        "tipo_gestion": p.tipo_gestion if p.tipo_gestion else None,
+        "dependencia": p.dependencia if p.dependencia else None,
+        "entidad": p.entidad if p.entidad else None,
+        "fecha_ingreso": p.fecha_ingreso if p.fecha_ingreso else None,
+        "periodo": p.periodo if p.periodo else None,
+    }
+
+
+@job_handler("cargar_pqrds")
+def _job_cargar_pqrds(db: Session, payload: dict, ctx):
+    lista = schemas.PqrdEntradaLista.model_validate(payload)
+    rows = [_pqrd_row(p) for p in lista.pqrds]
+    pqrd_particiones.asegurar(db, {r["fecha_ingreso"] for r in rows})
+    return {"insertados": insertar_por_lotes(db, models.PQRD, rows, ctx)}
+
+
 @router.post("")
 @router.post("/")
 def cargar_pqrds(
     payload: schemas.PqrdEntradaLista,
+    response: Response,
+    segundo_plano: bool = False,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
+    idem: Idempotencia = Depends(idempotencia("cargar_pqrds")),
 ):
-    nuevos = []
-
-    for p in payload.pqrds:
-        nuevo = models.PQRD(
-            label=p.label,
-            tipo_gestion=p.tipo_gestion if p.tipo_gestion else None,
-            dependencia=p.dependencia if p.dependencia else None,
-            entidad=p.entidad if p.entidad else None,
-            fecha_ingreso=p.fecha_ingreso if p.fecha_ingreso else None,
-            periodo=p.periodo if p.periodo else None
-        )
-        db.add(nuevo)
-        nuevos.append(nuevo)
+    # Reintento con la misma Idempotency-Key: se devuelve la respuesta original
+    if idem.repetida:
+        return idem.respuesta()
 
-    db.commit()
-    return {"insertados": len(nuevos)}
+    # Cargas grandes: se encolan y se responde de inmediato con el id del trabajo
+    if segundo_plano:
+        def _registrar(job):
+            idem.registrar(202, {"job_id": job.id, "estado": job.estado})
+        try:
+            job = job_manager.enqueue(db, "cargar_pqrds", payload.model_dump(mode="json"), user,
+                                      antes_de_commit=_registrar)
+        except IntegrityError:
+            return idem.tras_conflicto()
+        response.status_code = 202
+        return {"job_id": job.id, "estado": job.estado}
+
+    rows = [_pqrd_row(p) for p in payload.pqrds]
+    # En PostgreSQL crea las particiones de periodos nuevos en la misma transacción
+    pqrd_particiones.asegurar(db, {r["fecha_ingreso"] for r in rows})
+    insertados = insertar_por_lotes(db, models.PQRD, rows, commit=False)
+    idem.registrar(200, {"insertados": insertados})
+    repetida = idem.confirmar()
+    if repetida:
+        return repetida
+    return {"insertados": insertados}
 
 
 @router.delete("")
 @router.delete("/")
 def delete_all_pqrds(
+    antes: Optional[date] = None,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
     require_roles(user, ["admin"])
 
-    deleted = db.query(models.PQRD).delete()
+    # Purga por periodo: en PostgreSQL borra particiones completas con DROP
+    if antes is not None:
+        deleted = pqrd_particiones.purgar_antes(db, antes)
+    else:
+        deleted = db.query(models.PQRD).delete()
     db.commit()
     return {"eliminados": deleted}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app import models, schemas
 from app.auth import get_current_user, require_roles
+from app.jobs import job_handler, insertar_por_lotes, manager as job_manager
+from app.singleflight import respuesta_compartida
+import json
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -25,49 +28,63 @@ def get_reportes_por_entidad(
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    # Buscar todos los registros para esa entidad (case-insensitive)
-    registros = (
-        db.query(models.Reporte)
-        .filter(models.Reporte.entidad.ilike(nombre_entidad))
-        .all()
-    )
-
-    if not registros:
-        raise HTTPException(status_code=404, detail="No records found for that entity")
-
-    # Convertirlos al formato requerido
-    resultado = {
-        "entidad": registros[0].entidad,
-        "indicadores": [
-            {"indicador": r.indicador, "criterio": r.criterio, "accion": r.accion, "insumo": r.insumo}
-            for r in registros
-            if r.indicador is not None and r.criterio is not None
-        ],
+    def _consulta() -> bytes:
+        # Buscar todos los registros para esa entidad (case-insensitive)
+        registros = (
+            db.query(models.Reporte)
+            .filter(models.Reporte.entidad.ilike(nombre_entidad))
+            .all()
+        )
+
+        if not registros:
+            raise HTTPException(status_code=404, detail="No records found for that entity")
+
+        # Convertirlos al formato requerido
+        resultado = {
+            "entidad": registros[0].entidad,
+            "indicadores": [
+                {"indicador": r.indicador, "criterio": r.criterio, "accion": r.accion, "insumo": r.insumo}
+                for r in registros
+                if r.indicador is not None and r.criterio is not None
+            ],
+        }
+        return json.dumps(resultado, ensure_ascii=False).encode("utf-8")
+
+    # Los reportes no dependen del usuario: la llave es solo la entidad
+    return respuesta_compartida("reportes_por_entidad", (nombre_entidad.lower(),), _consulta)
+
+def _reporte_row(r: schemas.ReporteEntrada) -> dict:
+    return {
+        "entidad": r.entidad,
+        "indicador": r.indicador,
+        "criterio": r.criterio,
+        "accion": r.accion,
+        "insumo": r.insumo,
     }
-    return resultado
+
+
+@job_handler("cargar_reportes")
+def _job_cargar_reportes(db: Session, payload: dict, ctx):
+    lista = schemas.ReporteEntradaLista.model_validate(payload)
+    return {"insertados": insertar_por_lotes(db, models.Reporte, [_reporte_row(r) for r in lista.reportes], ctx)}
+
 
 @router.post("")
 @router.post("/")
 def cargar_reportes(
     payload: schemas.ReporteEntradaLista,
+    response: Response,
+    segundo_plano: bool = False,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
-    nuevos = []
-
-    for r in payload.reportes:
-        nuevo = models.Reporte(
-            entidad=r.entidad,
-            indicador=r.indicador,
-            criterio=r.criterio,
-            accion=r.accion,
-            insumo=r.insumo
-        )
-        db.add(nuevo)
-        nuevos.append(nuevo)
+    if segundo_plano:
+        job = job_manager.enqueue(db, "cargar_reportes", payload.model_dump(mode="json"), user)
+        response.status_code = 202
+        return {"job_id": job.id, "estado": job.estado}
 
-    db.commit()
-    return {"insertados": len(nuevos)}
+    insertados = insertar_por_lotes(db, models.Reporte, [_reporte_row(r) for r in payload.reportes])
+    return {"insertados": insertados}
 
 
 @router.delete("")
@@ -0,0 +1,181 @@
+"""
+Descarga de evidencias en /uploads (reemplaza el StaticFiles por defecto).
+
+- Range / 206 para que el visor de PDF pida solo las páginas que muestra.
+- ETag fuerte y If-None-Match -> 304. Los archivos nombrados por contenido
+  (<sha256>.<ext>) nunca cambian: Cache-Control immutable por un año.
+- Los bytes no pasan por Python si se puede evitar: X-Accel-Redirect cuando
+  hay nginx delante, `http.response.zerocopysend` (sendfile) si el servidor
+  ASGI lo ofrece, o redirección a una URL firmada cuando el backend es GCS.
+"""
+
+import mimetypes
+import os
+import pathlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response
+
+from app.storage import EVIDENCE_SUBDIR, UPLOAD_DIR, GCSStorage, get_storage
+
+router = APIRouter(prefix="/uploads", tags=["files"])
+
+UPLOAD_ROOT = pathlib.Path(UPLOAD_DIR)
+
+# Si hay nginx delante: prefijo de un location `internal` que apunta a UPLOAD_DIR
+ACCEL_REDIRECT_PREFIX = os.getenv("UPLOADS_ACCEL_REDIRECT", "").strip()
+
+# Con GCS: redirigir a URL firmada (si no, a la URL pública del objeto)
+GCS_SIGNED_URLS = os.getenv("GCS_SIGNED_URLS", "false").lower() == "true"
+GCS_SIGNED_URL_MINUTES = int(os.getenv("GCS_SIGNED_URL_MINUTES", "15"))
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "public, no-cache"
+
+CONTENT_NAME_RE = re.compile(r"^([0-9a-f]{64})(\.[A-Za-z0-9]{1,5})?$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _FileSliceResponse(Response):
+    """Envía [start, start+length) de un archivo; con sendfile si el servidor lo soporta."""
+
+    def __init__(self, path: pathlib.Path, start: int, length: int, status_code: int,
+                 headers: dict, media_type: str, send_body: bool = True):
+        self.path, self.start, self.length, self.send_body = path, start, length, send_body
+        super().__init__(status_code=status_code, headers={**headers, "content-length": str(length)},
+                         media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as fh:
+                await send({"type": "http.response.zerocopysend", "file": fh.fileno(),
+                            "offset": self.start, "count": self.length})
+            return
+        remaining = self.length
+        async with await anyio.open_file(self.path, "rb") as fh:
+            await fh.seek(self.start)
+            while remaining > 0:
+                chunk = await fh.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # El archivo se truncó mientras se enviaba: cerramos el cuerpo igual
+            await send({"type": "http.response.body", "body": b""})
+
+
+def _resolver(path: str) -> pathlib.Path:
+    root = UPLOAD_ROOT.resolve()
+    target = (root / path).resolve()
+    if root not in target.parents:
+        raise HTTPException(status_code=404, detail="No encontrado")
+    return target
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (inicio, fin inclusivo) de un rango único; None si no aplica (se envía
+    completo, p.ej. varios rangos). Lanza 416 si el rango no es satisfacible.
+    """
+    m = RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: los últimos N bytes
+        n = int(last)
+        if n == 0:
+            raise HTTPException(status_code=416, headers={"content-range": f"bytes */{size}"})
+        return max(size - n, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise HTTPException(status_code=416, headers={"content-range": f"bytes */{size}"})
+    return start, end
+
+
+def _etag_coincide(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110 §13.1.2): se ignora el prefijo W/
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+
+def _redirigir_gcs(backend: GCSStorage, path: str) -> Optional[Response]:
+    prefix = f"{EVIDENCE_SUBDIR}/"
+    if not path.startswith(prefix):
+        return None
+    name = path[len(prefix):]
+    if GCS_SIGNED_URLS:
+        url = backend.signed_url(name, minutes=GCS_SIGNED_URL_MINUTES)
+        cache = f"private, max-age={max(GCS_SIGNED_URL_MINUTES * 60 - 60, 0)}"
+    else:
+        url = backend.result(name)["public_url"]
+        cache = CACHE_IMMUTABLE if CONTENT_NAME_RE.match(name) else CACHE_REVALIDATE
+    return RedirectResponse(url, status_code=307, headers={"cache-control": cache})
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def servir_upload(path: str, request: Request):
+    target = _resolver(path)
+    if not target.is_file():
+        backend = get_storage()
+        if isinstance(backend, GCSStorage):
+            redirect = _redirigir_gcs(backend, path)
+            if redirect is not None:
+                return redirect
+        raise HTTPException(status_code=404, detail="No encontrado")
+
+    st = target.stat()
+    m = CONTENT_NAME_RE.match(target.name)
+    if m:
+        # El nombre es el sha256 del contenido: ETag fuerte sin leer el archivo
+        etag, cache = f'"{m.group(1)}"', CACHE_IMMUTABLE
+    else:
+        etag, cache = f'"{st.st_mtime_ns:x}-{st.st_size:x}"', CACHE_REVALIDATE
+
+    headers = {
+        "etag": etag,
+        "cache-control": cache,
+        "accept-ranges": "bytes",
+        "last-modified": format_datetime(datetime.fromtimestamp(st.st_mtime, timezone.utc), usegmt=True),
+    }
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if ACCEL_REDIRECT_PREFIX:
+        # nginx sirve el archivo (sendfile, Range) desde su location interno
+        rel = target.relative_to(UPLOAD_ROOT.resolve()).as_posix()
+        headers["x-accel-redirect"] = f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{rel}"
+        return Response(headers=headers)
+
+    media_type = mimetypes.guess_type(target.name)[0] or "application/octet-stream"
+    size = st.st_size
+    send_body = request.method != "HEAD"
+
+    rango = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if rango and (not if_range or if_range.strip() == etag):
+        parsed = _parse_range(rango, size)
+        if parsed:
+            start, end = parsed
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            return _FileSliceResponse(target, start, end - start + 1, 206, headers, media_type, send_body)
+
+    return _FileSliceResponse(target, 0, size, 200, headers, media_type, send_body)
@@ -6,7 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from app.database import get_db
 from app import models, schemas
 from app.dependencies import get_current_user
-from passlib.hash import bcrypt  # si ya usas otra, cámbiala
+from app.seguridad import hash_password
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -24,7 +24,7 @@ def reset_password(
     if not u:
         raise HTTPException(404, "User not found")
     # Permitimos que el admin cambie la suya o de otros
-    u.hashed_password = bcrypt.hash(payload.new_password)
+    u.hashed_password = hash_password(payload.new_password)
     db.commit()
     return Response(status_code=204)
 
@@ -46,25 +46,8 @@ def delete_user(user_id: int, db: Session = Depends(get_db), user=Depends(get_cu
         admins = db.query(models.User).filter(models.User.role == _as_db_role("admin")).count()
         if admins <= 1:
             raise HTTPException(status_code=400, detail="Cannot delete the last admin")
-    # Desvinculamos registros que referencian al usuario antes de eliminarlo (solo en motores con FK estricta)
-    dialect = getattr(getattr(db, "bind", None), "dialect", None)
-    dialect_name = getattr(dialect, "name", "")
-    if dialect_name in ("postgresql", "postgres"):
-        try:
-            db.query(models.PlanAccion).filter(models.PlanAccion.created_by == u.id).update(
-                {models.PlanAccion.created_by: None}, synchronize_session=False
-            )
-            db.query(models.Seguimiento).filter(models.Seguimiento.updated_by_id == u.id).update(
-                {models.Seguimiento.updated_by_id: None}, synchronize_session=False
-            )
-            db.commit()
-        except IntegrityError:
-            db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="No se pudo desvincular los planes/seguimientos asociados a este usuario",
-            )
-
+    # plan_accion.created_by, seguimiento.updated_by_id, etc. son ON DELETE SET NULL:
+    # la BD desvincula en el mismo DELETE (ver _relax_user_fk_constraints en app/migrations.py)
     try:
         db.delete(u)
         db.commit()
@@ -115,7 +98,7 @@ def create_user(payload: schemas.UserCreate, db: Session = Depends(get_db), user
     
     if exists:
         raise HTTPException(400, "Email already exists")
-    hashed = bcrypt.hash(payload.password)
+    hashed = hash_password(payload.password)
 
     perm = payload.entidad_perm if payload.role == "entidad" else None
     entidad_auditor = bool(payload.entidad_auditor) if payload.role == "entidad" else False
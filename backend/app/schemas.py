@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
+from typing import List, Optional
 from datetime import date, datetime
 from typing_extensions import Literal
 import enum
@@ -36,13 +36,40 @@ class PlanCreate(PlanBase):
     pass
 
 class PlanUpdate(PlanBase):
-    pass
+    version: Optional[int] = None  # versión editada (alternativa a If-Match)
 
 class PlanOut(PlanBase):
     id: int
     created_by: Optional[int] = None
+    num_seguimientos: int = 0
+    ultimo_seguimiento_at: Optional[datetime] = None
+    ultimo_seguimiento_estado: Optional[str] = None
+    ultimo_seguimiento_por_id: Optional[int] = None
+    version: int = 1
     model_config = ConfigDict(from_attributes=True)
 
+# Cambios de estado en lote (auditoría de muchos planes a la vez)
+class PlanLoteEstado(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    estado: Optional[str] = None
+    observacion: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _algo_que_cambiar(self):
+        if self.estado is None and self.observacion is None:
+            raise ValueError("Debe indicar 'estado' u 'observacion'")
+        return self
+
+class PlanLoteEliminar(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    papelera: bool = False
+
+class PlanLoteResultado(BaseModel):
+    id: int
+    ok: bool
+    estado: Optional[str] = None
+    error: Optional[str] = None
+
 # ---------- Users (Admin only) ----------
 UserRoleInput = Literal["admin", "entidad", "auditor"]
 
@@ -100,7 +127,7 @@ class SeguimientoCreate(SeguimientoBase):
 
 
 class SeguimientoUpdate(SeguimientoBase):
-    pass
+    version: Optional[int] = None  # versión editada (alternativa a If-Match)
 
 class SeguimientoOut(SeguimientoBase):
     id: int
@@ -109,9 +136,37 @@ class SeguimientoOut(SeguimientoBase):
     updated_at: Optional[datetime] = None
     updated_by_email: Optional[str] = None  
     updated_by_entidad: Optional[str] = None  
+    version: int = 1
     model_config = ConfigDict(from_attributes=True)   
 
 
+# Cadenas de ajustes (app/ajustes.py)
+class SeguimientoAjusteOut(SeguimientoOut):
+    profundidad: int  # 0 = raíz de la cadena
+
+
+# Historial de ediciones (app/historial.py)
+class SeguimientoCambioOut(BaseModel):
+    id: int
+    seguimiento_id: int
+    plan_id: int
+    version: int
+    accion: str
+    cambios: dict = {}          # {"campo": [antes, después]}
+    user_id: Optional[int] = None
+    user_email: Optional[str] = None
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("cambios", mode="before")
+    @classmethod
+    def _parse_cambios(cls, v):
+        if isinstance(v, str):
+            import json
+            v = json.loads(v) if v else {}
+        return v
+
+
 # ---------------- Reporte (padre) ----------------
 class ReportBase(BaseModel):
     entidad: Optional[str] = None
@@ -169,3 +224,28 @@ class HabilidadCreate(HabilidadBase):
 
 class HabilidadEntradaLista(BaseModel):
     habilidades: list[HabilidadBase]
+
+
+# --------------- Jobs (segundo plano) ----------------
+class JobOut(BaseModel):
+    id: str
+    tipo: str
+    estado: str
+    progreso: int
+    resultado: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("resultado", mode="before")
+    @classmethod
+    def _parse_resultado(cls, v):
+        if isinstance(v, str):
+            import json
+            v = json.loads(v) if v else None
+        if isinstance(v, dict):
+            # La ruta del archivo en el servidor no se expone; se baja por /jobs/{id}/descarga
+            v = {k: val for k, val in v.items() if k != "archivo"}
+        return v
@@ -0,0 +1,33 @@
+from typing import Optional
+from sqlalchemy import func
+from app import models
+
+
+def _role_value(user: models.User) -> str:
+    return getattr(user.role, "value", user.role)
+
+
+def entidad_restringida(user: models.User) -> Optional[str]:
+    """
+    Devuelve la entidad a la que queda restringido el usuario, o None si ve todas.
+    Misma regla que list_planes: solo el rol 'entidad' (sin permiso de auditor) se filtra.
+    """
+    user_entidad = (getattr(user, "entidad", "") or "").strip()
+    is_entidad_auditor = _role_value(user) == "entidad" and bool(getattr(user, "entidad_auditor", False))
+    if _role_value(user) == "entidad" and user_entidad and not is_entidad_auditor:
+        return user_entidad
+    return None
+
+
+def filtrar_planes_por_entidad(query, user: models.User):
+    """
+    Aplica a una consulta sobre PlanAccion el alcance por entidad del usuario
+    (y deja fuera los planes en la papelera).
+    """
+    query = query.filter(models.PlanAccion.deleted_at.is_(None))
+    entidad = entidad_restringida(user)
+    if entidad:
+        query = query.filter(
+            func.lower(models.PlanAccion.nombre_entidad) == func.lower(entidad)
+        )
+    return query
@@ -0,0 +1,43 @@
+"""
+Contraseñas (bcrypt con passlib) y tokens JWT (python-jose) en un solo lugar.
+
+passlib y jose (con el backend de cryptography) se importan en el primer uso y
+no al cargar app.main: el proceso queda escuchando antes y las rutas que no
+autentican (/health, /healthz) no los cargan nunca. El resto de la app usa estas
+funciones en lugar de importar las librerías. Medir: python tools/bench_arranque.py
+"""
+
+from functools import lru_cache
+from typing import Iterable
+
+
+class TokenInvalido(Exception):
+    """Firma, formato o vencimiento inválidos (envuelve jose.JWTError)."""
+
+
+@lru_cache(maxsize=None)
+def _contexto():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(clave: str) -> str:
+    return _contexto().hash(clave)
+
+
+def verify_password(clave: str, hashed: str) -> bool:
+    return _contexto().verify(clave, hashed)
+
+
+def codificar_token(payload: dict, secreto: str, algoritmo: str) -> str:
+    from jose import jwt
+    return jwt.encode(payload, secreto, algorithm=algoritmo)
+
+
+def decodificar_token(token: str, secreto: str, algoritmos: Iterable[str]) -> dict:
+    """Claims del token; TokenInvalido si no se puede verificar."""
+    from jose import JWTError, jwt
+    try:
+        return jwt.decode(token, secreto, algorithms=list(algoritmos))
+    except JWTError as e:
+        raise TokenInvalido(str(e)) from e
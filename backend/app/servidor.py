@@ -0,0 +1,21 @@
+"""
+Worker de gunicorn para la app (ver gunicorn.conf.py).
+
+Igual que uvicorn.workers.UvicornWorker, pero con un tope para el drenado: sin
+él, al recibir SIGTERM uvicorn espera sin límite a las conexiones abiertas (los
+flujos SSE de /seguimiento/eventos nunca terminan solos) y gunicorn termina
+matando el worker al vencer graceful_timeout, sin correr el cierre del lifespan
+(job_manager.shutdown). Con el tope, las conexiones que quedan se cortan unos
+segundos antes y el cliente SSE reconecta con Last-Event-ID.
+"""
+
+from uvicorn.workers import UvicornWorker
+
+# Segundos que se reservan para el cierre del lifespan tras cortar conexiones
+MARGEN_CIERRE = 5
+
+
+class Worker(UvicornWorker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - MARGEN_CIERRE)
@@ -0,0 +1,91 @@
+"""
+Single-flight para lecturas idempotentes.
+
+Si llegan a la vez varias peticiones con la misma llave (endpoint + alcance del
+usuario + parámetros), solo la primera consulta la BD y serializa; las demás
+esperan y reciben los mismos bytes. No es una caché: al terminar la consulta
+la llave se libera y la siguiente petición vuelve a leer.
+
+Las rutas son síncronas (threadpool), así que la espera es con threading.Event.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, Tuple
+
+from fastapi import Response
+
+from app.database import destino_lectura
+from app.metrics import colector
+
+# Cuánto espera un seguidor antes de consultar por su cuenta
+SINGLEFLIGHT_WAIT_SECONDS = float(os.getenv("SINGLEFLIGHT_WAIT_SECONDS", "30"))
+
+
+class _Llamada:
+    __slots__ = ("evento", "resultado", "error")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, espera: float = SINGLEFLIGHT_WAIT_SECONDS):
+        self.espera = espera
+        self._lock = threading.Lock()
+        self._en_curso: Dict[Tuple, _Llamada] = {}
+        # nombre -> {"ejecutadas": n, "compartidas": n}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"ejecutadas": 0, "compartidas": 0})
+
+    def do(self, nombre: str, key: Tuple[Hashable, ...], fn: Callable[[], bytes]) -> bytes:
+        k = (nombre,) + tuple(key)
+        with self._lock:
+            llamada = self._en_curso.get(k)
+            lider = llamada is None
+            if lider:
+                llamada = self._en_curso[k] = _Llamada()
+            self.stats[nombre]["ejecutadas" if lider else "compartidas"] += 1
+
+        if not lider:
+            if llamada.evento.wait(self.espera):
+                if llamada.error is not None:
+                    raise llamada.error
+                return llamada.resultado
+            # El líder tarda demasiado: no encadenamos a todos a su suerte
+            with self._lock:
+                self.stats[nombre]["compartidas"] -= 1
+                self.stats[nombre]["ejecutadas"] += 1
+            return fn()
+
+        try:
+            llamada.resultado = fn()
+            return llamada.resultado
+        except BaseException as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                self._en_curso.pop(k, None)
+            llamada.evento.set()
+
+
+singleflight = SingleFlight()
+
+
+def respuesta_compartida(nombre: str, key: Tuple[Hashable, ...], fn: Callable[[], bytes]) -> Response:
+    """Ejecuta `fn` (que devuelve el JSON ya serializado) con single-flight."""
+    # Quien lee de la primaria (acaba de escribir) no comparte con quien lee de la réplica
+    key = (destino_lectura.get(),) + tuple(key)
+    return Response(content=singleflight.do(nombre, key, fn), media_type="application/json")
+
+
+@colector
+def _metricas():
+    yield "# HELP singleflight_requests_total Lecturas por endpoint: ejecutadas (consultan la BD) o compartidas."
+    yield "# TYPE singleflight_requests_total counter"
+    for nombre, s in sorted(singleflight.stats.items()):
+        for resultado, n in s.items():
+            yield f'singleflight_requests_total{{endpoint="{nombre}",resultado="{resultado}"}} {n}'
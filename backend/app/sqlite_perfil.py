@@ -0,0 +1,150 @@
+"""
+Perfil de producción para SQLite (instalaciones pequeñas con sqlite:///./app.db).
+
+Al abrir cada conexión se fijan los PRAGMA:
+
+- journal_mode=WAL: los lectores leen la última versión confirmada mientras
+  alguien escribe (con el diario rollback por defecto esperaban al escritor).
+- synchronous=NORMAL: en WAL no se pierde consistencia; solo las últimas
+  transacciones ante un corte de luz (no ante la caída del proceso).
+- mmap_size, cache_size (por conexión), temp_store=MEMORY y busy_timeout.
+- foreign_keys=ON (ON DELETE CASCADE / SET NULL, ver app/borrado.py).
+
+SQLite admite un solo escritor a la vez. Un escritor que encuentra la BD
+ocupada reintenta con esperas crecientes dentro de busy_timeout y, si vence,
+falla con "database is locked". Con SQLITE_UN_ESCRITOR (por defecto) los
+escritores del proceso hacen fila en un turno propio (EscritorUnico): se toma
+en la primera sentencia que escribe y se suelta en el commit/rollback. Las
+lecturas no pasan por él. Entre procesos (gunicorn con varios workers) sigue
+mediando busy_timeout.
+
+Benchmark: python tools/bench_sqlite.py
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.metrics import colector
+
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", "256"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_UN_ESCRITOR = os.getenv("SQLITE_UN_ESCRITOR", "true").lower() == "true"
+
+_ESCRITURAS = ("insert", "update", "delete", "replace")
+
+
+def pragmas(wal: bool = SQLITE_WAL, synchronous: str = SQLITE_SYNCHRONOUS, mmap_mb: int = SQLITE_MMAP_MB,
+            cache_mb: int = SQLITE_CACHE_MB, busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS) -> list:
+    lista = [f"PRAGMA busy_timeout={busy_timeout_ms}", "PRAGMA foreign_keys=ON"]
+    if wal:
+        lista += ["PRAGMA journal_mode=WAL", f"PRAGMA synchronous={synchronous}"]
+    lista += [
+        f"PRAGMA mmap_size={mmap_mb * 1024 * 1024}",
+        f"PRAGMA cache_size=-{cache_mb * 1024}",  # negativo = KiB
+        "PRAGMA temp_store=MEMORY",
+    ]
+    return lista
+
+
+class EscritorUnico:
+    """
+    Turno de escritura del proceso. El dueño es la conexión (no el hilo): una
+    misma conexión puede escribir varias veces en su transacción. Si el turno no
+    llega en `espera_max` s se sigue igual y decide busy_timeout (nunca queda
+    peor que sin turno, p.ej. si un hilo escribe con dos sesiones a la vez).
+    """
+
+    def __init__(self, espera_max: float):
+        self.espera_max = espera_max
+        self._cond = threading.Condition()
+        self._dueno: Optional[int] = None
+        self.stats = {"turnos": 0, "esperas": 0, "espera_segundos": 0.0, "vencidos": 0}
+
+    def tomar(self, clave: int) -> bool:
+        with self._cond:
+            if self._dueno == clave:
+                return True
+            t0 = time.monotonic()
+            if self._dueno is not None:
+                self.stats["esperas"] += 1
+                if not self._cond.wait_for(lambda: self._dueno is None, timeout=self.espera_max):
+                    self.stats["vencidos"] += 1
+                    self.stats["espera_segundos"] += time.monotonic() - t0
+                    return False
+                self.stats["espera_segundos"] += time.monotonic() - t0
+            self._dueno = clave
+            self.stats["turnos"] += 1
+            return True
+
+    def soltar(self, clave: int) -> None:
+        with self._cond:
+            if self._dueno == clave:
+                self._dueno = None
+                self._cond.notify()
+
+
+escritores: list = []
+
+
+def configurar(engine, un_escritor: bool = SQLITE_UN_ESCRITOR, **kw):
+    """Registra los PRAGMA (y el turno de escritura) en un engine SQLite sobre archivo."""
+    sentencias = pragmas(**kw)
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for sentencia in sentencias:
+            cur.execute(sentencia)
+        cur.close()
+
+    if not un_escritor:
+        return engine
+
+    turno = EscritorUnico(espera_max=kw.get("busy_timeout_ms", SQLITE_BUSY_TIMEOUT_MS) / 1000)
+    escritores.append(turno)
+    engine.escritor = turno
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if "escritor" not in conn.info and statement.lstrip()[:7].lower().startswith(_ESCRITURAS):
+            if turno.tomar(id(conn.info)):
+                conn.info["escritor"] = True
+
+    def _fin(conn):
+        if conn.info.pop("escritor", None):
+            turno.soltar(id(conn.info))
+
+    event.listen(engine, "commit", _fin)
+    event.listen(engine, "rollback", _fin)
+
+    @event.listens_for(engine, "checkin")
+    def _devuelta(dbapi_conn, record):
+        # Por si la conexión vuelve al pool sin commit/rollback explícito
+        if record.info.pop("escritor", None):
+            turno.soltar(id(record.info))
+
+    return engine
+
+
+@colector
+def _metricas():
+    if not escritores:
+        return
+    yield "# HELP sqlite_escritor_turnos_total Transacciones de escritura que tomaron el turno único."
+    yield "# TYPE sqlite_escritor_turnos_total counter"
+    yield f"sqlite_escritor_turnos_total {sum(t.stats['turnos'] for t in escritores)}"
+    yield "# HELP sqlite_escritor_esperas_total Escrituras que esperaron turno (vencidas: siguieron sin él)."
+    yield "# TYPE sqlite_escritor_esperas_total counter"
+    yield f'sqlite_escritor_esperas_total{{resultado="turno"}} ' \
+          f"{sum(t.stats['esperas'] - t.stats['vencidos'] for t in escritores)}"
+    yield f'sqlite_escritor_esperas_total{{resultado="vencida"}} {sum(t.stats["vencidos"] for t in escritores)}'
+    yield "# HELP sqlite_escritor_espera_segundos_total Tiempo total esperando turno de escritura."
+    yield "# TYPE sqlite_escritor_espera_segundos_total counter"
+    yield f"sqlite_escritor_espera_segundos_total {sum(t.stats['espera_segundos'] for t in escritores):.6f}"
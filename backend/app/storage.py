@@ -0,0 +1,195 @@
+"""
+Almacenamiento de evidencias.
+
+Dos backends con la misma interfaz:
+- LocalStorage: disco local (uploads/evidence); también es el sustituto en pruebas.
+- GCSStorage: bucket de Google Cloud Storage con un único cliente por proceso.
+
+Una subida se abre con `begin(content_type)`, recibe `write()` por bloques y
+termina con `commit(object_name)` o `abort()`. Todas estas llamadas son
+bloqueantes (disco / HTTP): la ruta async las ejecuta en el threadpool.
+"""
+
+import os
+import pathlib
+import threading
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional
+
+# Local filesystem (fallback)
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+EVIDENCE_SUBDIR = os.getenv("EVIDENCE_SUBDIR", "evidence")
+BASE_DIR = pathlib.Path(UPLOAD_DIR) / EVIDENCE_SUBDIR
+
+# GCS
+GCS_BUCKET = os.getenv("GCS_BUCKET", "").strip()
+GCS_PREFIX = os.getenv("GCS_PREFIX", "evidence/").lstrip("/")
+
+# Bloques de la subida reanudable a GCS (múltiplo de 256 KB)
+GCS_CHUNK_BYTES = int(os.getenv("GCS_CHUNK_KB", "1024")) * 1024
+
+
+class StorageUnavailable(RuntimeError):
+    """El backend configurado no puede usarse (p.ej. falta google-cloud-storage)."""
+
+
+# ---------------- Disco local ----------------
+class _LocalUpload:
+    """Escribe en <base>/.tmp y al final renombra (mismo disco, sin copia)."""
+
+    def __init__(self, backend: "LocalStorage"):
+        self.backend = backend
+        tmp_dir = backend.base_dir / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = tmp_dir / uuid.uuid4().hex
+        self._fh = self.tmp_path.open("wb")
+
+    def write(self, data: bytes) -> None:
+        self._fh.write(data)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def commit(self, object_name: str) -> None:
+        os.replace(self.tmp_path, self.backend.base_dir / object_name)
+
+    def abort(self) -> None:
+        self._fh.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class LocalStorage:
+    def __init__(self, base_dir: pathlib.Path, url_prefix: str = f"/uploads/{EVIDENCE_SUBDIR}"):
+        self.base_dir = pathlib.Path(base_dir)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def begin(self, content_type: str) -> _LocalUpload:
+        return _LocalUpload(self)
+
+    def exists(self, object_name: str) -> bool:
+        return (self.base_dir / object_name).exists()
+
+    def delete(self, object_name: str) -> None:
+        (self.base_dir / object_name).unlink(missing_ok=True)
+
+    def result(self, object_name: str) -> Dict[str, str]:
+        return {"url": f"{self.url_prefix}/{object_name}"}  # relativo al backend
+
+
+# ---------------- Google Cloud Storage ----------------
+_client = None
+_client_lock = threading.Lock()
+
+
+def _gcs():
+    """
+    google.cloud.storage (arrastra google-auth, requests y protobuf) se importa
+    solo cuando se usa GCS: sin GCS_BUCKET el proceso nunca lo carga.
+    """
+    try:
+        from google.cloud import storage  # requirements.txt: google-cloud-storage
+    except ImportError as e:
+        raise StorageUnavailable("google-cloud-storage no instalado en el servidor") from e
+    return storage
+
+
+def gcs_client():
+    """
+    Cliente de GCS compartido por todo el proceso: credenciales y sesión HTTP
+    se crean una sola vez (el cliente es seguro entre hilos).
+    """
+    global _client
+    if _client is None:
+        gcs = _gcs()
+        with _client_lock:
+            if _client is None:
+                _client = gcs.Client()
+    return _client
+
+
+class _GCSUpload:
+    """Sube a <prefijo>/tmp/ por bloques y al final copia del lado del servidor."""
+
+    def __init__(self, backend: "GCSStorage", content_type: str):
+        self.backend = backend
+        self._tmp = backend.bucket.blob(f"{backend.prefix}/tmp/{uuid.uuid4().hex}", chunk_size=GCS_CHUNK_BYTES)
+        # Subida reanudable: no hay copia local ni se carga el archivo entero en memoria
+        self._writer = self._tmp.open("wb", content_type=content_type)
+
+    def write(self, data: bytes) -> None:
+        self._writer.write(data)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def commit(self, object_name: str) -> None:
+        bucket = self.backend.bucket
+        bucket.copy_blob(self._tmp, bucket, self.backend.full_name(object_name))
+        self._tmp.delete()
+
+    def abort(self) -> None:
+        # Sin close() la sesión reanudable nunca se finaliza; si ya se cerró se borra
+        try:
+            if self._writer.closed:
+                self._tmp.delete()
+        except Exception:
+            pass
+
+
+class GCSStorage:
+    def __init__(self, bucket_name: str, prefix: str = GCS_PREFIX):
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/")
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            self._bucket = gcs_client().bucket(self.bucket_name)
+        return self._bucket
+
+    def full_name(self, object_name: str) -> str:
+        return f"{self.prefix}/{object_name}" if self.prefix else object_name
+
+    def begin(self, content_type: str) -> _GCSUpload:
+        return _GCSUpload(self, content_type)
+
+    def exists(self, object_name: str) -> bool:
+        return True  # la fila en evidencia_blob es la fuente de verdad
+
+    def delete(self, object_name: str) -> None:
+        blob = self.bucket.blob(self.full_name(object_name))
+        if blob.exists():
+            blob.delete()
+
+    def signed_url(self, object_name: str, minutes: int = 15) -> str:
+        """URL firmada (v4) de lectura: el cliente descarga directo de GCS, con Range."""
+        blob = self.bucket.blob(self.full_name(object_name))
+        return blob.generate_signed_url(version="v4", expiration=timedelta(minutes=minutes), method="GET")
+
+    def result(self, object_name: str) -> Dict[str, str]:
+        full = self.full_name(object_name)
+        return {
+            "public_url": f"https://storage.googleapis.com/{self.bucket_name}/{full}",
+            "object_name": full,
+        }
+
+
+# ---------------- Backend del proceso ----------------
+_backend = None
+
+
+def get_storage():
+    """Backend según el entorno (GCS_BUCKET o disco), creado una vez."""
+    global _backend
+    if _backend is None:
+        _backend = GCSStorage(GCS_BUCKET) if GCS_BUCKET else LocalStorage(BASE_DIR)
+    return _backend
+
+
+def set_storage(backend: Optional[object]) -> None:
+    """Reemplaza el backend (pruebas, herramientas); None vuelve al del entorno."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,149 @@
+"""
+Lectura en streaming de un cuerpo multipart/form-data.
+
+El parser de python-multipart se alimenta con los trozos del cuerpo ASGI a
+medida que llegan; los bytes de la parte de archivo quedan en `pending` para
+que la ruta los escriba en su destino final. Nada se guarda en un archivo
+temporal intermedio.
+"""
+
+from typing import Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Bytes que se miran para detectar el tipo real del archivo
+SNIFF_BYTES = 512
+
+_FIRMAS = [
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"Rar!\x1a\x07", "application/x-rar-compressed"),
+    (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/vnd.ms-excel"),  # OLE2 (XLS)
+]
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# Controles C0 que no aparecen en texto (se permiten \t \n \f \r)
+_CONTROLES = bytes(c for c in range(32) if c not in b"\t\n\f\r") + b"\x7f"
+
+
+def _parece_texto(head: bytes) -> bool:
+    """Texto UTF-8 o cp1252 (CSV guardado por Excel en español) sin bytes de control."""
+    if any(c in _CONTROLES for c in head):
+        return False
+    try:
+        head.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        # Un carácter multibyte cortado al final del bloque no cuenta
+        if e.start >= len(head) - 3:
+            return True
+    try:
+        head.decode("cp1252")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_mime(head: bytes, declared: Optional[str], filename: str) -> Optional[str]:
+    """
+    Tipo MIME según los primeros bytes. Los formatos contenedor (zip) se
+    afinan con el tipo declarado o la extensión; CSV no tiene firma y se
+    acepta si el contenido es texto y así se declaró o nombró.
+    """
+    name = (filename or "").lower()
+    declared = (declared or "").split(";")[0].strip().lower()
+    for firma, mime in _FIRMAS:
+        if head.startswith(firma):
+            if mime == "application/zip":
+                if declared == XLSX or name.endswith(".xlsx"):
+                    return XLSX
+                if declared == "application/x-zip-compressed":
+                    return declared
+            return mime
+    if head and _parece_texto(head) and (
+        name.endswith(".csv") or declared in ("text/csv", "text/plain", "application/vnd.ms-excel")
+    ):
+        return "text/csv"
+    return None
+
+
+class MultipartStream:
+    """
+    Parser incremental: feed(chunk) procesa un trozo del cuerpo y deja en
+    `pending` los bytes de la parte `field_name` (el archivo).
+    """
+
+    def __init__(self, content_type: str, field_name: str = "file"):
+        ctype, params = parse_options_header(content_type or "")
+        if ctype != b"multipart/form-data" or b"boundary" not in params:
+            raise ValueError("Se esperaba multipart/form-data con boundary")
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.found = False
+        self.finished = False
+        self.pending: list[bytes] = []
+
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_end": self._on_end,
+        })
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.write(chunk)
+
+    def take(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending.clear()
+        return data
+
+    # ---------------- callbacks ----------------
+    def _on_part_begin(self):
+        self._headers = {}
+        self._in_file = False
+
+    def _on_header_field(self, data, start, end):
+        self._field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field, self._value = b"", b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name == self.field_name and b"filename" in options and not self.found:
+            self.found = True
+            self._in_file = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+
+    def _on_part_data(self, data, start, end):
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self):
+        self._in_file = False
+
+    def _on_end(self):
+        self.finished = True
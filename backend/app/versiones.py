@@ -0,0 +1,66 @@
+"""
+Control de concurrencia optimista para planes y seguimientos.
+
+Cada fila lleva una columna `version` que sube en cada escritura. El cliente
+envía la versión que editó (encabezado `If-Match: "3"` o campo `version` del
+cuerpo) y la escritura es un único UPDATE condicional:
+
+    UPDATE ... SET ..., version = version + 1
+    WHERE id = :id AND version = :esperada
+    RETURNING *
+
+Si no se actualizó ninguna fila, alguien guardó antes: 409 con el ETag vigente.
+Sin versión esperada la escritura procede como antes (compatibilidad).
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def version_esperada(if_match: Optional[str], en_cuerpo: Optional[int]) -> Optional[int]:
+    """Versión que el cliente dice estar editando (If-Match o cuerpo); None = sin condición."""
+    desde_header = None
+    if if_match and if_match.strip() != "*":
+        valor = if_match.strip()
+        if valor.startswith("W/"):
+            valor = valor[2:]
+        try:
+            desde_header = int(valor.strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="If-Match no válido: se espera la versión, p.ej. \"3\"")
+    if desde_header is not None and en_cuerpo is not None and desde_header != en_cuerpo:
+        raise HTTPException(status_code=400, detail="If-Match y version del cuerpo no coinciden")
+    return desde_header if desde_header is not None else en_cuerpo
+
+
+def actualizar_con_version(db: Session, model, filtros: list, valores: dict, esperada: Optional[int]):
+    """
+    UPDATE condicional con RETURNING; devuelve el objeto ya actualizado o None
+    si ninguna fila cumplió los filtros (no existe o la versión no coincide).
+    """
+    condiciones = list(filtros)
+    if esperada is not None:
+        condiciones.append(model.version == esperada)
+    stmt = (
+        update(model)
+        .where(*condiciones)
+        .values(**valores, version=model.version + 1)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return db.execute(stmt).scalars().first()
+
+
+def conflicto(version_actual: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="El registro fue modificado por otro usuario; recargue e intente de nuevo",
+        headers={"ETag": etag(version_actual)},
+    )
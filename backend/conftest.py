@@ -10,8 +10,9 @@ from sqlalchemy import create_engine, StaticPool
 from sqlalchemy.orm import sessionmaker, Session
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+from app.database import Base, activar_fk_sqlite, get_db
 from app.main import app
+from app.ratelimit import reset_rate_limits
 from app import models
 from passlib.context import CryptContext
 
@@ -26,11 +27,11 @@ def test_db():
     Crea una base de datos SQLite en memoria para cada prueba.
     Se ejecuta antes de cada prueba y se limpia después.
     """
-    engine = create_engine(
+    engine = activar_fk_sqlite(create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
-    )
+    ))
     
     # Crear todas las tablas
     Base.metadata.create_all(bind=engine)
@@ -59,6 +60,8 @@ def client(test_db: Session):
     """
     Cliente de prueba para hacer requests a la API.
     """
+    # Cada prueba parte con las cubetas de límite de tasa llenas
+    reset_rate_limits()
     return TestClient(app)
 
 
@@ -0,0 +1,5 @@
+#!/bin/bash
+# docker/pg-replicacion.sh — se ejecuta al crear la BD del servicio `db`: permite que
+# `db-replica` (perfil "replica" de docker-compose.yml) se conecte por streaming.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
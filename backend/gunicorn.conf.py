@@ -0,0 +1,46 @@
+# gunicorn.conf.py — servidor de producción: gunicorn administra varios procesos uvicorn.
+# Usa: gunicorn -c gunicorn.conf.py app.main:app
+#
+# - WEB_CONCURRENCY procesos (por defecto, uno por CPU y al menos 2): bcrypt y la
+#   serialización JSON dejan de competir por un solo núcleo.
+# - La app se carga una vez en el maestro (preload) y ahí mismo se aplican las
+#   migraciones (app/migrations.py) antes de crear los workers.
+# - SIGTERM drena: se dejan de aceptar conexiones y las peticiones en curso tienen
+#   GRACEFUL_TIMEOUT s; los flujos SSE se cortan antes y el cliente reconecta con Last-Event-ID.
+# - Cada worker se recicla tras MAX_REQUESTS peticiones (± jitter para que no lo hagan juntos).
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+preload_app = True
+
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "25"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE_SECONDS", "5"))
+max_requests = int(os.getenv("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+
+worker_class = "app.servidor.Worker"  # UvicornWorker con tope de drenado
+
+
+def on_starting(server):
+    # Maestro, con la app ya importada y antes del fork: una sola vez por despliegue
+    from app import migrations
+    from app.database import engine
+
+    migrations.aplicar()
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    # Las conexiones del pool no se comparten entre procesos
+    from app.database import engine, replica_engine
+
+    engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
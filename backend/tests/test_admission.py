@@ -0,0 +1,94 @@
+"""
+Pruebas para el control de admisión (carriles, cola acotada y 503).
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from app.admission import AdmissionMiddleware, Carril, clasificar
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestAdmission:
+    """Suite de pruebas para AdmissionMiddleware."""
+
+    def test_clasificar_rutas(self):
+        """
+        Prueba la asignación de carriles y la vía prioritaria.
+        """
+        assert clasificar("GET", "/healthz") is None
+        assert clasificar("GET", "/metrics") is None
+        assert clasificar("OPTIONS", "/seguimiento") is None
+        assert clasificar("POST", "/auth/token") == "auth"
+        assert clasificar("POST", "/files/upload") == "subidas"
+        assert clasificar("POST", "/pqrds") == "masivas"
+        assert clasificar("GET", "/exports/planes") == "masivas"
+        assert clasificar("GET", "/pqrds") == "lecturas"
+        assert clasificar("PUT", "/seguimiento/1") == "escrituras"
+
+    def test_cola_llena(self):
+        """
+        Prueba que con el carril ocupado se espera turno y que con la cola
+        llena se rechaza de inmediato.
+        """
+        async def escenario():
+            carril = Carril("lecturas", limite=1, cola=1, espera_ms=1000)
+            assert await carril.entrar()                       # ocupa el único turno
+            esperando = asyncio.ensure_future(carril.entrar())  # queda en cola
+            await asyncio.sleep(0)
+            assert carril.en_cola == 1
+            assert not await carril.entrar()                   # cola llena -> rechazo
+            carril.salir()                                     # cede el turno al de la cola
+            assert await esperando
+            return carril
+
+        carril = _run(escenario())
+        assert carril.en_curso == 1
+        assert carril.rechazadas == 1
+        assert carril.admitidas == 2
+
+    def test_espera_vencida(self):
+        """
+        Prueba que una petición que espera más que el plazo recibe rechazo.
+        """
+        async def escenario():
+            carril = Carril("escrituras", limite=1, cola=5, espera_ms=30)
+            await carril.entrar()
+            return await carril.entrar(), carril.en_cola
+
+        admitida, en_cola = _run(escenario())
+        assert admitida is False
+        assert en_cola == 0
+
+    def test_503_con_retry_after(self):
+        """
+        Prueba la respuesta 503 del middleware cuando el carril no admite más.
+        """
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        mw = AdmissionMiddleware(app, enabled=True)
+        mw.carriles["lecturas"] = Carril("lecturas", limite=0, cola=0, espera_ms=1000)
+        enviados = []
+
+        async def send(msg):
+            enviados.append(msg)
+
+        _run(mw({"type": "http", "method": "GET", "path": "/seguimiento"}, None, send))
+        assert enviados[0]["status"] == 503
+        assert (b"retry-after", b"1") in enviados[0]["headers"]
+
+        enviados.clear()
+        _run(mw({"type": "http", "method": "GET", "path": "/healthz"}, None, send))
+        assert enviados[0]["status"] == 200
+
+    def test_healthz_y_metricas(self, client: TestClient):
+        """
+        Prueba que la app sigue respondiendo y publica las métricas de admisión.
+        """
+        assert client.get("/healthz").status_code == 200
+        assert "admission_requests_total" in client.get("/metrics").text
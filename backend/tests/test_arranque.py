@@ -0,0 +1,55 @@
+"""
+Pruebas del arranque en frío: app.main no carga dependencias pesadas opcionales
+y se importa dentro del presupuesto (COLD_START_BUDGET_MS).
+"""
+
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+BACKEND = pathlib.Path(__file__).resolve().parents[1]
+# Holgado a propósito (~0.85 s medidos en 1 CPU): detecta regresiones grandes, no ruido
+PRESUPUESTO_MS = float(os.getenv("COLD_START_BUDGET_MS", "2500"))
+PEREZOSOS = ("jose", "passlib", "cryptography", "google.cloud.storage")
+
+_SONDA = (
+    "import sys, time; t = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - t) * 1000); "
+    "print(','.join(sys.modules))"
+)
+
+
+def _importar():
+    r = subprocess.run([sys.executable, "-c", _SONDA], cwd=BACKEND, capture_output=True, text=True, check=True)
+    ms, mods = r.stdout.strip().splitlines()[-2:]
+    return float(ms), set(mods.split(","))
+
+
+class TestArranque:
+    """Suite de pruebas del tiempo de arranque."""
+
+    def test_sin_dependencias_pesadas(self):
+        """
+        Prueba que importar la app no carga passlib, jose ni google-cloud-storage.
+        """
+        _, mods = _importar()
+        cargados = [p for p in PEREZOSOS if any(m == p or m.startswith(p + ".") for m in mods)]
+        assert cargados == []
+
+    def test_presupuesto_de_arranque(self):
+        """
+        Prueba que la mediana de tres arranques en frío cabe en el presupuesto.
+        """
+        mediana = statistics.median(_importar()[0] for _ in range(3))
+        assert mediana < PRESUPUESTO_MS, f"import app.main tardó {mediana:.0f} ms (presupuesto {PRESUPUESTO_MS:.0f})"
+
+    def test_login_carga_al_primer_uso(self, client, admin_user):
+        """
+        Prueba que contraseñas y tokens siguen funcionando con la carga perezosa.
+        """
+        r = client.post("/auth/token", data={"username": admin_user.email, "password": "admin123"})
+        assert r.status_code == 200
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {r.json()['access_token']}"})
+        assert me.status_code == 200
@@ -0,0 +1,66 @@
+"""
+Pruebas para el resumen del tablero (/dashboard/resumen) y la tabla estadisticas.
+"""
+
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from app import models
+from app.estadisticas import reconstruir, resumen
+
+
+def _snapshot(db):
+    return sorted((e.entidad, e.metrica, e.clave, e.valor) for e in db.query(models.Estadistica).all())
+
+
+class TestDashboard:
+    """Suite de pruebas para las estadísticas del tablero."""
+
+    def test_escrituras_mantienen_estadisticas(self, client: TestClient, test_db, admin_token):
+        """
+        Prueba que crear, cambiar de estado, agregar seguimientos y borrar deja
+        la tabla igual a una reconstrucción desde cero.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        base = {"nombre_entidad": "Secretaría de Salud", "fecha_final": "2024-03-31"}
+        a = client.post("/seguimiento", json=base, headers=headers).json()
+        b = client.post("/seguimiento", json={**base, "fecha_final": "2999-01-01"}, headers=headers).json()
+        c = client.post("/seguimiento", json={**base, "nombre_entidad": "Secretaría de Educación"},
+                        headers=headers).json()
+
+        client.post(f"/seguimiento/{a['id']}/enviar_revision", headers=headers)
+        client.post("/seguimiento/lote/estado", json={"ids": [b["id"]], "estado": "Aprobado"}, headers=headers)
+        client.put(f"/seguimiento/{c['id']}", json={**base, "nombre_entidad": "Secretaría de Educación",
+                                                     "fecha_final": "2024-01-15"}, headers=headers)
+        seg = client.post(f"/seguimiento/{a['id']}/seguimiento", json={"seguimiento": "Avance"}, headers=headers).json()
+        client.post(f"/seguimiento/{a['id']}/seguimiento", json={"seguimiento": "Otro"}, headers=headers)
+        client.delete(f"/seguimiento/{a['id']}/seguimiento/{seg['id']}", headers=headers)
+        client.delete(f"/seguimiento/{c['id']}", headers=headers)
+
+        incremental = _snapshot(test_db)
+        reconstruir(test_db); test_db.commit()
+        assert incremental == _snapshot(test_db)
+
+        data = resumen(test_db, hoy=date(2025, 1, 1))
+        salud = data["entidades"][0]
+        assert salud["entidad"] == "Secretaría de Salud"
+        assert salud["por_estado"] == {"En revisión": 1, "Aprobado": 1}
+        assert salud["vencidos"] == 1
+        assert data["seguimientos_por_mes"] == {datetime.utcnow().strftime("%Y-%m"): 1}
+
+    def test_endpoint_alcance_entidad(self, client: TestClient, test_db, admin_token, entidad_token, plan_action):
+        """
+        Prueba el endpoint y que un usuario de entidad solo ve la suya.
+        """
+        otro = models.PlanAccion(nombre_entidad="Secretaría de Salud", estado="Observado")
+        test_db.add(otro); test_db.commit()
+        reconstruir(test_db); test_db.commit()
+
+        todo = client.get("/dashboard/resumen", headers={"Authorization": f"Bearer {admin_token}"}).json()
+        assert todo["totales"]["planes"] == 2
+        assert todo["totales"]["por_estado"] == {"Pendiente": 1, "Observado": 1}
+        assert todo["totales"]["vencidos"] == 1  # plan_action vence el 2024-12-31
+
+        propio = client.get("/dashboard/resumen?entidad=Secretaría de Salud",
+                            headers={"Authorization": f"Bearer {entidad_token}"}).json()
+        assert [e["entidad"] for e in propio["entidades"]] == ["Secretaría de Educación"]
@@ -0,0 +1,96 @@
+"""
+Pruebas para las exportaciones CSV/XLSX en streaming.
+"""
+
+import csv
+import io
+import zipfile
+from fastapi.testclient import TestClient
+from app import models
+
+
+class TestExportsEndpoints:
+    """Suite de pruebas para /exports."""
+
+    def test_export_planes_csv(self, client: TestClient, test_db, admin_user, admin_token, plan_action):
+        """
+        Prueba que el CSV de planes incluye encabezado y filas.
+        """
+        response = client.get(
+            "/exports/planes?formato=csv",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert rows[0][0] == "id"
+        assert len(rows) == 2
+        assert rows[1][2] == "Secretaría de Educación"
+
+    def test_export_planes_entidad_scope(self, client: TestClient, test_db, admin_user, entidad_user, entidad_token, plan_action):
+        """
+        Prueba que un usuario de entidad solo exporta los planes de su entidad.
+        """
+        test_db.add(models.PlanAccion(nombre_entidad="Otra Entidad", created_by=admin_user.id))
+        test_db.commit()
+
+        response = client.get(
+            "/exports/planes",
+            headers={"Authorization": f"Bearer {entidad_token}"}
+        )
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert len(rows) == 2
+        assert rows[1][2] == entidad_user.entidad
+
+    def test_export_planes_filtro_estado(self, client: TestClient, test_db, admin_user, admin_token, plan_action):
+        """
+        Prueba el filtro por estado.
+        """
+        response = client.get(
+            "/exports/planes?estado=Aprobado",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert len(rows) == 1
+
+    def test_export_seguimientos_xlsx(self, client: TestClient, test_db, admin_user, admin_token, plan_action, seguimiento):
+        """
+        Prueba que el XLSX de seguimientos es un libro válido con los datos.
+        """
+        response = client.get(
+            f"/exports/seguimientos?formato=xlsx&plan_id={plan_action.id}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        zf = zipfile.ZipFile(io.BytesIO(response.content))
+        assert "xl/workbook.xml" in zf.namelist()
+        sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        assert "Fotos actualizadas" in sheet
+        assert "admin@test.com" in sheet
+
+    def test_export_seguimientos_plan_not_found(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba exportar seguimientos de un plan inexistente.
+        """
+        response = client.get(
+            "/exports/seguimientos?plan_id=99999",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 404
+
+    def test_export_seguimientos_plan_de_otra_entidad(self, client: TestClient, test_db, admin_user, entidad_user, entidad_token):
+        """
+        Prueba que el plan de otra entidad responde igual que uno inexistente (404).
+        """
+        otro = models.PlanAccion(nombre_entidad="Otra Entidad", created_by=admin_user.id)
+        test_db.add(otro)
+        test_db.commit()
+
+        headers = {"Authorization": f"Bearer {entidad_token}"}
+        ajeno = client.get(f"/exports/seguimientos?plan_id={otro.id}", headers=headers)
+        inexistente = client.get("/exports/seguimientos?plan_id=99999", headers=headers)
+        assert ajeno.status_code == inexistente.status_code == 404
+        assert ajeno.json() == inexistente.json()
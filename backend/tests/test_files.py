@@ -0,0 +1,286 @@
+"""
+Pruebas para la carga de evidencias (/files/upload).
+"""
+
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from app import models, storage
+from app.storage import GCSStorage, LocalStorage, set_storage
+
+PDF = b"%PDF-1.4\n" + b"0" * 2048 + b"\n%%EOF"
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    """Guarda las evidencias en un directorio temporal (backend de disco)."""
+    set_storage(LocalStorage(tmp_path))
+    yield tmp_path
+    set_storage(None)
+
+
+def _guardados(directorio):
+    """Archivos de evidencia definitivos (sin el directorio temporal)."""
+    return [p for p in directorio.rglob("*") if p.is_file() and ".tmp" not in p.parts]
+
+
+class TestFilesUpload:
+    """Suite de pruebas para la carga de evidencias."""
+
+    def test_upload_pdf(self, client: TestClient, upload_dir):
+        """
+        Prueba que un PDF se guarda en un solo paso en el destino final.
+        """
+        response = client.post(
+            "/files/upload",
+            files={"file": ("acta.pdf", PDF, "application/pdf")},
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["content_type"] == "application/pdf"
+        assert data["filename"] == "acta.pdf"
+        stored = _guardados(upload_dir)
+        assert len(stored) == 1
+        assert stored[0].name == f"{data['sha256']}.pdf"
+        assert stored[0].read_bytes() == PDF
+
+    def test_upload_small_csv(self, client: TestClient, upload_dir):
+        """
+        Prueba un CSV más pequeño que el bloque de detección.
+        """
+        response = client.post(
+            "/files/upload",
+            files={"file": ("datos.csv", b"a,b\n1,2\n", "application/vnd.ms-excel")},
+        )
+        assert response.status_code == 201
+        assert response.json()["content_type"] == "text/csv"
+
+    def test_upload_type_sniffed_from_content(self, client: TestClient, upload_dir):
+        """
+        Prueba que un ejecutable disfrazado de PDF es rechazado.
+        """
+        response = client.post(
+            "/files/upload",
+            files={"file": ("acta.pdf", b"MZ\x90\x00" + b"\x00" * 1024, "application/pdf")},
+        )
+        assert response.status_code == 415
+        assert _guardados(upload_dir) == []
+
+    def test_upload_too_large_aborts(self, client: TestClient, upload_dir, monkeypatch):
+        """
+        Prueba que un archivo que supera el límite se corta y no queda en disco.
+        """
+        monkeypatch.setattr("app.routers.files.MAX_UPLOAD_BYTES", 1024)
+        monkeypatch.setattr("app.routers.files.MULTIPART_OVERHEAD", 10 ** 9)
+        response = client.post(
+            "/files/upload",
+            files={"file": ("acta.pdf", PDF, "application/pdf")},
+        )
+        assert response.status_code == 413
+        assert _guardados(upload_dir) == []
+
+    def test_upload_content_length_rejected(self, client: TestClient, upload_dir, monkeypatch):
+        """
+        Prueba el rechazo inmediato por Content-Length.
+        """
+        monkeypatch.setattr("app.routers.files.MAX_UPLOAD_BYTES", 1024)
+        monkeypatch.setattr("app.routers.files.MULTIPART_OVERHEAD", 0)
+        response = client.post(
+            "/files/upload",
+            files={"file": ("acta.pdf", PDF, "application/pdf")},
+        )
+        assert response.status_code == 413
+
+    def test_upload_binario_como_csv(self, client: TestClient, upload_dir):
+        """
+        Prueba que contenido binario (bytes de control) no pasa como CSV por su extensión.
+        """
+        response = client.post(
+            "/files/upload",
+            files={"file": ("datos.csv", b"\xc3\x28\xa0\xa1" + b"\xfe\x02\xff\x1b" * 300, "text/csv")},
+        )
+        assert response.status_code == 415
+        assert _guardados(upload_dir) == []
+
+    def test_upload_csv_cp1252(self, client: TestClient, upload_dir):
+        """
+        Prueba que un CSV guardado por Excel en cp1252 (tildes y eñes) se acepta.
+        """
+        contenido = "Año,Acción,Ciudad\r\n2024,Revisión “anual”,Bogotá\r\n".encode("cp1252")
+        response = client.post("/files/upload", files={"file": ("datos.csv", contenido, "text/csv")})
+        assert response.status_code == 201
+        assert response.json()["content_type"] == "text/csv"
+        assert len(_guardados(upload_dir)) == 1
+
+    def test_upload_cuerpo_truncado(self, client: TestClient, test_db, upload_dir):
+        """
+        Prueba que un cuerpo sin el boundary de cierre se rechaza y no deja objeto ni blob.
+        """
+        cuerpo = (
+            b"--xyz\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="acta.pdf"\r\n'
+            b"Content-Type: application/pdf\r\n\r\n" + PDF
+        )
+        response = client.post(
+            "/files/upload",
+            content=cuerpo,
+            headers={"Content-Type": "multipart/form-data; boundary=xyz"},
+        )
+        assert response.status_code == 400
+        assert _guardados(upload_dir) == []
+        assert test_db.query(models.EvidenciaBlob).count() == 0
+
+    def test_upload_missing_file(self, client: TestClient, upload_dir):
+        """
+        Prueba que falta el campo 'file'.
+        """
+        response = client.post("/files/upload", files={"otro": ("a.pdf", PDF, "application/pdf")})
+        assert response.status_code == 422
+
+    def test_upload_duplicado_reutiliza_objeto(self, client: TestClient, test_db, upload_dir):
+        """
+        Prueba que subir dos veces el mismo contenido guarda un solo objeto.
+        """
+        primero = client.post("/files/upload", files={"file": ("acta.pdf", PDF, "application/pdf")})
+        segundo = client.post("/files/upload", files={"file": ("copia.pdf", PDF, "application/pdf")})
+        assert primero.status_code == segundo.status_code == 201
+        assert primero.json()["url"] == segundo.json()["url"]
+        assert len(_guardados(upload_dir)) == 1
+        assert test_db.query(models.EvidenciaBlob).count() == 1
+
+    def test_evidencia_huerfana_se_recolecta(self, client: TestClient, test_db, upload_dir,
+                                             admin_token, plan_action):
+        """
+        Prueba que una evidencia enlazada no se borra y una huérfana sí.
+        """
+        from app import evidencias
+        url = client.post("/files/upload", files={"file": ("acta.pdf", PDF, "application/pdf")}).json()["url"]
+        seg = client.post(
+            f"/seguimiento/{plan_action.id}/seguimiento",
+            json={"evidencia_cumplimiento": url},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        ).json()
+        assert test_db.query(models.SeguimientoEvidencia).count() == 1
+
+        borrados = []
+        assert evidencias.recolectar(test_db, borrados.append, gracia_horas=0) == []
+
+        client.delete(f"/seguimiento/{plan_action.id}/seguimiento/{seg['id']}",
+                      headers={"Authorization": f"Bearer {admin_token}"})
+        evidencias.recolectar(test_db, borrados.append, gracia_horas=0)
+        assert len(borrados) == 1
+        assert test_db.query(models.EvidenciaBlob).count() == 0
+
+
+class TestStorage:
+    """Suite de pruebas para los backends de almacenamiento."""
+
+    def test_cliente_gcs_compartido(self, monkeypatch):
+        """
+        Prueba que el cliente de GCS se crea una sola vez por proceso.
+        """
+        creados = []
+
+        class FakeClient:
+            def __init__(self):
+                creados.append(self)
+
+            def bucket(self, name):
+                return name
+
+        monkeypatch.setattr(storage, "_gcs", lambda: type("gcs", (), {"Client": FakeClient}))
+        monkeypatch.setattr(storage, "_client", None)
+        assert GCSStorage("b1").bucket == "b1"
+        assert GCSStorage("b2").bucket == "b2"
+        assert len(creados) == 1
+
+    def test_sin_libreria_gcs(self, client: TestClient, monkeypatch):
+        """
+        Prueba que sin google-cloud-storage la subida responde 500 claro.
+        """
+        monkeypatch.setitem(sys.modules, "google", None)  # la importación perezosa falla
+        monkeypatch.setattr(storage, "_client", None)
+        set_storage(GCSStorage("bucket"))
+        try:
+            response = client.post("/files/upload", files={"file": ("acta.pdf", PDF, "application/pdf")})
+        finally:
+            set_storage(None)
+        assert response.status_code == 500
+        assert "google-cloud-storage" in response.json()["detail"]
+
+
+@pytest.fixture
+def served_dir(tmp_path, monkeypatch):
+    """Raíz de /uploads en un directorio temporal con una evidencia por contenido."""
+    import hashlib
+    monkeypatch.setattr("app.routers.uploads.UPLOAD_ROOT", tmp_path)
+    evidence = tmp_path / "evidence"
+    evidence.mkdir()
+    digest = hashlib.sha256(PDF).hexdigest()
+    (evidence / f"{digest}.pdf").write_bytes(PDF)
+    (evidence / "legado.pdf").write_bytes(PDF)
+    return digest
+
+
+class TestUploadsServing:
+    """Suite de pruebas para la descarga de evidencias en /uploads."""
+
+    def test_descarga_completa_con_cache(self, client: TestClient, served_dir):
+        """
+        Prueba que un archivo por contenido sale con ETag fuerte e immutable.
+        """
+        response = client.get(f"/uploads/evidence/{served_dir}.pdf")
+        assert response.status_code == 200
+        assert response.content == PDF
+        assert response.headers["etag"] == f'"{served_dir}"'
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-type"] == "application/pdf"
+
+    def test_if_none_match_304(self, client: TestClient, served_dir):
+        """
+        Prueba que con el ETag vigente no se reenvía el archivo.
+        """
+        response = client.get(f"/uploads/evidence/{served_dir}.pdf",
+                              headers={"If-None-Match": f'"{served_dir}"'})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_range_parcial(self, client: TestClient, served_dir):
+        """
+        Prueba Range con inicio-fin y con sufijo.
+        """
+        url = f"/uploads/evidence/{served_dir}.pdf"
+        response = client.get(url, headers={"Range": "bytes=0-7"})
+        assert response.status_code == 206
+        assert response.content == PDF[:8]
+        assert response.headers["content-range"] == f"bytes 0-7/{len(PDF)}"
+
+        response = client.get(url, headers={"Range": "bytes=-5"})
+        assert response.status_code == 206
+        assert response.content == PDF[-5:]
+
+    def test_range_no_satisfacible(self, client: TestClient, served_dir):
+        """
+        Prueba que un rango fuera del archivo responde 416.
+        """
+        response = client.get(f"/uploads/evidence/{served_dir}.pdf",
+                              headers={"Range": f"bytes={len(PDF) + 10}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(PDF)}"
+
+    def test_archivo_legado_revalida(self, client: TestClient, served_dir):
+        """
+        Prueba que un nombre que no es de contenido no se cachea como immutable.
+        """
+        response = client.get("/uploads/evidence/legado.pdf")
+        assert response.status_code == 200
+        assert "no-cache" in response.headers["cache-control"]
+
+    def test_ruta_fuera_de_uploads(self, client: TestClient, served_dir):
+        """
+        Prueba que no se puede salir del directorio de uploads.
+        """
+        assert client.get("/uploads/..%2F..%2Fetc%2Fpasswd").status_code == 404
+        assert client.get("/uploads/evidence/no-existe.pdf").status_code == 404
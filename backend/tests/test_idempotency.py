@@ -0,0 +1,72 @@
+"""
+Pruebas para Idempotency-Key en los POST que crean datos.
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from app import models
+from app.idempotency import purgar_vencidas
+
+
+class TestIdempotency:
+    """Suite de pruebas para reintentos con Idempotency-Key."""
+
+    def test_seguimiento_repetido(self, client: TestClient, test_db, admin_token, plan_action):
+        """
+        Prueba que reintentar con la misma llave devuelve el mismo seguimiento
+        sin crear otro.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "seg-1"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento"
+        primero = client.post(url, json={"seguimiento": "Avance"}, headers=headers)
+        segundo = client.post(url, json={"seguimiento": "Avance"}, headers=headers)
+
+        assert primero.status_code == segundo.status_code == 200
+        assert segundo.json() == primero.json()
+        assert segundo.headers["idempotent-replayed"] == "true"
+        assert test_db.query(models.Seguimiento).count() == 1
+        test_db.refresh(plan_action)
+        assert plan_action.num_seguimientos == 1
+
+    def test_llave_con_otro_cuerpo(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que reutilizar la llave con otro cuerpo es un 422 y no inserta.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "carga-1"}
+        fila = {"label": "P-1", "tipo_gestion": "Queja", "dependencia": "D", "entidad": "E",
+                "fecha_ingreso": "2024-05-01"}
+        assert client.post("/pqrds", json={"pqrds": [fila]}, headers=headers).json() == {"insertados": 1}
+
+        response = client.post("/pqrds", json={"pqrds": [fila, {**fila, "label": "P-2"}]}, headers=headers)
+        assert response.status_code == 422
+        assert test_db.query(models.PQRD).count() == 1
+
+    def test_sin_llave_no_deduplica(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que sin encabezado el comportamiento no cambia.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        payload = {"habilidades": [{"anio": 2024, "mes": 5, "id_entidad": 1, "entidad": "E"}]}
+        client.post("/habilidades", json=payload, headers=headers)
+        client.post("/habilidades", json=payload, headers=headers)
+        assert test_db.query(models.Habilidad).count() == 2
+        assert test_db.query(models.IdempotencyKey).count() == 0
+
+    def test_vencidas(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que una llave vencida permite repetir el trabajo y que la purga la borra.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "vieja"}
+        payload = {"pqrds": [{"label": "P-1", "tipo_gestion": "Queja", "dependencia": "D",
+                              "entidad": "E", "fecha_ingreso": "2024-05-01"}]}
+        client.post("/pqrds", json=payload, headers=headers)
+        test_db.query(models.IdempotencyKey).update(
+            {models.IdempotencyKey.expires_at: datetime.utcnow() - timedelta(minutes=1)}
+        )
+        test_db.commit()
+
+        assert purgar_vencidas(test_db) == 1
+        client.post("/pqrds", json=payload, headers=headers)
+        assert test_db.query(models.PQRD).count() == 2
+        assert test_db.query(models.IdempotencyKey).count() == 1
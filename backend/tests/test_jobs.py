@@ -0,0 +1,136 @@
+"""
+Pruebas para la cola de trabajos en segundo plano.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.jobs import manager
+
+
+@pytest.fixture
+def job_runner(test_db):
+    """
+    Usa la BD de prueba y desactiva los hilos: los trabajos se ejecutan
+    explícitamente con manager.run_pending().
+    """
+    workers, factory = manager.workers, manager._session_factory
+    manager.workers = 0
+    manager.session_factory = sessionmaker(bind=test_db.get_bind(), autoflush=False)
+    yield manager
+    manager.workers, manager._session_factory = workers, factory
+
+
+class TestJobs:
+    """Suite de pruebas para /jobs y las cargas en segundo plano."""
+
+    def test_cargar_pqrds_segundo_plano(self, client: TestClient, test_db, admin_user, admin_token, job_runner):
+        """
+        Prueba que la carga en segundo plano responde 202 con el id del trabajo
+        y que el worker inserta los registros.
+        """
+        pqrds = [
+            {"label": f"P-{i}", "tipo_gestion": "Petición", "dependencia": "D", "entidad": "E",
+             "fecha_ingreso": "2024-05-01", "periodo": "2024-05"}
+            for i in range(3)
+        ]
+        response = client.post(
+            "/pqrds?segundo_plano=true",
+            json={"pqrds": pqrds},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        status = client.get(f"/jobs/{job_id}", headers={"Authorization": f"Bearer {admin_token}"})
+        assert status.json()["estado"] == "pendiente"
+
+        assert job_runner.run_pending() == 1
+
+        status = client.get(f"/jobs/{job_id}", headers={"Authorization": f"Bearer {admin_token}"})
+        data = status.json()
+        assert data["estado"] == "completado"
+        assert data["progreso"] == 100
+        assert data["resultado"] == {"insertados": 3}
+        assert test_db.query(models.PQRD).count() == 3
+
+    def test_cargar_pqrds_en_linea(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que sin segundo_plano la carga sigue siendo síncrona.
+        """
+        response = client.post(
+            "/pqrds",
+            json={"pqrds": [{"label": "P-1", "tipo_gestion": "Queja", "dependencia": "D",
+                             "entidad": "E", "fecha_ingreso": "2024-05-01"}]},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"insertados": 1}
+
+    def test_segundo_plano_un_solo_job(self, client: TestClient, test_db, admin_user, admin_token, job_runner):
+        """
+        Prueba que el reintento de una carga en segundo plano devuelve el mismo
+        job_id y no encola otro trabajo.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "job-1"}
+        payload = {"pqrds": [{"label": "P-1", "tipo_gestion": "Queja", "dependencia": "D",
+                              "entidad": "E", "fecha_ingreso": "2024-05-01"}]}
+        primero = client.post("/pqrds?segundo_plano=true", json=payload, headers=headers)
+        segundo = client.post("/pqrds?segundo_plano=true", json=payload, headers=headers)
+
+        assert primero.status_code == segundo.status_code == 202
+        assert segundo.json()["job_id"] == primero.json()["job_id"]
+        assert test_db.query(models.Job).count() == 1
+
+    def test_cancelar_job_pendiente(self, client: TestClient, test_db, admin_user, admin_token, job_runner):
+        """
+        Prueba que un trabajo pendiente cancelado no se ejecuta.
+        """
+        response = client.post(
+            "/habilidades?segundo_plano=true",
+            json={"habilidades": [{"anio": 2024, "mes": 1, "id_entidad": 1}]},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        job_id = response.json()["job_id"]
+
+        cancel = client.post(f"/jobs/{job_id}/cancelar", headers={"Authorization": f"Bearer {admin_token}"})
+        assert cancel.status_code == 200
+        assert cancel.json()["estado"] == "cancelado"
+
+        assert job_runner.run_pending() == 0
+        assert test_db.query(models.Habilidad).count() == 0
+
+    def test_job_ajeno_no_visible(self, client: TestClient, test_db, admin_user, admin_token, entidad_token, job_runner):
+        """
+        Prueba que un usuario no ve trabajos creados por otro.
+        """
+        response = client.post(
+            "/reports?segundo_plano=true",
+            json={"reportes": []},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        job_id = response.json()["job_id"]
+        status = client.get(f"/jobs/{job_id}", headers={"Authorization": f"Bearer {entidad_token}"})
+        assert status.status_code == 404
+
+    def test_exportar_segundo_plano(self, client: TestClient, test_db, admin_user, admin_token, plan_action, job_runner, tmp_path, monkeypatch):
+        """
+        Prueba la exportación en segundo plano y la descarga del archivo.
+        """
+        monkeypatch.setattr("app.routers.exports.EXPORT_DIR", str(tmp_path))
+        response = client.get(
+            "/exports/planes?segundo_plano=true",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        job_runner.run_pending()
+
+        data = client.get(f"/jobs/{job_id}", headers={"Authorization": f"Bearer {admin_token}"}).json()
+        assert data["estado"] == "completado"
+        assert "archivo" not in data["resultado"]
+
+        descarga = client.get(f"/jobs/{job_id}/descarga", headers={"Authorization": f"Bearer {admin_token}"})
+        assert descarga.status_code == 200
+        assert "Secretaría de Educación" in descarga.content.decode("utf-8-sig")
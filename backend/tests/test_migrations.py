@@ -0,0 +1,46 @@
+"""
+Pruebas para el arranque: migraciones una sola vez por despliegue (app/migrations.py).
+"""
+
+from sqlalchemy import create_engine, inspect
+
+from app import migrations
+
+
+class TestMigraciones:
+    """Suite de pruebas para migrations.aplicar()."""
+
+    def test_una_sola_vez(self, monkeypatch, tmp_path):
+        """
+        Prueba que aplicar() crea tablas y corre los pasos en orden, y que otra
+        llamada en el mismo proceso o en uno hijo (variable heredada) no los repite.
+        """
+        engine = create_engine(f"sqlite:///{tmp_path}/m.db")
+        corridos = []
+        pasos = [lambda n=n: corridos.append(n) for n in range(3)]
+        monkeypatch.setattr(migrations, "engine", engine)
+        monkeypatch.setattr(migrations, "PASOS", pasos)
+        monkeypatch.setenv(migrations.ENV_APLICADAS, "")  # se restaura al terminar
+
+        assert migrations.aplicar() is True
+        assert corridos == [0, 1, 2]
+        assert "plan_accion" in inspect(engine).get_table_names()
+
+        assert migrations.aplicar() is False
+        assert corridos == [0, 1, 2]
+
+    def test_paso_fallido_no_detiene(self, monkeypatch, tmp_path):
+        """
+        Prueba que un paso que falla se reporta y los siguientes igual corren.
+        """
+        corridos = []
+
+        def roto():
+            raise RuntimeError("sin permisos")
+
+        monkeypatch.setattr(migrations, "engine", create_engine(f"sqlite:///{tmp_path}/m.db"))
+        monkeypatch.setattr(migrations, "PASOS", [roto, lambda: corridos.append("siguiente")])
+        monkeypatch.setenv(migrations.ENV_APLICADAS, "")
+
+        assert migrations.aplicar() is True
+        assert corridos == ["siguiente"]
@@ -191,4 +191,530 @@ class TestPlansEndpoints:
             headers={"Authorization": f"Bearer {admin_token}"}
         )
         assert response.status_code == 200
-        data = response.json()
\ No newline at end of file
+        data = response.json()
+
+class TestPlanEvents:
+    """Suite de pruebas para el flujo de cambios (SSE)."""
+
+    @pytest.fixture
+    def eventos(self):
+        from app.events import bus
+        recibidos = []
+        token = bus.subscribe(recibidos.append)
+        yield recibidos
+        bus.unsubscribe(token)
+
+    def test_escrituras_publican_eventos(self, client: TestClient, test_db, admin_token, plan_action, eventos):
+        """
+        Prueba que crear y borrar un seguimiento y cambiar el estado publican eventos.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        seg = client.post(f"/seguimiento/{plan_action.id}/seguimiento",
+                          json={"seguimiento": "Avance"}, headers=headers).json()
+        client.post(f"/seguimiento/{plan_action.id}/estado?estado=Aprobado", headers=headers)
+        client.delete(f"/seguimiento/{plan_action.id}/seguimiento/{seg['id']}", headers=headers)
+
+        assert [e["tipo"] for e in eventos] == ["seguimiento.creado", "plan.estado", "seguimiento.eliminado"]
+        assert eventos[0]["seguimiento_id"] == seg["id"]
+        assert eventos[1]["estado"] == "Aprobado"
+        assert all(e["plan_id"] == plan_action.id for e in eventos)
+
+    def test_alcance_por_entidad(self):
+        """
+        Prueba que un usuario 'entidad' solo recibe eventos de su entidad.
+        """
+        from app.routers.plans import _visible
+        evento = {"tipo": "plan.creado", "nombre_entidad": "Secretaría de Educación"}
+        assert _visible(evento, None)
+        assert _visible(evento, "secretaría de educación")
+        assert not _visible(evento, "Secretaría de Salud")
+
+    def test_reanudar_con_last_event_id(self):
+        """
+        Prueba la repetición de eventos tras reconectar y el resync con un id desconocido.
+        """
+        from app.events import EventBus
+        bus = EventBus(buffer=2)
+        primero = bus.publish("plan.creado", plan_id=1)
+        bus.publish("plan.actualizado", plan_id=1)
+        assert [e["plan_id"] for e in bus.desde(primero["id"])] == [1]
+        bus.publish("plan.actualizado", plan_id=2)
+        bus.publish("plan.actualizado", plan_id=3)
+        assert bus.desde(primero["id"]) is None
+        assert bus.desde("otro-arranque:1") is None
+
+    def test_flujo_sse(self):
+        """
+        Prueba el formato SSE del flujo y que respeta el alcance por entidad.
+        """
+        import asyncio
+        from app.events import bus
+        from app.routers.plans import _flujo_eventos
+
+        class FakeRequest:
+            async def is_disconnected(self):
+                return False
+
+        async def leer():
+            flujo = _flujo_eventos(FakeRequest(), "Secretaría de Educación", None)
+            assert (await flujo.__anext__()).startswith("retry:")
+            siguiente = asyncio.ensure_future(flujo.__anext__())
+            await asyncio.sleep(0)
+            bus.publish("plan.creado", plan_id=7, nombre_entidad="Otra entidad")
+            bus.publish("plan.creado", plan_id=8, nombre_entidad="Secretaría de Educación")
+            texto = await asyncio.wait_for(siguiente, timeout=2)
+            await flujo.aclose()
+            return texto
+
+        texto = asyncio.run(leer())
+        assert "event: plan.creado" in texto
+        assert '"plan_id": 8' in texto
+
+
+class TestPlanesLote:
+    """Suite de pruebas para el cambio de estado en lote."""
+
+    def test_aprobar_lote(self, client: TestClient, test_db, auditor_token, plan_action):
+        """
+        Prueba que un lote aprueba los planes existentes y reporta los que no.
+        """
+        otro = models.PlanAccion(nombre_entidad="Secretaría de Salud", estado="En revisión")
+        test_db.add(otro); test_db.commit()
+
+        response = client.post(
+            "/seguimiento/lote/estado",
+            json={"ids": [plan_action.id, otro.id, 99999], "estado": "Aprobado"},
+            headers={"Authorization": f"Bearer {auditor_token}"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["ok"] for r in data] == [True, True, False]
+        assert data[2]["error"] == "No encontrado"
+
+        test_db.expire_all()
+        assert test_db.query(models.PlanAccion).get(plan_action.id).estado == "Aprobado"
+        assert test_db.query(models.PlanAccion).get(otro.id).estado == "Aprobado"
+
+    def test_observar_lote(self, client: TestClient, test_db, admin_token, plan_action):
+        """
+        Prueba que solo con observación el estado queda en 'Observado'.
+        """
+        response = client.post(
+            "/seguimiento/lote/estado",
+            json={"ids": [plan_action.id], "observacion": "  Falta evidencia "},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.json()[0]["estado"] == "Observado"
+        test_db.expire_all()
+        plan = test_db.query(models.PlanAccion).get(plan_action.id)
+        assert plan.observacion_calidad == "Falta evidencia"
+
+    def test_lote_requiere_auditor(self, client: TestClient, entidad_token, plan_action):
+        """
+        Prueba que un usuario entidad no puede cambiar estados en lote.
+        """
+        response = client.post(
+            "/seguimiento/lote/estado",
+            json={"ids": [plan_action.id], "estado": "Aprobado"},
+            headers={"Authorization": f"Bearer {entidad_token}"}
+        )
+        assert response.status_code == 403
+
+
+class TestSparseFields:
+    """Suite de pruebas para la proyección de campos (?fields=)."""
+
+    def test_planes_fields(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que el listado devuelve solo los campos pedidos (más id).
+        """
+        response = client.get(
+            "/seguimiento?fields=nombre_entidad,estado,indicador",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == [{
+            "id": plan_action.id,
+            "nombre_entidad": plan_action.nombre_entidad,
+            "estado": plan_action.estado,
+            "indicador": plan_action.indicador,
+        }]
+
+    def test_seguimientos_fields(self, client: TestClient, admin_token, plan_action, seguimiento):
+        """
+        Prueba la proyección en seguimientos, incluido un campo derivado del usuario.
+        """
+        response = client.get(
+            f"/seguimiento/{plan_action.id}/seguimiento?fields=seguimiento,updated_by_email",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        item = response.json()[0]
+        assert set(item) == {"id", "seguimiento", "updated_by_email"}
+
+    def test_fields_desconocido(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que un campo que no existe responde 400.
+        """
+        response = client.get(
+            "/seguimiento?fields=id,password",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 400
+
+
+class TestPlanResumen:
+    """Suite de pruebas para el resumen de seguimientos en el plan."""
+
+    def test_resumen_se_mantiene(self, client: TestClient, test_db, admin_user, admin_token, plan_action):
+        """
+        Prueba que crear, editar y borrar seguimientos actualiza el resumen del plan.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento"
+        primero = client.post(url, json={"seguimiento": "En progreso"}, headers=headers).json()
+        segundo = client.post(url, json={"seguimiento": "Pendiente"}, headers=headers).json()
+
+        plan = client.get(f"/seguimiento/{plan_action.id}", headers=headers).json()
+        assert plan["num_seguimientos"] == 2
+        assert plan["ultimo_seguimiento_estado"] == "Pendiente"
+        assert plan["ultimo_seguimiento_por_id"] == admin_user.id
+
+        client.put(f"{url}/{primero['id']}", json={"seguimiento": "Finalizado"}, headers=headers)
+        plan = client.get(f"/seguimiento/{plan_action.id}", headers=headers).json()
+        assert plan["ultimo_seguimiento_estado"] == "Finalizado"
+
+        client.delete(f"{url}/{primero['id']}", headers=headers)
+        client.delete(f"{url}/{segundo['id']}", headers=headers)
+        plan = client.get(f"/seguimiento/{plan_action.id}", headers=headers).json()
+        assert plan["num_seguimientos"] == 0
+        assert plan["ultimo_seguimiento_at"] is None
+
+    def test_recalcular_repara(self, test_db, plan_action, seguimiento):
+        """
+        Prueba que recalcular_resumen corrige un resumen desfasado.
+        """
+        from app.resumen import recalcular_resumen
+        plan_action.num_seguimientos = 42
+        test_db.commit()
+
+        recalcular_resumen(test_db)
+        test_db.commit()
+        test_db.refresh(plan_action)
+        assert plan_action.num_seguimientos == 1
+        assert plan_action.ultimo_seguimiento_estado == seguimiento.seguimiento
+
+
+class TestConcurrenciaOptimista:
+    """Suite de pruebas para If-Match / version en las actualizaciones."""
+
+    def test_plan_if_match(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que el ETag del GET sirve para guardar una vez y que el segundo
+        guardado con la misma versión es un 409.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}"
+        etag = client.get(url, headers=headers).headers["etag"]
+        body = {"nombre_entidad": plan_action.nombre_entidad, "indicador": "A"}
+
+        primero = client.put(url, json=body, headers={**headers, "If-Match": etag})
+        assert primero.status_code == 200
+        assert primero.json()["version"] == int(etag.strip('"')) + 1
+        assert primero.headers["etag"] != etag
+
+        segundo = client.put(url, json={**body, "indicador": "B"}, headers={**headers, "If-Match": etag})
+        assert segundo.status_code == 409
+        assert segundo.headers["etag"] == primero.headers["etag"]
+        assert client.get(url, headers=headers).json()["indicador"] == "A"
+
+    def test_plan_sin_version_y_404(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que sin If-Match se guarda como antes (subiendo la versión) y
+        que un plan inexistente sigue siendo 404.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        body = {"nombre_entidad": plan_action.nombre_entidad, "indicador": "A"}
+        response = client.put(f"/seguimiento/{plan_action.id}", json=body, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert client.put("/seguimiento/99999", json=body, headers={**headers, "If-Match": '"1"'}).status_code == 404
+
+    def test_cambiar_estado_sube_version(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que POST /{plan_id}/estado sube la versión: un If-Match tomado
+        antes del cambio de estado da 409.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}"
+        etag = client.get(url, headers=headers).headers["etag"]
+
+        r = client.post(f"{url}/estado?estado=Aprobado", headers=headers)
+        assert r.status_code == 200
+        assert r.json()["version"] == int(etag.strip('"')) + 1
+
+        body = {"nombre_entidad": plan_action.nombre_entidad, "indicador": "A"}
+        assert client.put(url, json=body, headers={**headers, "If-Match": etag}).status_code == 409
+
+    def test_seguimiento_version_en_cuerpo(self, client: TestClient, test_db, admin_token, plan_action, seguimiento):
+        """
+        Prueba el conflicto en seguimientos usando el campo version del cuerpo.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento/{seguimiento.id}"
+
+        ok = client.put(url, json={"seguimiento": "En progreso", "version": 1}, headers=headers)
+        assert ok.status_code == 200
+        assert ok.json()["version"] == 2
+
+        viejo = client.put(url, json={"seguimiento": "Finalizado", "version": 1}, headers=headers)
+        assert viejo.status_code == 409
+        test_db.refresh(seguimiento)
+        assert seguimiento.seguimiento == "En progreso"
+
+
+class TestHistorial:
+    """Suite de pruebas para el historial de ediciones de seguimientos."""
+
+    def test_diferencias_y_versiones(self, client: TestClient, admin_user, admin_token, plan_action):
+        """
+        Prueba que cada edición guarda solo los campos cambiados y que se
+        puede reconstruir cualquier versión anterior.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento"
+        seg = client.post(url, json={"seguimiento": "Pendiente", "descripcion_actividades": "Inicio"},
+                          headers=headers).json()
+        client.put(f"{url}/{seg['id']}", json={"seguimiento": "En progreso", "descripcion_actividades": "Inicio"},
+                   headers=headers)
+        client.put(f"{url}/{seg['id']}", json={"descripcion_actividades": "Cierre"}, headers=headers)
+
+        linea = client.get(f"/seguimiento/{plan_action.id}/historial", headers=headers).json()
+        assert [(c["accion"], c["version"]) for c in linea] == [("creado", 1), ("actualizado", 2), ("actualizado", 3)]
+        assert linea[1]["cambios"] == {"seguimiento": ["Pendiente", "En progreso"]}
+        assert linea[2]["cambios"] == {"descripcion_actividades": ["Inicio", "Cierre"]}
+        assert linea[2]["user_email"] == admin_user.email
+
+        v1 = client.get(f"{url}/{seg['id']}/version/1", headers=headers).json()
+        assert (v1["seguimiento"], v1["descripcion_actividades"]) == ("Pendiente", "Inicio")
+        v2 = client.get(f"{url}/{seg['id']}/version/2", headers=headers).json()
+        assert (v2["seguimiento"], v2["descripcion_actividades"]) == ("En progreso", "Inicio")
+        assert client.get(f"{url}/{seg['id']}/version/9", headers=headers).status_code == 404
+
+    def test_borrado_y_anteriores(self, client: TestClient, test_db, admin_token, plan_action, seguimiento):
+        """
+        Prueba que un seguimiento previo al historial se reconstruye desde su
+        primera edición registrada y que el borrado queda en la línea de tiempo.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento/{seguimiento.id}"
+        original = seguimiento.seguimiento
+        client.put(url, json={"seguimiento": "Finalizado"}, headers=headers)
+
+        assert client.get(f"{url}/version/1", headers=headers).json()["seguimiento"] == original
+        client.delete(url, headers=headers)
+
+        linea = client.get(f"/seguimiento/{plan_action.id}/historial?desde_id=0&limite=10", headers=headers).json()
+        assert [c["accion"] for c in linea] == ["actualizado", "eliminado"]
+        assert test_db.query(models.SeguimientoCambio).filter_by(seguimiento_id=seguimiento.id).count() == 2
+
+
+class TestAjustes:
+    """Suite de pruebas para las cadenas de ajustes (ajuste_de_id)."""
+
+    def _cadena(self, test_db, plan, n):
+        anterior = None
+        segs = []
+        for i in range(n):
+            seg = models.Seguimiento(plan_id=plan.id, seguimiento=f"v{i}", ajuste_de_id=anterior)
+            test_db.add(seg); test_db.flush()
+            anterior = seg.id
+            segs.append(seg)
+        test_db.commit()
+        return segs
+
+    def test_arbol_desde_cualquier_nodo(self, client: TestClient, test_db, admin_token, plan_action):
+        """
+        Prueba que el árbol se arma desde la raíz aunque se pida un nodo
+        intermedio, con profundidad y orden, incluyendo ramas.
+        """
+        a, b, c = self._cadena(test_db, plan_action, 3)
+        rama = models.Seguimiento(plan_id=plan_action.id, seguimiento="rama", ajuste_de_id=a.id)
+        test_db.add(rama); test_db.commit()
+
+        response = client.get(f"/seguimiento/{plan_action.id}/seguimiento/{b.id}/ajustes",
+                              headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [(d["id"], d["profundidad"]) for d in data] == [(a.id, 0), (b.id, 1), (rama.id, 1), (c.id, 2)]
+        assert data[3]["ajuste_de_id"] == b.id
+
+    def test_cadena_y_errores(self, client: TestClient, test_db, admin_token, plan_action):
+        """
+        Prueba el modo cadena (raíz → seguimiento), el 404 fuera del plan y el modo inválido.
+        """
+        segs = self._cadena(test_db, plan_action, 5)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/seguimiento/{plan_action.id}/seguimiento"
+
+        data = client.get(f"{url}/{segs[2].id}/ajustes?modo=cadena", headers=headers).json()
+        assert [(d["id"], d["profundidad"]) for d in data] == [(s.id, i) for i, s in enumerate(segs[:3])]
+
+        assert client.get(f"{url}/99999/ajustes", headers=headers).status_code == 404
+        assert client.get(f"{url}/{segs[0].id}/ajustes?modo=otro", headers=headers).status_code == 400
+
+
+class TestIndicadoresUsados:
+    """Suite de pruebas para la tabla indicadores_entidad."""
+
+    def test_escrituras_mantienen_indicadores(self, client: TestClient, test_db, admin_token, entidad_token,
+                                              entidad_auditor_token, plan_action):
+        """
+        Prueba que crear, cambiar y borrar seguimientos mantiene la lista por
+        entidad y que coincide con el cálculo desde cero.
+        """
+        from app.indicadores import verificar
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        otro = client.post("/seguimiento", json={"nombre_entidad": "Secretaría de Salud"}, headers=headers).json()
+        url = f"/seguimiento/{plan_action.id}/seguimiento"
+
+        a = client.post(url, json={"indicador": " Cobertura "}, headers=headers).json()
+        client.post(url, json={"indicador": "Cobertura"}, headers=headers)
+        b = client.post(url, json={"indicador": "Deserción"}, headers=headers).json()
+        client.post(f"/seguimiento/{otro['id']}/seguimiento", json={"indicador": "Vacunación"}, headers=headers)
+
+        client.put(f"{url}/{b['id']}", json={"indicador": "Permanencia"}, headers=headers)
+        client.delete(f"{url}/{a['id']}", headers=headers)
+
+        propios = client.get("/seguimiento/indicadores_usados",
+                             headers={"Authorization": f"Bearer {entidad_token}"}).json()
+        assert propios == ["Cobertura", "Permanencia"]
+        todos = client.get("/seguimiento/indicadores_usados",
+                           headers={"Authorization": f"Bearer {entidad_auditor_token}"}).json()
+        assert todos == ["Cobertura", "Permanencia", "Vacunación"]
+
+        client.delete(f"/seguimiento/{otro['id']}", headers=headers)
+        assert verificar(test_db) == {"faltan": [], "sobran": [], "distintos": []}
+
+    def test_verificar_repara(self, test_db, seguimiento):
+        """
+        Prueba que la verificación detecta y repara un seguimiento insertado por fuera.
+        """
+        from app.indicadores import usados, verificar
+        diferencias = verificar(test_db, reparar=True)
+        test_db.commit()
+        assert diferencias["faltan"] == [("secretaría de educación", "Infraestructura")]
+        assert usados(test_db, "Secretaría de Educación") == ["Infraestructura"]
+        assert verificar(test_db) == {"faltan": [], "sobran": [], "distintos": []}
+
+
+class TestBorradoPlanes:
+    """Suite de pruebas para el borrado por conjunto y la papelera (app/borrado.py)."""
+
+    def _sembrar(self, client, headers, n_planes=2, n_segs=3):
+        ids = []
+        for p in range(n_planes):
+            plan = client.post("/seguimiento", json={"nombre_entidad": "Secretaría de Salud"}, headers=headers).json()
+            for s in range(n_segs):
+                client.post(f"/seguimiento/{plan['id']}/seguimiento",
+                            json={"indicador": f"Indicador {s}"}, headers=headers)
+            ids.append(plan["id"])
+        return ids
+
+    def _consistente(self, test_db):
+        from app.estadisticas import reconstruir
+        from app.indicadores import verificar
+        antes = sorted((e.entidad, e.metrica, e.clave, e.valor) for e in test_db.query(models.Estadistica))
+        reconstruir(test_db); test_db.commit()
+        despues = sorted((e.entidad, e.metrica, e.clave, e.valor) for e in test_db.query(models.Estadistica))
+        return antes == despues and verificar(test_db) == {"faltan": [], "sobran": [], "distintos": []}
+
+    def test_lote_un_solo_delete(self, client: TestClient, test_db, admin_token):
+        """
+        Prueba que borrar varios planes emite un único DELETE (los seguimientos
+        los borra la BD en cascada) y deja historial, tablero e indicadores al día.
+        """
+        from sqlalchemy import event
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        ids = self._sembrar(client, headers)
+
+        sentencias = []
+        engine = test_db.get_bind()
+        capturar = lambda conn, cur, stmt, *a: sentencias.append(" ".join(stmt.split()).upper())
+        event.listen(engine, "before_cursor_execute", capturar)
+        try:
+            r = client.post("/seguimiento/lote/eliminar", json={"ids": ids + [99999]}, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capturar)
+
+        assert r.status_code == 200
+        assert [(d["id"], d["ok"]) for d in r.json()] == [(ids[0], True), (ids[1], True), (99999, False)]
+        assert not [s for s in sentencias if s.startswith("DELETE FROM SEGUIMIENTO ")]
+        assert sum(s.startswith("DELETE FROM PLAN_ACCION") for s in sentencias) == 1
+
+        assert test_db.query(models.Seguimiento).count() == 0
+        eliminados = test_db.query(models.SeguimientoCambio).filter_by(accion="eliminado").all()
+        assert len(eliminados) == 6 and {c.version for c in eliminados} == {2}
+        assert self._consistente(test_db)
+
+    def test_papelera_y_purga(self, client: TestClient, test_db, admin_token):
+        """
+        Prueba que un plan en la papelera deja de verse y de contar al instante
+        y que la purga lo borra después con sus seguimientos.
+        """
+        from app.borrado import purgar_papelera
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        plan_id, otro = self._sembrar(client, headers)
+
+        assert client.delete(f"/seguimiento/{plan_id}?papelera=true", headers=headers).status_code == 200
+        assert client.get(f"/seguimiento/{plan_id}", headers=headers).status_code == 404
+        assert client.delete(f"/seguimiento/{plan_id}", headers=headers).status_code == 404
+        assert [p["id"] for p in client.get("/seguimiento", headers=headers).json()] == [otro]
+        assert test_db.query(models.Seguimiento).filter_by(plan_id=plan_id).count() == 3
+        assert self._consistente(test_db)
+
+        assert purgar_papelera(test_db, dias=1) == 0
+        assert purgar_papelera(test_db, dias=0) == 1
+        assert test_db.query(models.PlanAccion).get(plan_id) is None
+        assert test_db.query(models.Seguimiento).count() == 3
+        assert self._consistente(test_db)
+
+    def test_esquema_sqlite_anterior(self, client: TestClient, test_db, admin_token):
+        """
+        Prueba que con la tabla seguimiento de una app.db anterior (FKs sin
+        ON DELETE) y PRAGMA foreign_keys=ON, borrar un seguimiento que otro
+        ajusta, y luego su plan, no falla: el ajuste queda con ajuste_de_id NULL.
+        """
+        from sqlalchemy import text
+        from sqlalchemy.schema import CreateTable
+
+        engine = test_db.get_bind()
+        ddl = str(CreateTable(models.Seguimiento.__table__).compile(engine))
+        ddl = ddl.replace(" ON DELETE SET NULL", "").replace(" ON DELETE CASCADE", "")
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA foreign_keys=OFF"))
+            conn.execute(text("DROP TABLE seguimiento"))
+            conn.execute(text(ddl))
+            conn.execute(text("PRAGMA foreign_keys=ON"))
+        assert "ON DELETE" not in test_db.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = 'seguimiento'")).scalar()
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        plan_id = self._sembrar(client, headers, n_planes=1, n_segs=1)[0]
+        padre = test_db.query(models.Seguimiento).filter_by(plan_id=plan_id).one()
+        test_db.add_all([models.Seguimiento(plan_id=plan_id, ajuste_de_id=padre.id) for _ in range(2)])
+        test_db.commit()
+        ajustes = [s.id for s in test_db.query(models.Seguimiento).filter_by(ajuste_de_id=padre.id)]
+
+        r = client.delete(f"/seguimiento/{plan_id}/seguimiento/{padre.id}", headers=headers)
+        assert r.status_code == 200
+        test_db.expire_all()
+        assert [s.ajuste_de_id for s in test_db.query(models.Seguimiento).filter(models.Seguimiento.id.in_(ajustes))] \
+            == [None, None]
+
+        # Sin cascada en el esquema, el plan arrastra a sus seguimientos con DELETE explícitos
+        otro = test_db.query(models.Seguimiento).get(ajustes[0])
+        test_db.add(models.Seguimiento(plan_id=plan_id, ajuste_de_id=otro.id))
+        test_db.commit()
+        assert client.delete(f"/seguimiento/{plan_id}", headers=headers).status_code == 200
+        assert test_db.query(models.Seguimiento).count() == 0
@@ -0,0 +1,204 @@
+"""
+Pruebas para PQRDs por periodo (app/pqrd_particiones.py): en SQLite, tablas de
+archivo por periodo, volcado a .csv.gz y purga por fecha. Las de PostgreSQL
+(marca `postgres`) corren con TEST_POSTGRES_URL=postgresql+psycopg://… y cada
+una usa un esquema propio que se borra al terminar.
+"""
+
+import os
+import threading
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models, pqrd_particiones
+
+
+def _cargar(client, headers, fechas):
+    pqrds = [{"label": f"P-{i}", "tipo_gestion": "Queja", "dependencia": "D", "entidad": "E",
+              "fecha_ingreso": f} for i, f in enumerate(fechas)]
+    assert client.post("/pqrds", json={"pqrds": pqrds}, headers=headers).status_code == 200
+
+
+class TestPqrdPeriodos:
+    """Suite de pruebas para consultas por rango, archivo y purga de PQRDs."""
+
+    FECHAS = ["2022-03-01", "2022-11-30", "2023-06-15", "2024-01-10", "2024-02-01"]
+
+    def test_rango_de_fechas(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que desde/hasta filtran por fecha_ingreso en listado, conteo y búsqueda.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        _cargar(client, headers, self.FECHAS)
+
+        r = client.get("/pqrds?desde=2023-01-01&hasta=2024-02-01", headers=headers)
+        assert sorted(p["fecha_ingreso"] for p in r.json()) == ["2023-06-15", "2024-01-10"]
+        assert client.get("/pqrds/count?hasta=2023-01-01", headers=headers).json() == 2
+        assert client.get("/pqrds/count", headers=headers).json() == 5
+        assert client.get("/pqrds/by/P-0?desde=2023-01-01", headers=headers).status_code == 404
+
+    def test_desprender_volcar_y_restaurar(self, client: TestClient, test_db, admin_user, admin_token, tmp_path):
+        """
+        Prueba que los periodos completos anteriores a la fecha salen de la API,
+        se vuelcan a .csv.gz (sin dejar tabla) y se pueden restaurar con sus ids.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        _cargar(client, headers, self.FECHAS)
+        ids_2022 = sorted(p.id for p in test_db.query(models.PQRD).filter(models.PQRD.fecha_ingreso < date(2023, 1, 1)))
+
+        # 2024 no está completo antes del 2024-02-01: se queda
+        assert pqrd_particiones.desprender(test_db, date(2024, 2, 1)) == ["pqrds_p2022", "pqrds_p2023"]
+        test_db.commit()
+        assert client.get("/pqrds/count", headers=headers).json() == 2
+        assert pqrd_particiones.desprendidas(test_db) == ["pqrds_p2022", "pqrds_p2023"]
+
+        ruta, filas = pqrd_particiones.exportar(test_db, "pqrds_p2022", tmp_path)
+        test_db.commit()
+        assert (ruta.name, filas) == ("pqrds_p2022.csv.gz", 2)
+        assert pqrd_particiones.desprendidas(test_db) == ["pqrds_p2023"]
+
+        assert pqrd_particiones.restaurar(test_db, ruta) == 2
+        test_db.commit()
+        r = client.get("/pqrds?hasta=2023-01-01", headers=headers).json()
+        assert sorted(p["id"] for p in r) == ids_2022
+        assert {p["tipo_gestion"] for p in r} == {"Queja"}
+
+    def test_purga_por_fecha(self, client: TestClient, test_db, admin_user, admin_token):
+        """
+        Prueba que DELETE /pqrds?antes= borra solo lo anterior a la fecha y sin
+        parámetro sigue vaciando la tabla.
+        """
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        _cargar(client, headers, self.FECHAS)
+
+        assert client.delete("/pqrds?antes=2024-01-01", headers=headers).json() == {"eliminados": 3}
+        assert client.get("/pqrds/count", headers=headers).json() == 2
+        assert client.delete("/pqrds", headers=headers).json() == {"eliminados": 2}
+
+    def test_periodos(self):
+        """
+        Prueba los límites de periodo por año y por mes (incluido diciembre).
+        """
+        assert pqrd_particiones.periodo(date(2024, 7, 3), "anio") == ("pqrds_p2024", date(2024, 1, 1), date(2025, 1, 1))
+        assert pqrd_particiones.periodo(date(2024, 12, 31), "mes") == \
+            ("pqrds_p2024_12", date(2024, 12, 1), date(2025, 1, 1))
+
+
+@pytest.fixture
+def pg():
+    """Sessionmaker sobre un esquema vacío de PostgreSQL con `pqrds` sin particionar."""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL no definida")
+    pytest.importorskip("psycopg")
+    esquema = f"t_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {esquema}"))
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={esquema}"})
+    models.PQRD.__table__.create(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {esquema} CASCADE"))
+        admin.dispose()
+
+
+def _insertar(db, fechas):
+    db.execute(insert(models.PQRD), [
+        {"label": f"P-{i}", "tipo_gestion": "Queja", "dependencia": "D", "entidad": "E",
+         "fecha_ingreso": date.fromisoformat(f)} for i, f in enumerate(fechas)
+    ])
+
+
+@pytest.mark.postgres
+class TestPqrdParticionesPostgres:
+    """Suite de pruebas para convertir, asegurar y purgar_antes en PostgreSQL."""
+
+    FECHAS = ["2022-03-01", "2022-11-30", "2023-06-15", "2024-01-10"]
+
+    def test_convertir(self, pg, monkeypatch):
+        """
+        Prueba que convertir deja `pqrds` particionada por año con las mismas
+        filas e ids, que los ids siguen la secuencia y que una segunda vez no hace nada.
+        """
+        monkeypatch.setattr(pqrd_particiones, "PQRD_PARTICION", "anio")
+        with pg() as db:
+            _insertar(db, self.FECHAS)
+            db.commit()
+            ids = sorted(p.id for p in db.query(models.PQRD))
+
+            assert pqrd_particiones.convertir(db) is True
+            db.commit()
+            assert pqrd_particiones.particionada(db)
+            assert [n for n, _, _ in pqrd_particiones.particiones(db)] == ["pqrds_p2022", "pqrds_p2023", "pqrds_p2024"]
+            assert sorted(p.id for p in db.query(models.PQRD)) == ids
+            assert pqrd_particiones.convertir(db) is False
+
+            _insertar(db, ["2024-05-05"])
+            db.commit()
+            assert max(p.id for p in db.query(models.PQRD)) == max(ids) + 1
+
+    def test_asegurar(self, pg, monkeypatch):
+        """
+        Prueba que asegurar crea solo las particiones que faltan, readjunta un
+        periodo desprendido y que dos cargas simultáneas del mismo periodo nuevo
+        no fallan: la segunda espera el candado y ya no crea nada.
+        """
+        monkeypatch.setattr(pqrd_particiones, "PQRD_PARTICION", "anio")
+        with pg() as db:
+            _insertar(db, ["2023-06-15"])
+            pqrd_particiones.convertir(db)
+            db.commit()
+
+            assert pqrd_particiones.asegurar(db, [date(2023, 1, 1), date(2025, 2, 3)]) == 1
+            assert pqrd_particiones.asegurar(db, [date(2025, 8, 1)]) == 0
+            db.commit()
+
+            assert pqrd_particiones.desprender(db, date(2024, 1, 1)) == ["pqrds_p2023"]
+            db.commit()
+            assert pqrd_particiones.asegurar(db, [date(2023, 2, 2)]) == 1
+            db.commit()
+            assert pqrd_particiones.desprendidas(db) == []
+            assert db.query(models.PQRD).count() == 1
+
+        primera, segunda = pg(), pg()
+        resultado = {}
+        try:
+            assert pqrd_particiones.asegurar(primera, [date(2026, 3, 3)]) == 1
+            hilo = threading.Thread(
+                target=lambda: resultado.update(n=pqrd_particiones.asegurar(segunda, [date(2026, 7, 7)]))
+            )
+            hilo.start()
+            hilo.join(1)
+            assert hilo.is_alive()  # esperando el candado de la primera carga
+            primera.commit()
+            hilo.join(10)
+            segunda.commit()
+        finally:
+            primera.close()
+            segunda.close()
+        assert resultado == {"n": 0}
+
+    def test_purgar_antes(self, pg, monkeypatch):
+        """
+        Prueba que purgar_antes elimina con DROP las particiones completas, borra
+        por filas el resto del rango y devuelve el total.
+        """
+        monkeypatch.setattr(pqrd_particiones, "PQRD_PARTICION", "anio")
+        with pg() as db:
+            _insertar(db, self.FECHAS)
+            pqrd_particiones.convertir(db)
+            db.commit()
+
+            assert pqrd_particiones.purgar_antes(db, date(2023, 7, 1)) == 3
+            db.commit()
+            assert [n for n, _, _ in pqrd_particiones.particiones(db)] == ["pqrds_p2023", "pqrds_p2024"]
+            assert [str(p.fecha_ingreso) for p in db.query(models.PQRD)] == ["2024-01-10"]
@@ -0,0 +1,104 @@
+"""
+Pruebas para el límite de tasa por usuario/entidad.
+"""
+
+from fastapi.testclient import TestClient
+from app import ratelimit
+from app.ratelimit import MemoryStore, RedisStore, identidad, reset_rate_limits
+
+
+class FakeRedis:
+    """Sustituto local de Redis: ejecuta la cubeta en memoria en lugar del script Lua."""
+
+    def __init__(self):
+        self.memoria = MemoryStore()
+        self.llamadas = []
+
+    def eval(self, script, numkeys, key, capacidad, tasa, now):
+        self.llamadas.append(key)
+        ok, tokens = self.memoria.take(key, capacidad, tasa, now=now)
+        return [1 if ok else 0, str(tokens)]
+
+
+class TestRateLimit:
+    """Suite de pruebas para el límite de tasa."""
+
+    def test_token_bucket(self):
+        """
+        Prueba que la cubeta agota la ráfaga y se recarga con el tiempo.
+        """
+        store = MemoryStore()
+        assert [store.take("k", 2, 1.0, now=0)[0] for _ in range(3)] == [True, True, False]
+        assert store.take("k", 2, 1.0, now=1.0)[0] is True
+
+    def test_identidad_por_jwt_o_ip(self, admin_token, entidad_user, entidad_token):
+        """
+        Prueba que la llave sale del JWT firmado y, sin él, de la IP.
+        """
+        scope = {"headers": [(b"authorization", f"Bearer {entidad_token}".encode())]}
+        assert identidad(scope) == (f"u:{entidad_user.id}", "e:secretaría de educación")
+        falso = {"headers": [(b"authorization", b"Bearer no-es-un-jwt")], "client": ("10.0.0.9", 1)}
+        assert identidad(falso) == ("ip:10.0.0.9", None)
+
+    def test_ip_detras_de_proxies(self, monkeypatch):
+        """
+        Prueba que sin proxies de confianza se ignora X-Forwarded-For y con N se
+        toma el N-ésimo valor desde la derecha (no el que escribe el cliente).
+        """
+        scope = {"headers": [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7, 10.1.1.1")], "client": ("10.0.0.9", 1)}
+        assert identidad(scope) == ("ip:10.0.0.9", None)
+        monkeypatch.setattr(ratelimit, "RATELIMIT_TRUSTED_PROXIES", 1)
+        assert identidad(scope) == ("ip:10.1.1.1", None)
+        monkeypatch.setattr(ratelimit, "RATELIMIT_TRUSTED_PROXIES", 2)
+        assert identidad(scope) == ("ip:203.0.113.7", None)
+        monkeypatch.setattr(ratelimit, "RATELIMIT_TRUSTED_PROXIES", 4)
+        assert identidad(scope) == ("ip:10.0.0.9", None)
+
+    def test_x_forwarded_for_falso_no_evade(self, client: TestClient, monkeypatch):
+        """
+        Prueba que cambiar X-Forwarded-For en cada intento de login no da una
+        cubeta nueva: con o sin proxy de confianza se llega al 429.
+        """
+        monkeypatch.setenv("RATELIMIT_AUTH", "3,1")
+        datos = {"username": "nadie@test.com", "password": "x"}
+        for proxies in (0, 1):
+            reset_rate_limits()
+            monkeypatch.setattr(ratelimit, "RATELIMIT_TRUSTED_PROXIES", proxies)
+            codigos = [
+                client.post("/auth/token", data=datos,
+                            headers={"X-Forwarded-For": f"198.51.100.{i}, 203.0.113.7"}).status_code
+                for i in range(5)
+            ]
+            assert 429 not in codigos[:3] and codigos[3:] == [429, 429]
+
+    def test_429_con_encabezados(self, client: TestClient, admin_token, monkeypatch):
+        """
+        Prueba los encabezados RateLimit-* y el 429 con Retry-After al agotar la cuota.
+        """
+        monkeypatch.setenv("RATELIMIT_LECTURAS", "2,1")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        primera = client.get("/seguimiento", headers=headers)
+        assert primera.status_code == 200
+        assert primera.headers["ratelimit-limit"] == "2"
+        assert primera.headers["ratelimit-remaining"] == "1"
+
+        client.get("/seguimiento", headers=headers)
+        tercera = client.get("/seguimiento", headers=headers)
+        assert tercera.status_code == 429
+        assert int(tercera.headers["retry-after"]) >= 1
+        assert tercera.headers["ratelimit-remaining"] == "0"
+
+        # La vía prioritaria no consume cuota
+        assert client.get("/healthz").status_code == 200
+
+    def test_store_compartido(self, client: TestClient, admin_token, monkeypatch):
+        """
+        Prueba el adaptador de almacén compartido con un sustituto local.
+        """
+        fake = FakeRedis()
+        reset_rate_limits(RedisStore(fake))
+        monkeypatch.setenv("RATELIMIT_ESCRITURAS", "1,1")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert client.post("/seguimiento", json={"nombre_entidad": "X"}, headers=headers).status_code == 200
+        assert client.post("/seguimiento", json={"nombre_entidad": "X"}, headers=headers).status_code == 429
+        assert fake.llamadas[0].startswith("rl:escrituras:u:")
@@ -0,0 +1,117 @@
+"""
+Pruebas para el enrutado de lecturas a la réplica (app/replicas.py) con dos
+archivos SQLite: la "réplica" es una copia atrasada de la primaria.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database, models, replicas
+from app.auth import create_access_token
+from app.main import app
+from app.seguridad import hash_password
+
+
+def _sembrar(Session, planes):
+    with Session() as db:
+        db.add(models.User(email="admin@test.com", hashed_password=hash_password("admin123"),
+                           role=models.UserRole.admin, entidad="Alcaldia"))
+        db.add(models.User(email="otro@test.com", hashed_password=hash_password("otro123"),
+                           role=models.UserRole.admin, entidad="Alcaldia"))
+        db.add_all([models.PlanAccion(nombre_entidad=n) for n in planes])
+        db.commit()
+
+
+@pytest.fixture
+def dos_bases(monkeypatch, tmp_path):
+    sesiones = {}
+    for nombre, planes in (("primaria", ["A", "B"]), ("replica", ["A"])):
+        engine = create_engine(f"sqlite:///{tmp_path}/{nombre}.db", connect_args={"check_same_thread": False})
+        database.Base.metadata.create_all(bind=engine)
+        sesiones[nombre] = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _sembrar(sesiones[nombre], planes)
+    monkeypatch.setattr(database, "SessionLocal", sesiones["primaria"])
+    monkeypatch.setattr(database, "SessionReplica", sesiones["replica"])
+    monkeypatch.setattr(replicas, "pegajosa", replicas.MemoriaPegajosa())
+    app.dependency_overrides.clear()
+    yield sesiones
+
+
+def _auth(uid, email):
+    return {"Authorization": f"Bearer {create_access_token(email, 'admin', uid, entidad='Alcaldia')}"}
+
+
+class TestReplicas:
+    """Suite de pruebas para lecturas en réplica y lee-lo-que-escribiste."""
+
+    def test_get_lee_de_la_replica(self, dos_bases):
+        """
+        Prueba que un GET sin escrituras previas ve los datos de la réplica.
+        """
+        r = TestClient(app).get("/seguimiento", headers=_auth(1, "admin@test.com"))
+        assert r.status_code == 200
+        assert [p["nombre_entidad"] for p in r.json()] == ["A"]
+
+    def test_tras_escribir_lee_de_la_primaria(self, dos_bases, monkeypatch):
+        """
+        Prueba que quien escribe ve su cambio en el siguiente GET (primaria),
+        otro usuario sigue en la réplica y, vencida la marca, vuelve a ella.
+        """
+        client = TestClient(app)
+        yo, otro = _auth(1, "admin@test.com"), _auth(2, "otro@test.com")
+
+        r = client.post("/seguimiento", json={"nombre_entidad": "C"}, headers=yo)
+        assert r.status_code == 200
+
+        nombres = [p["nombre_entidad"] for p in client.get("/seguimiento", headers=yo).json()]
+        assert nombres == ["C", "B", "A"]
+        assert [p["nombre_entidad"] for p in client.get("/seguimiento", headers=otro).json()] == ["A"]
+
+        monkeypatch.setattr(replicas.pegajosa, "activa", lambda key, now=None: False)
+        assert [p["nombre_entidad"] for p in client.get("/seguimiento", headers=yo).json()] == ["A"]
+
+    def test_escritura_fallida_no_marca(self, dos_bases):
+        """
+        Prueba que una escritura rechazada (4xx) no manda las lecturas a la primaria.
+        """
+        client = TestClient(app)
+        yo = _auth(1, "admin@test.com")
+        assert client.put("/seguimiento/999", json={"nombre_entidad": "X"}, headers=yo).status_code == 404
+        assert [p["nombre_entidad"] for p in client.get("/seguimiento", headers=yo).json()] == ["A"]
+
+    def test_sin_replica_todo_a_la_primaria(self, dos_bases, monkeypatch):
+        """
+        Prueba que sin REPLICA_DATABASE_URL los GET leen de la primaria.
+        """
+        monkeypatch.setattr(database, "SessionReplica", None)
+        r = TestClient(app).get("/seguimiento", headers=_auth(1, "admin@test.com"))
+        assert [p["nombre_entidad"] for p in r.json()] == ["B", "A"]
+
+    def test_exportacion_en_segundo_plano(self, dos_bases, monkeypatch, tmp_path):
+        """
+        Prueba que un GET que encola un trabajo (exportación en segundo plano)
+        lo escribe en la primaria: /jobs lo encuentra y el worker lo ejecuta.
+        """
+        from app.jobs import COMPLETADO, manager
+        from app.routers import exports
+
+        monkeypatch.setattr(manager, "workers", 0)
+        monkeypatch.setattr(manager, "_session_factory", None)  # database.SessionLocal: la primaria
+        monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+        client = TestClient(app)
+        yo = _auth(1, "admin@test.com")
+
+        r = client.get("/exports/planes?segundo_plano=true", headers=yo)
+        assert r.status_code == 202
+        job_id = r.json()["job_id"]
+        with dos_bases["primaria"]() as db:
+            assert db.query(models.Job).count() == 1
+        with dos_bases["replica"]() as db:
+            assert db.query(models.Job).count() == 0
+
+        assert manager.run_pending() == 1
+        r = client.get(f"/jobs/{job_id}", headers=yo)
+        assert r.status_code == 200
+        assert r.json()["estado"] == COMPLETADO
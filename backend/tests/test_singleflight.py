@@ -0,0 +1,86 @@
+"""
+Pruebas para la coalescencia de lecturas (single-flight) y /metrics.
+"""
+
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Suite de pruebas para SingleFlight."""
+
+    def test_peticiones_concurrentes_comparten_consulta(self):
+        """
+        Prueba que varias llamadas simultáneas con la misma llave ejecutan una sola consulta.
+        """
+        sf = SingleFlight()
+        ejecuciones = []
+        inicio = threading.Event()
+
+        def consulta():
+            ejecuciones.append(1)
+            inicio.wait(2)
+            return b"[]"
+
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(sf.do("planes", ("*",), consulta)))
+                 for _ in range(5)]
+        for h in hilos:
+            h.start()
+        time.sleep(0.2)
+        inicio.set()
+        for h in hilos:
+            h.join()
+
+        assert resultados == [b"[]"] * 5
+        assert len(ejecuciones) == 1
+        assert sf.stats["planes"] == {"ejecutadas": 1, "compartidas": 4}
+
+    def test_llaves_distintas_no_se_mezclan(self):
+        """
+        Prueba que alcances distintos no comparten resultado y que al terminar se vuelve a consultar.
+        """
+        sf = SingleFlight()
+        assert sf.do("planes", ("educacion",), lambda: b"1") == b"1"
+        assert sf.do("planes", ("salud",), lambda: b"2") == b"2"
+        assert sf.do("planes", ("educacion",), lambda: b"3") == b"3"
+        assert sf.stats["planes"]["compartidas"] == 0
+
+    def test_error_se_propaga_a_seguidores(self):
+        """
+        Prueba que si la consulta líder falla, los que esperaban reciben el mismo error.
+        """
+        sf = SingleFlight()
+        inicio = threading.Event()
+        errores = []
+
+        def falla():
+            inicio.wait(2)
+            raise ValueError("boom")
+
+        def llamar():
+            try:
+                sf.do("r", (1,), falla)
+            except ValueError as e:
+                errores.append(str(e))
+
+        hilos = [threading.Thread(target=llamar) for _ in range(3)]
+        for h in hilos:
+            h.start()
+        time.sleep(0.2)
+        inicio.set()
+        for h in hilos:
+            h.join()
+        assert errores == ["boom"] * 3
+
+    def test_metrics_expone_contadores(self, client: TestClient, admin_token, plan_action):
+        """
+        Prueba que /metrics publica los contadores de single-flight.
+        """
+        client.get("/seguimiento", headers={"Authorization": f"Bearer {admin_token}"})
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert 'singleflight_requests_total{endpoint="list_planes",resultado="ejecutadas"}' in response.text
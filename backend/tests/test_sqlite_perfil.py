@@ -0,0 +1,84 @@
+"""
+Pruebas para el perfil de producción de SQLite (app/sqlite_perfil.py).
+"""
+
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app import sqlite_perfil
+
+
+def _engine(tmp_path, **kw):
+    engine = create_engine(f"sqlite:///{tmp_path}/p.db", connect_args={"check_same_thread": False})
+    sqlite_perfil.configurar(engine, **kw)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)"))
+    return engine
+
+
+class TestSqlitePerfil:
+    """Suite de pruebas para PRAGMA y turno único de escritura."""
+
+    def test_pragmas(self, tmp_path):
+        """
+        Prueba que cada conexión nueva queda en WAL, synchronous=NORMAL, con FKs,
+        busy_timeout y la caché pedidos.
+        """
+        engine = _engine(tmp_path, busy_timeout_ms=1234, cache_mb=8)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -8 * 1024
+        engine.dispose()
+
+    def test_escrituras_en_fila_lecturas_libres(self, tmp_path):
+        """
+        Prueba que un segundo escritor espera el commit del primero (sin
+        'database is locked') mientras las lecturas siguen sin esperar.
+        """
+        engine = _engine(tmp_path)
+        turno = engine.escritor
+        orden = []
+
+        primero = engine.connect()
+        tx = primero.begin()
+        primero.execute(text("INSERT INTO t (v) VALUES ('a')"))
+
+        def segundo():
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO t (v) VALUES ('b')"))
+            orden.append("b")
+
+        hilo = threading.Thread(target=segundo)
+        hilo.start()
+        time.sleep(0.2)
+        with engine.connect() as lector:
+            assert lector.execute(text("SELECT count(*) FROM t")).scalar() == 0
+        assert orden == []
+
+        orden.append("a")
+        tx.commit()
+        primero.close()
+        hilo.join(timeout=5)
+
+        assert orden == ["a", "b"]
+        assert turno.stats["esperas"] == 1 and turno.stats["vencidos"] == 0
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 2
+        engine.dispose()
+
+    def test_turno_vencido_sigue(self):
+        """
+        Prueba que si el turno no llega a tiempo se sigue sin él (decide busy_timeout).
+        """
+        turno = sqlite_perfil.EscritorUnico(espera_max=0.05)
+        assert turno.tomar(1) is True
+        assert turno.tomar(1) is True  # la misma conexión no espera
+        assert turno.tomar(2) is False
+        assert turno.stats["vencidos"] == 1
+        turno.soltar(1)
+        assert turno.tomar(2) is True
@@ -0,0 +1,69 @@
+# tools/archivar_pqrds.py — archiva los periodos fríos de PQRDs: los desprende de `pqrds`
+# (DETACH PARTITION en PostgreSQL, tabla de archivo en SQLite), los vuelca a
+# <carpeta>/pqrds_p2022.csv.gz y borra su tabla. Ver app/pqrd_particiones.py.
+# Usa: python tools/archivar_pqrds.py --convertir   (PostgreSQL, una vez: `pqrds` → particionada)
+#      python tools/archivar_pqrds.py --antes 2024-01-01 [--carpeta archivo_pqrds] [--sin-volcar]
+#      python tools/archivar_pqrds.py --listar
+#      python tools/archivar_pqrds.py --restaurar archivo_pqrds/pqrds_p2022.csv.gz
+
+import argparse
+import pathlib
+import sys
+from datetime import date
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app import pqrd_particiones  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archivo de PQRDs por periodo")
+    parser.add_argument("--antes", type=date.fromisoformat,
+                        help="Archiva los periodos completos anteriores a esta fecha (AAAA-MM-DD)")
+    parser.add_argument("--carpeta", type=pathlib.Path, default=pathlib.Path("archivo_pqrds"))
+    parser.add_argument("--sin-volcar", action="store_true",
+                        help="Solo desprende (las tablas quedan en la BD, fuera de la API)")
+    parser.add_argument("--restaurar", type=pathlib.Path, help="Reinserta un .csv.gz volcado antes")
+    parser.add_argument("--listar", action="store_true")
+    parser.add_argument("--convertir", action="store_true",
+                        help="Convierte `pqrds` en tabla particionada (PostgreSQL; bloquea la tabla mientras copia)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.convertir:
+            if pqrd_particiones.convertir(db):
+                db.commit()
+                print(f"🧱 pqrds particionada por {pqrd_particiones.PQRD_PARTICION}: "
+                      f"{len(pqrd_particiones.particiones(db))} particiones")
+            else:
+                print("pqrds ya está particionada (o no es PostgreSQL / PQRD_PARTICION=no)")
+            return
+        if args.listar:
+            for nombre, inicio, fin in pqrd_particiones.particiones(db):
+                print(f"  adjunta     {nombre:<18} [{inicio}, {fin})")
+            for nombre in pqrd_particiones.desprendidas(db):
+                print(f"  desprendida {nombre}")
+            return
+        if args.restaurar:
+            n = pqrd_particiones.restaurar(db, args.restaurar)
+            db.commit()
+            print(f"♻️  {n} PQRDs restaurados de {args.restaurar}")
+            return
+        if args.antes is None:
+            parser.error("indique --antes, --restaurar, --listar o --convertir")
+
+        tablas = pqrd_particiones.desprender(db, args.antes)
+        db.commit()
+        print(f"📦 {len(tablas)} periodos desprendidos: {', '.join(tablas) or 'ninguno'}")
+        if args.sin_volcar:
+            return
+        # Cada periodo en su transacción: si uno falla, los anteriores ya quedaron archivados
+        for nombre in pqrd_particiones.desprendidas(db):
+            ruta, filas = pqrd_particiones.exportar(db, nombre, args.carpeta)
+            db.commit()
+            print(f"  {nombre}: {filas} filas → {ruta}")
+
+
+if __name__ == "__main__":
+    main()
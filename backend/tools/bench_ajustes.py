@@ -0,0 +1,131 @@
+# tools/bench_ajustes.py — mide el recorrido de cadenas de ajustes (ajuste_de_id):
+# CTE recursiva (app/ajustes.py) vs. traer todos los seguimientos del plan y armar
+# la cadena en Python (lo que hacía el frontend) vs. una consulta por salto.
+# Siembra una BD SQLite temporal con cadenas profundas (o usa --database-url).
+# Usa: python tools/bench_ajustes.py [--planes 50 --profundidad 500 --ramas 3 --sueltos 2000
+#                                     --repeticiones 20 --sin-indice]
+
+import argparse
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlalchemy.orm import joinedload, sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+from app.ajustes import recorrer  # noqa: E402
+from app.database import Base  # noqa: E402
+
+
+def sembrar_cadenas(db, planes: int, profundidad: int, ramas: int, sueltos: int = 0) -> list:
+    """
+    Crea `planes` planes; cada uno con una cadena de `profundidad` ajustes,
+    `ramas` ajustes extra colgando de cada décimo nodo y `sueltos` seguimientos
+    sin ajustes. Devuelve [(plan_id, hoja_id)].
+    """
+    objetivos = []
+    for p in range(planes):
+        plan = models.PlanAccion(nombre_entidad=f"Entidad bench {p % 10}")
+        db.add(plan); db.flush()
+        anterior = None
+        for nivel in range(profundidad):
+            r = db.execute(
+                insert(models.Seguimiento).values(
+                    plan_id=plan.id, ajuste_de_id=anterior, seguimiento=f"Ajuste {nivel}",
+                    descripcion_actividades="x" * 200,
+                )
+            )
+            anterior = r.inserted_primary_key[0]
+            if nivel % 10 == 0 and ramas:
+                db.execute(insert(models.Seguimiento), [
+                    {"plan_id": plan.id, "ajuste_de_id": anterior, "seguimiento": f"Rama {nivel}.{k}"}
+                    for k in range(ramas)
+                ])
+        if sueltos:
+            db.execute(insert(models.Seguimiento), [
+                {"plan_id": plan.id, "seguimiento": f"Suelto {k}", "descripcion_actividades": "x" * 200}
+                for k in range(sueltos)
+            ])
+        objetivos.append((plan.id, anterior))
+    db.commit()
+    return objetivos
+
+
+def en_python(db, plan_id: int, seg_id: int) -> int:
+    filas = (
+        db.query(models.Seguimiento)
+        .options(joinedload(models.Seguimiento.updated_by))
+        .filter(models.Seguimiento.plan_id == plan_id)
+        .all()
+    )
+    por_id = {s.id: s for s in filas}
+    n, actual = 0, por_id.get(seg_id)
+    while actual is not None:
+        n += 1
+        actual = por_id.get(actual.ajuste_de_id)
+    return n
+
+
+def por_salto(db, seg_id: int) -> int:
+    n, actual = 0, seg_id
+    while actual is not None:
+        actual = db.execute(
+            text("SELECT ajuste_de_id FROM seguimiento WHERE id = :id"), {"id": actual}
+        ).scalar()
+        n += 1
+    return n
+
+
+def medir(nombre: str, Session, fn, repeticiones: int) -> None:
+    tiempos = []
+    for _ in range(repeticiones):
+        # Sesión nueva en cada vuelta: sin el mapa de identidad de la anterior
+        with Session() as db:
+            t0 = time.perf_counter()
+            fn(db)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+    print(f"  {nombre:<28} p50 {statistics.median(tiempos):8.2f} ms   max {max(tiempos):8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de cadenas de ajustes")
+    parser.add_argument("--database-url", help="BD a usar (por defecto, SQLite temporal)")
+    parser.add_argument("--planes", type=int, default=50)
+    parser.add_argument("--profundidad", type=int, default=500)
+    parser.add_argument("--ramas", type=int, default=3)
+    parser.add_argument("--sueltos", type=int, default=2000, help="Seguimientos sin ajustes por plan")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--sin-indice", action="store_true", help="Quita ix_seguimiento_ajuste_de_id para comparar")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_ajustes.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    if args.sin_indice:
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX IF EXISTS ix_seguimiento_ajuste_de_id"))
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        t0 = time.perf_counter()
+        objetivos = sembrar_cadenas(db, args.planes, args.profundidad, args.ramas, args.sueltos)
+        total = db.query(models.Seguimiento).count()
+        print(f"🌱 {total} seguimientos en {args.planes} planes ({time.perf_counter() - t0:.1f} s) — {url}")
+
+    plan_id, hoja = objetivos[len(objetivos) // 2]
+    with Session() as db:
+        assert len(recorrer(db, plan_id, hoja, "cadena")) == args.profundidad
+    n = args.repeticiones
+    medir("CTE cadena", Session, lambda db: recorrer(db, plan_id, hoja, "cadena"), n)
+    medir("CTE árbol", Session, lambda db: recorrer(db, plan_id, hoja, "arbol"), n)
+    medir("todo el plan + Python", Session, lambda db: en_python(db, plan_id, hoja), n)
+    medir("una consulta por salto", Session, lambda db: por_salto(db, hoja), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# tools/bench_arranque.py — tiempo de arranque en frío: importa app.main en procesos nuevos
+# con `python -X importtime` y reporta la mediana, los módulos más caros (acumulado) y qué
+# dependencias opcionales se cargaron (no deberían: ver app/seguridad.py y app/storage.py).
+# Usa: python tools/bench_arranque.py [--repeticiones 7 --top 25 --limite-ms 2500]
+# Con --limite-ms sale con código 1 si la mediana lo supera (apto para CI).
+
+import argparse
+import os
+import pathlib
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND = pathlib.Path(__file__).resolve().parents[1]
+
+# Se cargan en el primer uso, no al importar la app
+PEREZOSOS = ("jose", "passlib", "cryptography", "google.cloud.storage", "redis")
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+_SONDA = (
+    "import sys, time; t = time.perf_counter(); import app.main; "
+    "print('__ms__', (time.perf_counter() - t) * 1000); "
+    "print('__mods__', ','.join(sys.modules))"
+)
+
+
+def medir_una() -> tuple:
+    """(ms de `import app.main`, {módulo: µs acumulados}, módulos cargados) en un proceso nuevo."""
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SONDA],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    acumulado = {}
+    for linea in r.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            acumulado[m.group(4)] = int(m.group(2))
+    ms, mods = 0.0, set()
+    for linea in r.stdout.splitlines():
+        if linea.startswith("__ms__"):
+            ms = float(linea.split()[1])
+        elif linea.startswith("__mods__"):
+            mods = set(linea.split(" ", 1)[1].split(","))
+    return ms, acumulado, mods
+
+
+def cargados(mods: set) -> list:
+    return [p for p in PEREZOSOS if any(m == p or m.startswith(p + ".") for m in mods)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arranque en frío de app.main")
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--limite-ms", type=float, help="Falla si la mediana supera este valor")
+    args = parser.parse_args()
+
+    tiempos, por_modulo, mods = [], defaultdict(list), set()
+    for _ in range(args.repeticiones):
+        ms, acumulado, mods = medir_una()
+        tiempos.append(ms)
+        for nombre, us in acumulado.items():
+            por_modulo[nombre].append(us)
+
+    mediana = statistics.median(tiempos)
+    print(f"⏱️  import app.main: mediana {mediana:.0f} ms (min {min(tiempos):.0f}, max {max(tiempos):.0f}) "
+          f"en {args.repeticiones} procesos")
+    print("\nMódulos más caros (acumulado, mediana):")
+    top = sorted(por_modulo.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for nombre, us in top[:args.top]:
+        print(f"  {statistics.median(us) / 1000:8.1f} ms  {nombre}")
+
+    presentes = cargados(mods)
+    print(f"\nDependencias perezosas cargadas al arrancar: {', '.join(presentes) or 'ninguna'}")
+
+    if args.limite_ms is not None and mediana > args.limite_ms:
+        print(f"❌ {mediana:.0f} ms supera el límite de {args.limite_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# tools/bench_indicadores.py — compara GET /seguimiento/indicadores_usados antes y después:
+# DISTINCT trim(indicador) sobre seguimiento ⨝ plan_accion con lower() vs. la lectura por
+# llave en indicadores_entidad. Siembra una SQLite temporal (o usa --database-url).
+# Usa: python tools/bench_indicadores.py [--seguimientos 1000000 --entidades 40 --indicadores 300]
+
+import argparse
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.indicadores import usados, verificar  # noqa: E402
+
+
+def sembrar(db, seguimientos: int, entidades: int, indicadores: int, planes_por_entidad: int = 25) -> None:
+    rnd = random.Random(42)
+    nombres = [f"Secretaría {i:03d}" for i in range(entidades)]
+    plan_ids = []
+    for nombre in nombres:
+        for _ in range(planes_por_entidad):
+            plan = models.PlanAccion(nombre_entidad=nombre)
+            db.add(plan); db.flush()
+            plan_ids.append(plan.id)
+    catalogo = [f"Indicador {i}" for i in range(indicadores)]
+    lote = 50_000
+    for inicio in range(0, seguimientos, lote):
+        db.execute(insert(models.Seguimiento), [
+            {"plan_id": rnd.choice(plan_ids), "indicador": rnd.choice(catalogo), "seguimiento": "Pendiente"}
+            for _ in range(min(lote, seguimientos - inicio))
+        ])
+    db.commit()
+
+
+def consulta_anterior(db, entidad: str) -> list:
+    """La consulta que hacía el endpoint antes de indicadores_entidad."""
+    S, P = models.Seguimiento, models.PlanAccion
+    rows = (
+        db.query(S.indicador)
+        .join(P, S.plan_id == P.id)
+        .filter(S.indicador.isnot(None), func.trim(S.indicador) != "",
+                func.lower(P.nombre_entidad) == func.lower(entidad))
+        .distinct()
+        .all()
+    )
+    return [r[0].strip() for r in rows if r[0]]
+
+
+def medir(nombre: str, fn, repeticiones: int) -> None:
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    print(f"  {nombre:<34} p50 {statistics.median(tiempos):9.2f} ms   max {max(tiempos):9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de indicadores_usados")
+    parser.add_argument("--database-url", help="BD a usar (por defecto, SQLite temporal)")
+    parser.add_argument("--seguimientos", type=int, default=1_000_000)
+    parser.add_argument("--entidades", type=int, default=40)
+    parser.add_argument("--indicadores", type=int, default=300)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_indicadores.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        t0 = time.perf_counter()
+        sembrar(db, args.seguimientos, args.entidades, args.indicadores)
+        print(f"🌱 {args.seguimientos} seguimientos sembrados ({time.perf_counter() - t0:.1f} s) — {url}")
+        t0 = time.perf_counter()
+        verificar(db, reparar=True)
+        db.commit()
+        print(f"🔁 indicadores_entidad llenada ({time.perf_counter() - t0:.1f} s, como tools/verificar_indicadores.py --reparar)")
+
+    entidad = "Secretaría 007"
+    with Session() as db:
+        assert sorted(set(consulta_anterior(db, entidad))) == usados(db, entidad)
+        medir("DISTINCT sobre seguimiento ⨝ plan", lambda: consulta_anterior(db, entidad), args.repeticiones)
+        medir("indicadores_entidad (entidad)", lambda: usados(db, entidad), args.repeticiones)
+        medir("indicadores_entidad (todas)", lambda: usados(db), args.repeticiones)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# tools/bench_servidor.py — compara el throughput de `uvicorn app.main:app` (un proceso)
+# con `gunicorn -c gunicorn.conf.py` (WEB_CONCURRENCY procesos) sobre una SQLite temporal.
+# Mide dos cargas: login (bcrypt, CPU) y listado de planes (consulta + JSON).
+# Usa: python tools/bench_servidor.py [--workers 4 --concurrencia 16 --segundos 10 --planes 200]
+
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.seguridad import hash_password  # noqa: E402
+
+BACKEND = pathlib.Path(__file__).resolve().parents[1]
+EMAIL, CLAVE = "bench@demo.com", "bench123"
+
+
+def sembrar(url: str, planes: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.User(email=EMAIL, hashed_password=hash_password(CLAVE),
+                           role=models.UserRole.admin, entidad="Alcaldia"))
+        db.add_all([
+            models.PlanAccion(nombre_entidad=f"Entidad {i % 20}", descripcion_actividades="x" * 300)
+            for i in range(planes)
+        ])
+        db.commit()
+
+
+def arrancar(modo: str, url: str, puerto: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": url, "PORT": str(puerto), "WEB_CONCURRENCY": str(workers),
+           "RATELIMIT_ENABLED": "false", "ADMISSION_ENABLED": "false", "ACCESS_LOG": ""}
+    if modo == "uvicorn":
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto), "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app", "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND, env=env)
+    base = f"http://127.0.0.1:{puerto}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{base}/healthz").status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{modo} no respondió en {base}")
+
+
+def cargar(base: str, pedir, concurrencia: int, segundos: float) -> dict:
+    tiempos, errores = [], []
+    fin = time.monotonic() + segundos
+    candado = threading.Lock()
+
+    def cliente():
+        with httpx.Client(base_url=base, timeout=30) as c:
+            while time.monotonic() < fin:
+                t0 = time.perf_counter()
+                ok = pedir(c).status_code == 200
+                dt = (time.perf_counter() - t0) * 1000
+                with candado:
+                    (tiempos if ok else errores).append(dt)
+
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    tiempos.sort()
+    return {
+        "rps": len(tiempos) / segundos,
+        "p50": statistics.median(tiempos) if tiempos else 0.0,
+        "p99": tiempos[int(len(tiempos) * 0.99) - 1] if tiempos else 0.0,
+        "errores": len(errores),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput: uvicorn (1 proceso) vs. gunicorn (N procesos)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--planes", type=int, default=200)
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{tempfile.mkdtemp()}/bench_servidor.db"
+    sembrar(url, args.planes)
+    login = {"username": EMAIL, "password": CLAVE}
+    print(f"🖥️  {os.cpu_count()} CPU — {args.concurrencia} clientes × {args.segundos:.0f} s por carga")
+
+    for modo, workers in (("uvicorn", 1), ("gunicorn", args.workers)):
+        proc = arrancar(modo, url, args.puerto, workers)
+        base = f"http://127.0.0.1:{args.puerto}"
+        try:
+            token = httpx.post(f"{base}/auth/token", data=login).json()["access_token"]
+            auth = {"Authorization": f"Bearer {token}"}
+            cargas = {
+                "login (bcrypt)": lambda c: c.post("/auth/token", data=login),
+                "GET /seguimiento?limit=200": lambda c: c.get("/seguimiento?limit=200", headers=auth),
+            }
+            for nombre, pedir in cargas.items():
+                r = cargar(base, pedir, args.concurrencia, args.segundos)
+                print(f"  {modo:<8} ×{workers:<2} {nombre:<28} {r['rps']:8.1f} req/s   "
+                      f"p50 {r['p50']:7.1f} ms   p99 {r['p99']:7.1f} ms   errores {r['errores']}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# tools/bench_sqlite.py — concurrencia sobre una SQLite en archivo con tres perfiles:
+#   defecto      diario rollback, sin pragmas (como antes de app/sqlite_perfil.py)
+#   wal          WAL + synchronous=NORMAL + mmap/cache/busy_timeout
+#   wal+escritor lo anterior + turno único de escritura del proceso
+# Hilos lectores (listado de planes) y escritores (alta de seguimiento) a la vez, más una
+# carga masiva (lotes de inserts) con lectores en paralelo.
+# Usa: python tools/bench_sqlite.py [--lectores 8 --escritores 4 --segundos 5 --planes 500]
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import models, sqlite_perfil  # noqa: E402
+from app.database import Base, activar_fk_sqlite  # noqa: E402
+
+PERFILES = ("defecto", "wal", "wal+escritor")
+
+
+def crear_engine(perfil: str, ruta: str, busy_ms: int):
+    engine = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    if perfil == "defecto":
+        return activar_fk_sqlite(engine)
+    return sqlite_perfil.configurar(engine, un_escritor=(perfil == "wal+escritor"), busy_timeout_ms=busy_ms)
+
+
+def sembrar(Session, planes: int) -> list:
+    with Session() as db:
+        objs = [models.PlanAccion(nombre_entidad=f"Entidad {i % 20}", descripcion_actividades="x" * 200)
+                for i in range(planes)]
+        db.add_all(objs)
+        db.commit()
+        return [p.id for p in objs]
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def correr(Session, ids: list, lectores: int, escritores: int, segundos: float, lote: int) -> dict:
+    r = {"lecturas": [], "escrituras": [], "bloqueos": 0}
+    candado = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    def lector(n):
+        while time.monotonic() < fin:
+            t0 = time.perf_counter()
+            with Session() as db:
+                db.execute(select(models.PlanAccion).where(
+                    models.PlanAccion.nombre_entidad == f"Entidad {n % 20}")).scalars().all()
+                db.scalar(select(func.count()).select_from(models.Seguimiento))
+            with candado:
+                r["lecturas"].append((time.perf_counter() - t0) * 1000)
+
+    def escritor(n):
+        i = 0
+        while time.monotonic() < fin:
+            t0 = time.perf_counter()
+            try:
+                with Session() as db:
+                    for _ in range(lote):
+                        i += 1
+                        db.add(models.Seguimiento(plan_id=ids[(n * 7919 + i) % len(ids)],
+                                                  indicador=f"ind {i % 50}",
+                                                  seguimiento="En progreso"))
+                    db.commit()
+                with candado:
+                    r["escrituras"].append((time.perf_counter() - t0) * 1000)
+            except OperationalError:
+                with candado:
+                    r["bloqueos"] += 1
+
+    hilos = [threading.Thread(target=lector, args=(n,)) for n in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return {
+        "lect_s": len(r["lecturas"]) / segundos,
+        "lect_p99": percentil(r["lecturas"], 0.99),
+        "escr_s": len(r["escrituras"]) * lote / segundos,
+        "escr_p99": percentil(r["escrituras"], 0.99),
+        "bloqueos": r["bloqueos"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite: diario por defecto vs. WAL vs. WAL + escritor único")
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--planes", type=int, default=500)
+    parser.add_argument("--lote-masivo", type=int, default=500, help="Filas por commit en la carga masiva")
+    parser.add_argument("--busy-ms", type=int, default=2000, help="busy_timeout de los perfiles WAL")
+    args = parser.parse_args()
+
+    print(f"🗄️  {args.lectores} lectores + {args.escritores} escritores × {args.segundos:.0f} s por escenario")
+    escenarios = (("mixto (1 fila/commit)", 1), (f"masivo ({args.lote_masivo} filas/commit)", args.lote_masivo))
+    for perfil in PERFILES:
+        for nombre, lote in escenarios:
+            ruta = f"{tempfile.mkdtemp()}/bench_sqlite.db"
+            engine = crear_engine(perfil, ruta, args.busy_ms)
+            Base.metadata.create_all(bind=engine)
+            Session = sessionmaker(bind=engine, autoflush=False)
+            ids = sembrar(Session, args.planes)
+            r = correr(Session, ids, args.lectores, args.escritores, args.segundos, lote)
+            print(f"  {perfil:<13} {nombre:<26} lecturas {r['lect_s']:8.1f}/s p99 {r['lect_p99']:7.1f} ms   "
+                  f"filas {r['escr_s']:9.1f}/s p99 {r['escr_p99']:7.1f} ms   'locked' {r['bloqueos']}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
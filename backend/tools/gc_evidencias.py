@@ -0,0 +1,36 @@
+# tools/gc_evidencias.py — borra evidencias que ningún seguimiento referencia.
+# Usa: python tools/gc_evidencias.py [--gracia-horas 24] [--dry-run]
+# Toma DATABASE_URL, UPLOAD_DIR / EVIDENCE_SUBDIR y GCS_BUCKET / GCS_PREFIX del entorno, igual que la API.
+
+import argparse
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.evidencias import recolectar  # noqa: E402
+from app.storage import get_storage  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gracia-horas", type=int, default=int(os.getenv("EVIDENCIA_GRACIA_HORAS", "24")),
+                        help="No borra blobs usados en las últimas N horas (subidas aún sin guardar)")
+    parser.add_argument("--dry-run", action="store_true", help="Solo lista lo que se borraría")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        borrados = recolectar(db, get_storage().delete, gracia_horas=args.gracia_horas, dry_run=args.dry_run)
+    finally:
+        db.close()
+    accion = "Se borrarían" if args.dry_run else "Borrados"
+    print(f"🧹 {accion} {len(borrados)} objetos")
+    for name in borrados:
+        print(f"  - {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# tools/purgar_papelera.py — borra del todo los planes que llevan más de N días en la papelera
+# (DELETE /seguimiento/{id}?papelera=true). El worker de jobs lo hace cada hora; esto sirve
+# para correrlo a mano o desde un cron fuera de horas pico.
+# Usa: python tools/purgar_papelera.py [--dias 30] [--lote 500]
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.borrado import LOTE_PURGA, PAPELERA_DIAS, purgar_papelera  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purga la papelera de planes")
+    parser.add_argument("--dias", type=int, default=PAPELERA_DIAS,
+                        help="Solo planes en la papelera desde hace más de N días (0 = todos)")
+    parser.add_argument("--lote", type=int, default=LOTE_PURGA, help="Planes por transacción")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        n = purgar_papelera(db, dias=args.dias, lote=args.lote)
+    print(f"🗑️  {n} planes purgados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# tools/recalcular_estadisticas.py — reconstruye la tabla `estadisticas` del tablero
+# (planes por estado, vencimientos y seguimientos por mes) desde plan_accion y seguimiento,
+# p.ej. tras cargas o ediciones directas en la BD.
+# Usa: python tools/recalcular_estadisticas.py
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.estadisticas import reconstruir  # noqa: E402
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        n = reconstruir(db)
+        db.commit()
+    print(f"📊 Estadísticas reconstruidas ({n} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# tools/recalcular_resumen.py — recalcula el resumen de seguimientos de plan_accion
+# (num_seguimientos, ultimo_seguimiento_*), p.ej. tras cargas o ediciones directas en la BD.
+# Usa: python tools/recalcular_resumen.py [--plan-id 12 --plan-id 15]
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.resumen import recalcular_resumen  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recalcula el resumen de seguimientos por plan")
+    parser.add_argument("--plan-id", type=int, action="append", help="Solo estos planes (repetible)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        n = recalcular_resumen(db, args.plan_id)
+        db.commit()
+    print(f"🔁 Resumen recalculado en {n} planes")
+
+
+if __name__ == "__main__":
+    main()
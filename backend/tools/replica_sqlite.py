@@ -0,0 +1,39 @@
+# tools/replica_sqlite.py — "réplica" local con dos archivos SQLite: copia la primaria sobre la
+# réplica cada --retraso segundos (API de backup de sqlite3), simulando el retraso de replicación.
+# Usa (en otra terminal, con la API corriendo con REPLICA_DATABASE_URL=sqlite:///./replica.db):
+#   python tools/replica_sqlite.py --primaria app.db --replica replica.db [--retraso 5 --una-vez]
+
+import argparse
+import sqlite3
+import time
+
+
+def copiar(primaria: str, replica: str) -> None:
+    origen = sqlite3.connect(primaria)
+    destino = sqlite3.connect(replica)
+    try:
+        origen.backup(destino)
+    finally:
+        destino.close()
+        origen.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Copia periódica de una SQLite primaria a su réplica")
+    parser.add_argument("--primaria", default="app.db")
+    parser.add_argument("--replica", default="replica.db")
+    parser.add_argument("--retraso", type=float, default=5, help="Segundos entre copias")
+    parser.add_argument("--una-vez", action="store_true")
+    args = parser.parse_args()
+
+    while True:
+        t0 = time.perf_counter()
+        copiar(args.primaria, args.replica)
+        print(f"🔁 {args.primaria} → {args.replica} en {(time.perf_counter() - t0) * 1000:.0f} ms")
+        if args.una_vez:
+            return
+        time.sleep(args.retraso)
+
+
+if __name__ == "__main__":
+    main()
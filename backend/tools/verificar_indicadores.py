@@ -0,0 +1,39 @@
+# tools/verificar_indicadores.py — compara indicadores_entidad con seguimiento ⨝ plan_accion
+# y, con --reparar, la reescribe. Sale con código 1 si encontró diferencias (para cron/alertas).
+# Usa: python tools/verificar_indicadores.py [--reparar]
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal  # noqa: E402
+from app.indicadores import verificar  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verifica la tabla de indicadores usados por entidad")
+    parser.add_argument("--reparar", action="store_true", help="Reescribe la tabla si hay diferencias")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        diferencias = verificar(db, reparar=args.reparar)
+        db.commit()
+
+    total = sum(len(v) for v in diferencias.values())
+    if not total:
+        print("✅ indicadores_entidad es consistente")
+        return 0
+    for (entidad, indicador) in diferencias["faltan"]:
+        print(f"  faltan   {entidad!r} / {indicador!r}")
+    for (entidad, indicador) in diferencias["sobran"]:
+        print(f"  sobran   {entidad!r} / {indicador!r}")
+    for (entidad, indicador), hay, debe in diferencias["distintos"]:
+        print(f"  distinto {entidad!r} / {indicador!r}: {hay} en tabla, {debe} esperados")
+    print(f"⚠️  {total} diferencias" + (" (reparadas)" if args.reparar else ""))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())